@@ -0,0 +1,438 @@
+# ============================================================================
+# DATOTEKA: agent_service.py
+# Uloga: Lokalni agent service - pool Prolog enginea iza Unix socketa
+# ============================================================================
+#
+# pyswip ima jedan SWI engine po procesu, pa se svi korisnici jednog
+# PrologAgent-a moraju serijalizirati. Service drži pool worker procesa,
+# svaki s učitanim agent.pl-om (i tablicama zadnje mape), a klijenti mu
+# šalju stanja preko Unix socketa.
+#
+# Protokol: JSON po retku, u oba smjera.
+#   zahtjev:  {"id": 7, "state": {...game_state...}, "options": {...}}
+#             {"id": 8, "op": "stats"}
+#   odgovor:  {"id": 7, "action": {...} ili null}
+#             {"id": 7, "error": "timeout"}
+# Klijent smije poslati više zahtjeva bez čekanja (pipelining); odgovori
+# dolaze redom kojim workeri završe, a spajaju se po id-u. options su
+# budget, max_depth i weights (kao argumenti PrologAgent-a).
+#
+# Svaki worker ima svoju nit u service-u koja mu šalje posao kroz Pipe i
+# čeka odgovor najviše `timeout` sekundi. Ako worker ne odgovori na vrijeme
+# ili se sruši, proces se ubija i pokreće novi, a zahtjev dobiva grešku.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m agent_service --workers 4
+#   python3 main.py --headless 20 --service /tmp/dpprojekt-agent.sock
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import threading
+
+from config.constants import AGENT_SERVICE_SOCKET, AGENT_SERVICE_TIMEOUT
+from diagnostics.trace import trace, ConsoleSink
+from game.terrain import TerrainRows
+
+# Koliko se čeka da worker učita agent.pl
+STARTUP_TIMEOUT = 30.0
+
+# Procesi se pokreću sa spawn - service ima niti, a fork iz procesa s
+# nitima (i SWI engineom) nije siguran
+_context = multiprocessing.get_context('spawn')
+
+
+class AgentServiceError(Exception):
+    """Service je vratio grešku za zahtjev (timeout, pad workera, loš zahtjev)"""
+
+
+class _WorkerLost(AgentServiceError):
+    """Worker nije odgovorio na vrijeme ili je pao - treba ga restartati"""
+
+
+# Polja koja agent čita iz stanja (GameLoop._prepare_game_state)
+STATE_FIELDS = ('player', 'enemies', 'terrain', 'actions_left', 'grid_size')
+
+
+def _bad_request(request):
+    """Razlog zašto zahtjev za akciju nije ispravan ili None"""
+    state = request.get('state')
+    if not isinstance(state, dict):
+        return 'no state'
+    missing = [field for field in STATE_FIELDS if field not in state]
+    if missing:
+        return f"state without {', '.join(missing)}"
+    if not isinstance(request.get('options') or {}, dict):
+        return 'options must be an object'
+    return None
+
+
+def _make_agent(backend):
+    if backend == 'greedy':
+        from monte_carlo_agent import GreedyAgent
+        return GreedyAgent()
+    from prolog_comm import PrologAgent
+    return PrologAgent()
+
+
+def _apply_options(agent, defaults, options):
+    """Opcije zahtjeva na agentu workera - ono što nije zadano vraća se na početno"""
+    agent.weights = dict(defaults['weights'], **options.get('weights', {}))
+    # GreedyAgent nema lookahead pa ni budžet ni dubinu
+    if hasattr(agent, 'time_budget'):
+        agent.time_budget = options.get('budget', defaults['time_budget'])
+        agent.max_depth = options.get('max_depth', defaults['max_depth'])
+
+
+def _worker_main(conn, backend):
+    """Petlja worker procesa: (state, options) -> akcija"""
+    try:
+        agent = _make_agent(backend)
+    except Exception as e:
+        conn.send(('error', repr(e)))
+        return
+    conn.send(('ready', None))
+
+    defaults = {
+        'weights': dict(agent.weights),
+        'time_budget': getattr(agent, 'time_budget', None),
+        'max_depth': getattr(agent, 'max_depth', None),
+    }
+    terrain = None
+    while True:
+        try:
+            state, options = conn.recv()
+        except EOFError:
+            return
+        try:
+            # JSON daje novu listu za svaki zahtjev - isti teren zadrži isti
+            # objekt da keševi tablica (ključ je identitet) i dalje pogađaju
+            if state['terrain'] == terrain:
+                state['terrain'] = terrain
+            else:
+                terrain = state['terrain']
+
+            _apply_options(agent, defaults, options)
+            conn.send(('action', agent.get_action(state)))
+        except Exception as e:
+            conn.send(('error', repr(e)))
+
+
+class _Worker:
+    """Jedan worker proces i Pipe prema njemu"""
+    def __init__(self, index, backend):
+        self.index = index
+        self.backend = backend
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+
+    def start(self):
+        conn, child = _context.Pipe()
+        self.process = _context.Process(
+            target=_worker_main, args=(child, self.backend),
+            name=f'agent-worker-{self.index}', daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.conn = conn
+        if not conn.poll(STARTUP_TIMEOUT):
+            self.stop()
+            raise RuntimeError(f"Worker {self.index} se nije pokrenuo")
+        try:
+            status, detail = conn.recv()
+        except EOFError:
+            status, detail = 'error', 'proces je završio'
+        if status != 'ready':
+            self.stop()
+            raise RuntimeError(f"Worker {self.index}: {detail}")
+
+    def stop(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+
+    def call(self, state, options, timeout):
+        """Akcija za stanje; AgentServiceError ako worker kasni ili padne"""
+        try:
+            self.conn.send((state, options))
+            if not self.conn.poll(timeout):
+                raise _WorkerLost('timeout')
+            status, result = self.conn.recv()
+        except (EOFError, OSError):
+            raise _WorkerLost('worker crashed')
+        if status == 'error':
+            raise AgentServiceError(result)
+        return result
+
+
+class _Connection:
+    """Jedan klijent - odgovori iz više niti se pišu pod lockom"""
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.done = threading.Condition(self.lock)
+
+    def reply(self, message):
+        line = (json.dumps(message) + "\n").encode()
+        with self.lock:
+            try:
+                self.wfile.write(line)
+                self.wfile.flush()
+            except OSError:
+                pass    # Klijent je otišao - odgovor se odbacuje
+
+    def finish_one(self, message):
+        self.reply(message)
+        with self.lock:
+            self.pending -= 1
+            self.done.notify_all()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        connection = _Connection(self.wfile)
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+            except (ValueError, AttributeError) as e:
+                connection.reply({'id': None, 'error': f'bad request: {e}'})
+                continue
+
+            if request.get('op') == 'stats':
+                connection.reply({'id': request_id, 'stats': service.stats()})
+                continue
+            # Neispravan zahtjev se odbija ovdje - worker ga ne vidi
+            problem = _bad_request(request)
+            if problem is not None:
+                connection.reply({'id': request_id, 'error': f'bad request: {problem}'})
+                continue
+            with connection.lock:
+                connection.pending += 1
+            service.jobs.put((connection, request_id, request['state'],
+                              request.get('options') or {}))
+
+        # Socket se zatvara tek kad su svi odgovori ove veze poslani
+        with connection.lock:
+            while connection.pending:
+                connection.done.wait()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AgentService:
+    """
+    Pool worker procesa iza Unix socketa
+
+    Args:
+        socket_path: putanja Unix socketa
+        workers: broj worker procesa (Prolog enginea)
+        timeout: sekunde po zahtjevu prije nego se worker restarta
+        backend: 'prolog' ili 'greedy' (GreedyAgent, bez SWI-Prologa)
+    """
+    def __init__(self, socket_path=AGENT_SERVICE_SOCKET, workers=None,
+                 timeout=AGENT_SERVICE_TIMEOUT, backend='prolog'):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.workers = [_Worker(i, backend) for i in range(workers or os.cpu_count() or 1)]
+        self.jobs = queue.Queue()
+        self.server = None
+        self._threads = []
+        self._counts = {'requests': 0, 'errors': 0, 'timeouts': 0}
+        self._counts_lock = threading.Lock()
+
+    def start(self):
+        """Pokreće workere i počinje slušati na socketu"""
+        for worker in self.workers:
+            worker.start()
+        for worker in self.workers:
+            thread = threading.Thread(target=self._serve_worker, args=(worker,),
+                                      name=f'agent-worker-{worker.index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = _Server(self.socket_path, _Handler)
+        self.server.service = self
+        thread = threading.Thread(target=self.server.serve_forever, name='agent-service', daemon=True)
+        thread.start()
+        trace.info("Agent service: %d workera na %s", len(self.workers), self.socket_path)
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            os.unlink(self.socket_path)
+        for _ in self._threads:
+            self.jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for worker in self.workers:
+            worker.stop()
+
+    def stats(self):
+        with self._counts_lock:
+            counts = dict(self._counts)
+        counts['workers'] = len(self.workers)
+        counts['restarts'] = sum(worker.restarts for worker in self.workers)
+        counts['queued'] = self.jobs.qsize()
+        return counts
+
+    def _count(self, name):
+        with self._counts_lock:
+            self._counts[name] += 1
+
+    def _serve_worker(self, worker):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            connection, request_id, state, options = job
+            self._count('requests')
+            lost = False
+            try:
+                if worker.process is None:
+                    # Zadnji restart nije uspio - pokušaj ponovno
+                    worker.start()
+                action = worker.call(state, options, self.timeout)
+                message = {'id': request_id, 'action': action}
+            except _WorkerLost as e:
+                self._count('errors')
+                if str(e) == 'timeout':
+                    self._count('timeouts')
+                trace.warning("Worker %d: %s - restart", worker.index, e)
+                message = {'id': request_id, 'error': str(e)}
+                lost = True
+            except (AgentServiceError, RuntimeError) as e:
+                self._count('errors')
+                message = {'id': request_id, 'error': str(e)}
+            connection.finish_one(message)
+
+            # Restart tek nakon odgovora - klijent ne čeka start enginea
+            if lost:
+                worker.stop()
+                worker.restarts += 1
+                try:
+                    worker.start()
+                except RuntimeError as e:
+                    trace.error("Restart workera %d nije uspio: %s", worker.index, e)
+
+
+class ServiceClient:
+    """
+    Klijent za AgentService. submit() šalje zahtjev bez čekanja, result()
+    vraća akciju za id - više submit-ova prije result-a je pipelining.
+    """
+    def __init__(self, socket_path=AGENT_SERVICE_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self._rfile = self.sock.makefile('rb')
+        self._wfile = self.sock.makefile('wb')
+        self._next_id = 0
+        self._responses = {}
+
+    def submit(self, game_state, options=None):
+        request_id = self._next_id
+        self._next_id += 1
+        request = {'id': request_id, 'state': game_state, 'options': options or {}}
+        self._wfile.write((json.dumps(request, default=_to_json) + "\n").encode())
+        self._wfile.flush()
+        return request_id
+
+    def _receive(self, request_id):
+        while request_id not in self._responses:
+            line = self._rfile.readline()
+            if not line:
+                raise AgentServiceError('service closed the connection')
+            response = json.loads(line)
+            self._responses[response['id']] = response
+        return self._responses.pop(request_id)
+
+    def result(self, request_id):
+        """Akcija (kao PrologAgent.get_action) ili AgentServiceError"""
+        response = self._receive(request_id)
+        if 'error' in response:
+            raise AgentServiceError(response['error'])
+        return _action_from_json(response['action'])
+
+    def get_action(self, game_state, options=None):
+        return self.result(self.submit(game_state, options))
+
+    def get_actions(self, game_states, options=None):
+        """Akcije za više stanja - svi zahtjevi se pošalju odjednom"""
+        ids = [self.submit(state, options) for state in game_states]
+        return [self.result(request_id) for request_id in ids]
+
+    def stats(self):
+        request_id = self._next_id
+        self._next_id += 1
+        self._wfile.write((json.dumps({'id': request_id, 'op': 'stats'}) + "\n").encode())
+        self._wfile.flush()
+        return self._receive(request_id)['stats']
+
+    def close(self):
+        self._rfile.close()
+        self._wfile.close()
+        self.sock.close()
+
+
+def _to_json(value):
+    """GameMap.rows (game_state['terrain']) ide kao 2D lista"""
+    if isinstance(value, TerrainRows):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} nije JSON")
+
+
+def _action_from_json(action):
+    """JSON nema tuple - move target i push direction se vraćaju u tuple"""
+    if action is None:
+        return None
+    if action['type'] == 'move':
+        action['target'] = tuple(action['target'])
+    elif action['type'] == 'melee_push':
+        action['direction'] = tuple(action['direction'])
+    return action
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pool Prolog agenata iza Unix socketa")
+    parser.add_argument('--socket', default=AGENT_SERVICE_SOCKET, metavar='PATH',
+                        help=f"Putanja Unix socketa (default: {AGENT_SERVICE_SOCKET})")
+    parser.add_argument('--workers', type=int, help="Broj worker procesa (default: broj CPU-a)")
+    parser.add_argument('--timeout', type=float, default=AGENT_SERVICE_TIMEOUT,
+                        help=f"Sekunde po zahtjevu prije restarta workera (default: {AGENT_SERVICE_TIMEOUT})")
+    parser.add_argument('--backend', choices=['prolog', 'greedy'], default='prolog',
+                        help="Agent u workerima (default: prolog)")
+    args = parser.parse_args(argv)
+
+    trace.add_sink(ConsoleSink())
+    service = AgentService(args.socket, args.workers, args.timeout, args.backend)
+    service.start()
+    print(f"Agent service sluša na {args.socket} (Ctrl+C za kraj)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        trace.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# ============================================================================
+# DATOTEKA: benchmarks/batch.py
+# Uloga: Batch (NumPy lockstep) engine protiv GameLoop-a partiju po partiju
+# ============================================================================
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.batch
+#   python3 -m benchmarks.batch --games 10000 --scalar-games 500
+#
+# Obje strane igraju isti greedy player (GreedyAgent / vektorizirani
+# agent.pl) nad istim seed-ovima. Mjeri se samo igranje, ne generiranje mapa.
+
+import argparse
+import random
+import sys
+import time
+
+from config.constants import HEADLESS_MAX_TURNS
+from game import state as game_state
+from game.batch import BatchGames
+from game_loop import GameLoop
+from monte_carlo_agent import GreedyAgent
+
+DEFAULT_GAMES = 2000
+DEFAULT_SCALAR_GAMES = 200
+FIRST_SEED = 1000
+
+
+def make_games(seeds, agent):
+    """GameLoop po seed-u (isti kao benchmarks.macro.play_scenario) + početni snapshot"""
+    games = []
+    for seed in seeds:
+        random.seed(seed)
+        games.append(GameLoop(headless=True, agent=agent))
+    return games
+
+
+def run_scalar(games, max_turns):
+    """Partija po partija - vraća (rezultati, sekunde)"""
+    start = time.perf_counter()
+    results = [(game.play_headless(max_turns), game.turn_manager.turn_number) for game in games]
+    return results, time.perf_counter() - start
+
+
+def run_batch(states, max_turns):
+    """Sve partije odjednom - vraća (rezultati, sekunde)"""
+    start = time.perf_counter()
+    batch = BatchGames(states, max_turns)
+    results = batch.run()
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch engine vs GameLoop")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES,
+                        help="Broj partija za batch engine")
+    parser.add_argument('--scalar-games', type=int, default=DEFAULT_SCALAR_GAMES,
+                        help="Koliko ih odigrati i kroz GameLoop (provjera + brzina)")
+    parser.add_argument('--max-turns', type=int, default=HEADLESS_MAX_TURNS)
+    args = parser.parse_args(argv)
+
+    seeds = range(FIRST_SEED, FIRST_SEED + args.games)
+    games = make_games(seeds, GreedyAgent())
+    states = [game_state.from_game(game) for game in games]
+
+    batch_results, batch_seconds = run_batch(states, args.max_turns)
+    print(f"batch:  {len(states)} partija u {batch_seconds:.3f} s "
+          f"({len(states) / batch_seconds:.0f} games/s)")
+
+    scalar_count = min(args.scalar_games, len(games))
+    scalar_results, scalar_seconds = run_scalar(games[:scalar_count], args.max_turns)
+    scalar_rate = scalar_count / scalar_seconds
+    print(f"scalar: {scalar_count} partija u {scalar_seconds:.3f} s ({scalar_rate:.0f} games/s)")
+    print(f"ubrzanje: x{len(states) / batch_seconds / scalar_rate:.1f}")
+
+    mismatches = [
+        (seed, scalar, batched)
+        for seed, scalar, batched in zip(seeds, scalar_results, batch_results)
+        if scalar != batched
+    ]
+    if mismatches:
+        print(f"RAZLIKA u {len(mismatches)} od {scalar_count} partija, npr. {mismatches[:5]}")
+        return 1
+    print(f"ishodi isti u svih {scalar_count} partija")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
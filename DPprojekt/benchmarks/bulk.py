@@ -0,0 +1,135 @@
+# ============================================================================
+# DATOTEKA: benchmarks/bulk.py
+# Uloga: Binarni bulk prijenos stanja (prolog_codec) naspram tekstualnih upita
+# ============================================================================
+#
+# Stanja se skupe iz greedy partija (svaka odluka playera), pa se mjeri:
+#   encode - _build_query tekst po stanju naspram StateEncoder zapisa
+#   prolog - get_action po stanju naspram get_actions_bulk (treba SWI-Prolog)
+# Zadana dubina je 0 (samo greedy) da obje putanje vrate iste akcije i da
+# se mjeri prijenos, a ne pretraga.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.bulk
+#   python3 -m benchmarks.bulk --states 2000 --max-depth 2 --budget 0.05
+
+import argparse
+import random
+import time
+
+from config.constants import AGENT_WEIGHTS
+from game_loop import GameLoop
+from monte_carlo_agent import GreedyAgent
+from prolog_codec import StateEncoder
+
+FIRST_SEED = 3000
+
+
+class _RecordingAgent:
+    """GreedyAgent koji pamti kopiju svakog stanja koje dobije"""
+    def __init__(self, states):
+        self.states = states
+        self.agent = GreedyAgent()
+
+    def get_action(self, game_state):
+        self.states.append({
+            'player': dict(game_state['player']),
+            'enemies': [dict(e) for e in game_state['enemies']],
+            'terrain': game_state['terrain'],
+            'actions_left': game_state['actions_left'],
+            'grid_size': game_state['grid_size'],
+        })
+        return self.agent.get_action(game_state)
+
+
+def collect_states(count, seed=FIRST_SEED):
+    """Stanja iz uzastopnih greedy partija - stanja iste partije dijele teren"""
+    states = []
+    agent = _RecordingAgent(states)
+    while len(states) < count:
+        random.seed(seed)
+        GameLoop(headless=True, agent=agent).play_headless()
+        seed += 1
+    return states[:count]
+
+
+def _text_agent(time_budget, max_depth):
+    """PrologAgent bez enginea - samo za _build_query (radi i bez SWI-Prologa)"""
+    from prolog_comm import PrologAgent
+    agent = object.__new__(PrologAgent)
+    agent.time_budget = time_budget
+    agent.max_depth = max_depth
+    agent.weights = dict(AGENT_WEIGHTS)
+    return agent
+
+
+def bench_encode(states, time_budget, max_depth):
+    text_agent = _text_agent(time_budget, max_depth)
+    start = time.perf_counter()
+    queries = [text_agent._build_query(state) for state in states]
+    text_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoder = StateEncoder()
+    encoder.options(time_budget, max_depth, AGENT_WEIGHTS)
+    for state in states:
+        encoder.state(state)
+    data = encoder.getvalue()
+    binary_seconds = time.perf_counter() - start
+
+    return {
+        'text': (len(states) / text_seconds, sum(len(q) for q in queries)),
+        'binary': (len(states) / binary_seconds, len(data)),
+    }
+
+
+def bench_prolog(states, time_budget, max_depth):
+    """(stanja/s po stanju, stanja/s bulk, broj istih akcija) ili razlog"""
+    try:
+        from prolog_comm import PrologAgent
+        agent = PrologAgent(time_budget=time_budget, max_depth=max_depth)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+    # Zagrijavanje - učitavanje batch.pl-a i tablica prve mape
+    agent.get_actions_bulk(states[:1])
+
+    start = time.perf_counter()
+    single = [agent.get_action(state) for state in states]
+    single_rate = len(states) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    bulk = agent.get_actions_bulk(states)
+    bulk_rate = len(states) / (time.perf_counter() - start)
+
+    same = sum(a == b for a, b in zip(single, bulk))
+    return single_rate, bulk_rate, same
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk binarni prijenos stanja naspram teksta")
+    parser.add_argument('--states', type=int, default=500)
+    parser.add_argument('--budget', type=float, default=0.2)
+    parser.add_argument('--max-depth', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    states = collect_states(args.states)
+    print(f"{len(states)} stanja, budget {args.budget}s, max_depth {args.max_depth}")
+
+    encode = bench_encode(states, args.budget, args.max_depth)
+    for name, (rate, size) in encode.items():
+        print(f"  encode {name:<6} {rate:>10.0f} stanja/s  {size:>9} B  "
+              f"({size / len(states):.0f} B/stanje)")
+
+    result = bench_prolog(states, args.budget, args.max_depth)
+    if isinstance(result, str):
+        print(f"  prolog: preskočeno ({result})")
+        return
+    single_rate, bulk_rate, same = result
+    print(f"  prolog text   {single_rate:>10.0f} stanja/s")
+    print(f"  prolog bulk   {bulk_rate:>10.0f} stanja/s  (x{bulk_rate / single_rate:.2f}, "
+          f"iste akcije {same}/{len(states)})")
+
+
+if __name__ == '__main__':
+    main()
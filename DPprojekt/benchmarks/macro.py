@@ -0,0 +1,213 @@
+# ============================================================================
+# DATOTEKA: benchmarks/macro.py
+# Uloga: End-to-end benchmark - cijele partije nad fiksnim skupom scenarija
+# ============================================================================
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.macro                    # usporedi s baseline-om
+#   python3 -m benchmarks.macro --save-baseline    # spremi novi baseline
+#   python3 -m benchmarks.macro --backend prolog --rounds 3 --output rez.json
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from diagnostics.metrics import metrics
+from benchmarks.stats import percentile, wilcoxon_greater, mann_whitney_greater
+from game_loop import GameLoop
+
+# Fiksni korpus scenarija - seed određuje mapu i početne pozicije
+SCENARIO_SEEDS = tuple(range(1000, 1032))
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+SIGNIFICANCE = 0.01   # p-vrijednost ispod koje je usporenje značajno
+MIN_SLOWDOWN = 1.05   # i barem 5% sporije (medijan)
+
+
+def _prolog_backend():
+    from prolog_comm import PrologAgent
+    return PrologAgent()
+
+
+def _greedy_backend():
+    from monte_carlo_agent import GreedyAgent
+    return GreedyAgent()
+
+
+def _monte_carlo_backend():
+    from monte_carlo_agent import MonteCarloAgent
+    return MonteCarloAgent(seed=0)
+
+
+# Ime backend-a -> factory koja stvara agenta s get_action(game_state)
+AGENT_BACKENDS = {
+    'prolog': _prolog_backend,
+    'greedy': _greedy_backend,
+    'montecarlo': _monte_carlo_backend,
+}
+
+
+class TimedAgent:
+    """Omotač oko agenta koji mjeri latenciju svake odluke"""
+    def __init__(self, agent):
+        self.agent = agent
+        self.latencies = []
+
+    def get_action(self, game_state):
+        start = time.perf_counter()
+        action = self.agent.get_action(game_state)
+        self.latencies.append(time.perf_counter() - start)
+        return action
+
+
+def play_scenario(seed, agent):
+    """Odigra jednu partiju za zadani seed - vraća rezultat i trajanje"""
+    random.seed(seed)
+    start = time.perf_counter()
+    game = GameLoop(headless=True, agent=agent)
+    winner = game.play_headless()
+    elapsed = time.perf_counter() - start
+    return {
+        'seed': seed,
+        'winner': winner,
+        'turns': game.turn_manager.turn_number,
+        'seconds': elapsed,
+    }
+
+
+def run_backend(name, seeds, rounds):
+    """Pokreće cijeli korpus `rounds` puta za jedan backend"""
+    agent = TimedAgent(AGENT_BACKENDS[name]())
+    per_seed = {seed: [] for seed in seeds}
+    outcomes = {}
+    total_seconds = 0.0
+    games = 0
+
+    for _ in range(rounds):
+        for seed in seeds:
+            result = play_scenario(seed, agent)
+            per_seed[seed].append(result['seconds'])
+            outcomes[seed] = (result['winner'], result['turns'])
+            total_seconds += result['seconds']
+            games += 1
+
+    latencies_ms = [t * 1000 for t in agent.latencies]
+    return {
+        'backend': name,
+        'rounds': rounds,
+        'games_per_sec': games / total_seconds if total_seconds else 0.0,
+        'decisions_per_sec': len(latencies_ms) / total_seconds if total_seconds else 0.0,
+        'latency_ms': {
+            'p50': percentile(latencies_ms, 50),
+            'p95': percentile(latencies_ms, 95),
+            'p99': percentile(latencies_ms, 99),
+        },
+        'games': [
+            {
+                'seed': seed,
+                'winner': outcomes[seed][0],
+                'turns': outcomes[seed][1],
+                'seconds': statistics.median(per_seed[seed]),
+            }
+            for seed in seeds
+        ],
+        'latencies_ms': latencies_ms,
+    }
+
+
+def compare_to_baseline(report, baseline):
+    """Vraća listu značajnih usporenja u odnosu na baseline"""
+    slowdowns = []
+
+    old_games = {g['seed']: g for g in baseline['games']}
+    pairs = [(old_games[g['seed']], g) for g in report['games'] if g['seed'] in old_games]
+
+    old_times = [o['seconds'] for o, _ in pairs]
+    new_times = [n['seconds'] for _, n in pairs]
+    if pairs:
+        ratio = statistics.median(new_times) / statistics.median(old_times)
+        p_value = wilcoxon_greater(old_times, new_times)
+        print(f"  game time: x{ratio:.3f} (p={p_value:.4f}, {len(pairs)} scenarija)")
+        if p_value < SIGNIFICANCE and ratio > MIN_SLOWDOWN:
+            slowdowns.append(('game_seconds', ratio, p_value))
+
+    old_lat = baseline['latencies_ms']
+    new_lat = report['latencies_ms']
+    if old_lat and new_lat:
+        ratio = percentile(new_lat, 50) / percentile(old_lat, 50)
+        p_value = mann_whitney_greater(old_lat, new_lat)
+        print(f"  decision latency p50: x{ratio:.3f} (p={p_value:.4f})")
+        if p_value < SIGNIFICANCE and ratio > MIN_SLOWDOWN:
+            slowdowns.append(('decision_latency', ratio, p_value))
+
+    # Drugačiji ishodi znače da se promijenilo ponašanje, ne samo brzina
+    changed = [n['seed'] for o, n in pairs
+               if (o['winner'], o['turns']) != (n['winner'], n['turns'])]
+    if changed:
+        print(f"  NAPOMENA: ishod se promijenio za {len(changed)} scenarija: {changed[:10]}")
+
+    return slowdowns
+
+
+def _baseline_path(backend):
+    return os.path.join(BASELINE_DIR, f"macro_{backend}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Games-per-second macro benchmark")
+    parser.add_argument('--backend', nargs='+', default=list(AGENT_BACKENDS),
+                        choices=sorted(AGENT_BACKENDS))
+    parser.add_argument('--scenarios', type=int, default=len(SCENARIO_SEEDS),
+                        help="Koliko scenarija iz korpusa pokrenuti")
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--output', help="JSON datoteka za rezultate")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Skupi metrike po turn-u i spremi ih (.json ili .csv)")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+
+    seeds = SCENARIO_SEEDS[:args.scenarios]
+    reports = []
+    exit_code = 0
+
+    for backend in args.backend:
+        report = run_backend(backend, seeds, args.rounds)
+        reports.append(report)
+        lat = report['latency_ms']
+        print(f"[{backend}] {report['games_per_sec']:.2f} games/s, "
+              f"{report['decisions_per_sec']:.1f} decisions/s, "
+              f"latency p50={lat['p50']:.2f} p95={lat['p95']:.2f} p99={lat['p99']:.2f} ms")
+
+        path = _baseline_path(backend)
+        if args.save_baseline:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"  baseline spremljen u {path}")
+        elif os.path.exists(path):
+            with open(path) as f:
+                baseline = json.load(f)
+            slowdowns = compare_to_baseline(report, baseline)
+            for metric, ratio, p_value in slowdowns:
+                print(f"  SLOWDOWN: {metric} x{ratio:.3f} (p={p_value:.4f})")
+                exit_code = 1
+        else:
+            print("  nema baseline-a (pokreni s --save-baseline)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+    if args.metrics:
+        metrics.dump(args.metrics)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
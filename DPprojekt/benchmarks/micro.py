@@ -0,0 +1,282 @@
+# ============================================================================
+# DATOTEKA: benchmarks/micro.py
+# Uloga: Mikro-benchmarkovi za vruće putanje enginea
+# ============================================================================
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.micro
+#   python3 -m benchmarks.micro --sizes 6 12 24 --enemies 2 8 32 --output novi.json
+#   python3 -m benchmarks.micro --compare stari.json novi.json
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from types import SimpleNamespace
+
+from game.map import GameMap
+from game.pathfinding import find_path_bfs, get_next_move_away_from
+from game import state as game_state
+from game.influence import InfluenceMap
+from game.terrain import ChunkedTerrain
+from game.tiles import TileTables
+from game.walk import WalkDistances
+from entities.player import Player
+from entities.enemy import RangeEnemy, MeleeEnemy
+from config.constants import TERRAIN_GRASS, TERRAIN_MOUNTAIN, TERRAIN_WATER
+
+DEFAULT_SIZES = [6, 12, 24]
+DEFAULT_ENEMIES = [2, 8, 32]
+DEFAULT_REPEAT = 5
+REGRESSION_THRESHOLD = 1.10  # 10% sporije = regresija
+
+
+def _make_scenario(size, enemy_count, seed):
+    """Generira mapu, playera i neprijatelje za jednu točku sweep-a"""
+    random.seed(seed)
+    game_map = GameMap(size, size)
+
+    player_pos = game_map.get_random_walkable_position()
+    player = Player(*player_pos)
+
+    taken = [player_pos]
+    enemies = []
+    for i in range(min(enemy_count, size * size - 1)):
+        pos = game_map.get_random_walkable_position(exclude=taken)
+        taken.append(pos)
+        enemy_class = RangeEnemy if i % 2 == 0 else MeleeEnemy
+        enemies.append(enemy_class(pos[0], pos[1]))
+
+    return game_map, player, enemies
+
+
+def _raw_grid(size, seed):
+    """Sirova mapa prije _ensure_playability (s izoliranim tile-ovima)"""
+    rng = random.Random(seed)
+    grid = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            rand = rng.random()
+            if rand < 0.80:
+                row.append(TERRAIN_GRASS)
+            elif rand < 0.90:
+                row.append(TERRAIN_MOUNTAIN)
+            else:
+                row.append(TERRAIN_WATER)
+        grid.append(row)
+    return grid
+
+
+def _measure(func, repeat):
+    """Mjeri vrijeme po pozivu (u mikrosekundama) kao timeit"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'number': number,
+        'min_us': min(times),
+        'median_us': statistics.median(times),
+        'mean_us': statistics.fmean(times),
+    }
+
+
+def _state_for(game_map, player, enemies, grid_size):
+    """Isti format kao GameLoop._prepare_game_state"""
+    return {
+        'player': {'x': player.x, 'y': player.y, 'hp': player.hp},
+        'enemies': [
+            {
+                'type': type(e).__name__.lower().replace('enemy', ''),
+                'x': e.x,
+                'y': e.y,
+                'hp': e.hp
+            }
+            for e in enemies if e.hp > 0
+        ],
+        'terrain': game_map.rows,
+        'actions_left': 2,
+        'grid_size': grid_size
+    }
+
+
+def _load_prolog_agent():
+    """Vraća (agent, None) ili (None, razlog) ako SWI-Prolog nije dostupan"""
+    try:
+        from prolog_comm import PrologAgent
+        return PrologAgent(), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def bench_point(size, enemy_count, repeat, agent, seed=0):
+    """Pokreće sve benchmarkove za jednu (grid, enemies) kombinaciju"""
+    from game_loop import GameLoop
+
+    game_map, player, enemies = _make_scenario(size, enemy_count, seed)
+    # Bez neprijatelja (ili bez range jedinice) mjerenja koja ih trebaju se preskaču
+    mover = enemies[0] if enemies else None
+    range_enemy = next((e for e in enemies if isinstance(e, RangeEnemy)), None)
+    loop_stub = SimpleNamespace(game_map=game_map)
+    flat_terrain = game_map.terrain.flat()
+    terrain_array = game_map._terrain_array()
+
+    benches = []
+    if mover is not None:
+        occupied = mover._get_occupied_positions(player, enemies)
+        benches += [
+            ('find_path_bfs', lambda: find_path_bfs(
+                mover.x, mover.y, player.x, player.y, game_map, occupied)),
+            ('get_next_move_away_from', lambda: get_next_move_away_from(
+                mover, player, game_map, occupied)),
+        ]
+    if range_enemy is not None:
+        benches += [
+            ('enemy_has_line_of_sight', lambda: range_enemy._has_line_of_sight(
+                player, game_map)),
+            ('game_loop_has_line_of_sight', lambda: GameLoop._has_line_of_sight(
+                loop_stub, range_enemy, player)),
+        ]
+    benches += [
+        ('map_generate', game_map._generate_map),
+        ('influence_map', lambda: InfluenceMap(terrain_array, player.x, player.y)),
+        ('tile_tables', lambda: TileTables(terrain_array)),
+        ('walk_all_pairs', lambda: WalkDistances(
+            flat_terrain, game_map.width, game_map.height, diagonal=True).table),
+    ]
+
+    snapshot = game_state.make_state(
+        game_map.rows,
+        [(u.KIND, u.x, u.y, u.hp) for u in [player] + enemies]
+    )
+    if mover is not None:
+        move = ('move', *(find_path_bfs(player.x, player.y, mover.x, mover.y, game_map, occupied)
+                          or (player.x, player.y)))
+        attack = ('melee_attack', mover.x, mover.y, 2)
+        benches += [
+            ('state_apply_move', lambda: game_state.apply(snapshot, 0, move)),
+            ('state_apply_attack', lambda: game_state.apply(snapshot, 0, attack)),
+        ]
+
+    raw = _raw_grid(size, seed)
+    benches.append(('map_ensure_connectivity', lambda: game_map._ensure_connectivity(
+        ChunkedTerrain.from_rows(raw))))
+
+    if agent is not None:
+        state = _state_for(game_map, player, enemies, size)
+        query = agent._build_query(state)
+        results = list(agent.prolog.query(query, maxresult=1))
+        action_term = results[0]['Action'] if results else 'no_action'
+        benches += [
+            ('prolog_build', lambda: agent._build_query(state)),
+            ('prolog_query', lambda: list(agent.prolog.query(query, maxresult=1))),
+            ('prolog_parse', lambda: agent._parse_action(action_term, state)),
+        ]
+
+    rows = []
+    for name, func in benches:
+        row = {'name': name, 'grid': size, 'enemies': len(enemies)}
+        row.update(_measure(func, repeat))
+        rows.append(row)
+    return rows
+
+
+def _git_revision():
+    """Trenutni git commit (ako postoji)"""
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, enemy_counts, repeat):
+    """Sweep po veličinama mape i broju neprijatelja"""
+    agent, skip_reason = _load_prolog_agent()
+
+    results = []
+    for size in sizes:
+        for enemy_count in enemy_counts:
+            rows = bench_point(size, enemy_count, repeat, agent)
+            for row in rows:
+                print(f"{row['name']:<30} grid={row['grid']:<4} enemies={row['enemies']:<4} "
+                      f"median={row['median_us']:10.2f} us  min={row['min_us']:10.2f} us")
+            results.extend(rows)
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'prolog_skipped': skip_reason,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=REGRESSION_THRESHOLD):
+    """Uspoređuje dva rezultata - vraća listu regresija"""
+    def key(row):
+        return (row['name'], row['grid'], row['enemies'])
+
+    old_rows = {key(row): row for row in old['results']}
+    regressions = []
+
+    print(f"{old['meta'].get('revision')} -> {new['meta'].get('revision')}")
+    for row in new['results']:
+        base = old_rows.get(key(row))
+        if base is None:
+            continue
+        ratio = row['median_us'] / base['median_us']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions.append((key(row), ratio))
+        print(f"{row['name']:<30} grid={row['grid']:<4} enemies={row['enemies']:<4} "
+              f"{base['median_us']:10.2f} -> {row['median_us']:10.2f} us  x{ratio:.2f}{flag}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mikro-benchmarkovi za engine")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--enemies', type=int, nargs='+', default=DEFAULT_ENEMIES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', help="JSON datoteka za rezultate")
+    parser.add_argument('--compare', nargs=2, metavar=('STARI', 'NOVI'),
+                        help="Usporedi dva JSON rezultata")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        return 1 if regressions else 0
+
+    report = run(args.sizes, args.enemies, args.repeat)
+    if report['meta']['prolog_skipped']:
+        print(f"Prolog benchmarkovi preskočeni: {report['meta']['prolog_skipped']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Rezultati spremljeni u {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+# ============================================================================
+# DATOTEKA: benchmarks/parity.py
+# Uloga: Provjere pariteta - alternativni putevi moraju dati isti rezultat kao GameLoop
+# ============================================================================
+#
+# Provjere (svaka vraća listu razlika, prazna lista = prolazi):
+#   state   - game.state.apply nakon svake akcije (player i neprijatelji) daje
+#             isto stanje kao GameLoop._execute_action; StateHistory.undo
+#             vraća točno prethodno stanje
+#   zobrist - inkrementalni hash GameLoop-a (game/zobrist.py) nakon svake
+#             akcije i promjene strane jednak je punom hash_state snapshot-a
+#   batch   - game/batch.py (NumPy lockstep) daje iste ishode kao GameLoop
+#   codec   - StateEncoder zapis dekodiran Python zrcalom čitača iz
+#             prolog/batch.pl vraća ista stanja, decode_actions vraća akcije
+#             zapisane u izlaznom formatu (sam batch.pl se izvodi u provjeri bulk)
+#   prolog  - agent.pl kroz pyswip: best_action/3 s max_depth 0 bira isto
+#             što i GreedyAgent, a pretraga (max_depth > 0) vraća valjanu
+#             akciju unutar budžeta; enemy_action/3 i enemy_turn/3 (odgovor
+#             neprijatelja u pretrazi, s BFS-om i kitingom) daju isto što i
+#             monte_carlo_agent.enemy_action / enemy_turn nad game.state.
+#             Bitmape koje šalje load_tile_tables/5 jednake su onima koje
+#             agent.pl sam gradi (build_tile_tables), ensure_tile_tables/2 i
+#             nb_getval(tile_set) biraju učitani skup, a unload_tile_tables/1
+#             (i izbacivanje starih skupova) briše sve činjenice skupa;
+#             walk_distance iz walk_row/4 (load_walk_tables/3) daje iste
+#             udaljenosti kao game/walk.py. Bez SWI-Prologa se preskače.
+#   bulk    - solve_file/2 iz prolog/batch.pl kroz pyswip (get_actions_bulk)
+#             vraća iste akcije kao get_action po stanju, s max_depth 0.
+#             Bez SWI-Prologa se preskače.
+# Izlazni kod je 1 ako ijedna provjera nađe razliku (preskočena ne broji).
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.parity
+#   python3 -m benchmarks.parity --games 500 --checks state zobrist
+
+import argparse
+import random
+import struct
+import sys
+import time
+
+from game import state as game_state
+from game.terrain import flat_terrain
+from game.walk import walk_distances
+from game.zobrist import hash_state
+from game_loop import GameLoop
+from monte_carlo_agent import (
+    GreedyAgent, candidate_actions, enemy_action, enemy_turn, state_from_dict
+)
+from benchmarks.batch import make_games, run_batch, run_scalar
+from benchmarks.bulk import collect_states
+from benchmarks.micro import _load_prolog_agent
+from prolog_codec import (
+    StateEncoder, decode_actions, ENEMY_CODES, OPTIONS_TAG, STATE_TAG, ACTION_NAMES
+)
+from config.constants import AGENT_WEIGHTS, HEADLESS_MAX_TURNS
+
+DEFAULT_GAMES = 200
+FIRST_SEED = 5000
+
+# Koliko razlika ispisati po provjeri
+SHOWN = 5
+
+# Pretraga u agent.pl provjerava rok po čvoru - dopušteno prekoračenje budžeta
+SEARCH_DEPTH = 2
+SEARCH_BUDGET = 0.2
+SEARCH_SLACK = 0.3
+
+
+class CheckSkipped(Exception):
+    """Provjera se ne može izvesti u ovom okruženju (npr. nema SWI-Prologa)"""
+
+
+class CheckedLoop(GameLoop):
+    """GameLoop koji svaku akciju ponovi nad snapshot-om i uspoređuje"""
+    def __init__(self, *args, **kwargs):
+        self.mismatches = []
+        self.hash_mismatches = []
+        super().__init__(*args, **kwargs)
+
+    def _check_hash(self, label):
+        enemies_to_move = self.turn_manager.current_turn == 'enemies'
+        expected = hash_state(game_state.from_game(self), enemies_to_move)
+        if self.zobrist.value != expected:
+            self.hash_mismatches.append((self.turn_manager.turn_number, label))
+
+    def _update(self, dt):
+        turn = self.turn_manager.turn_number
+        super()._update(dt)
+        if self.turn_manager.turn_number != turn:
+            self._check_hash('turn')
+
+    def _actor_index(self, entity):
+        if entity is self.player:
+            return game_state.PLAYER_INDEX
+        return self.enemies.index(entity) + 1
+
+    def _execute_action(self, entity, action):
+        before = game_state.from_game(self)
+        actor = self._actor_index(entity)
+        compact = game_state.action_from_dict(action)
+        super()._execute_action(entity, action)
+
+        after = game_state.from_game(self)
+        expected = game_state.apply(before, actor, compact)
+        if expected != after:
+            self.mismatches.append((self.turn_manager.turn_number, compact,
+                                    expected[game_state.UNITS], after[game_state.UNITS]))
+
+        history = game_state.StateHistory(before)
+        history.apply(actor, compact)
+        if history.undo() is not before or len(history):
+            self.mismatches.append((self.turn_manager.turn_number, compact, 'undo', None))
+        self._check_hash(compact)
+
+
+def _play_checked(games, seed):
+    """Seed-ane greedy partije kroz CheckedLoop"""
+    agent = GreedyAgent()
+    for offset in range(games):
+        random.seed(seed + offset)
+        game = CheckedLoop(headless=True, agent=agent)
+        game._check_hash('start')
+        game.play_headless()
+        yield seed + offset, game
+
+
+def check_state(games, seed=FIRST_SEED):
+    """state.apply (i StateHistory) naspram GameLoop-a nakon svake akcije"""
+    mismatches = []
+    for game_seed, game in _play_checked(games, seed):
+        mismatches += [(game_seed,) + item for item in game.mismatches]
+    return mismatches
+
+
+def check_zobrist(games, seed=FIRST_SEED):
+    """Inkrementalni Zobrist hash GameLoop-a naspram punog hash-a"""
+    mismatches = []
+    for game_seed, game in _play_checked(games, seed):
+        mismatches += [(game_seed,) + item for item in game.hash_mismatches]
+    return mismatches
+
+
+def check_batch(games, seed=FIRST_SEED, max_turns=HEADLESS_MAX_TURNS):
+    """Batch engine naspram GameLoop-a - isti pobjednik i broj turn-ova"""
+    seeds = range(seed, seed + games)
+    loops = make_games(seeds, GreedyAgent())
+    states = [game_state.from_game(game) for game in loops]
+    batch_results, _seconds = run_batch(states, max_turns)
+    scalar_results, _seconds = run_scalar(loops, max_turns)
+    return [
+        (s, scalar, batched)
+        for s, scalar, batched in zip(seeds, scalar_results, batch_results)
+        if scalar != batched
+    ]
+
+
+def _unpack_terrain(data, offset, width, height):
+    """Obrnuto od prolog_codec.pack_terrain - vraća (redovi, novi offset)"""
+    cells = width * height
+    size = (cells + 3) // 4
+    flat = [(data[offset + i // 4] >> (2 * (i % 4))) & 3 for i in range(cells)]
+    return [flat[y * width:(y + 1) * width] for y in range(height)], offset + size
+
+
+def decode_states(data):
+    """Ulazni stream StateEncoder-a -> (opcije, lista game_state dict-ova) kao batch.pl"""
+    kinds = {code: name for name, code in ENEMY_CODES.items()}
+    options = []
+    states = []
+    terrain = None
+    offset = 0
+    while offset < len(data):
+        tag = data[offset]
+        offset += 1
+        if tag == OPTIONS_TAG:
+            budget, depth, count = struct.unpack_from('<HBB', data, offset)
+            offset += 4
+            weights = struct.unpack_from(f'<{count}H', data, offset)
+            offset += 2 * count
+            options.append((budget / 1000, depth, dict(zip(AGENT_WEIGHTS, weights))))
+        elif tag == STATE_TAG:
+            width, height, actions_left, grid_size, px, py, php, count = data[offset:offset + 8]
+            offset += 8
+            enemies = []
+            for _ in range(count):
+                kind, x, y, hp = data[offset:offset + 4]
+                offset += 4
+                enemies.append({'type': kinds[kind], 'x': x, 'y': y, 'hp': hp})
+            flag = data[offset]
+            offset += 1
+            if flag:
+                terrain, offset = _unpack_terrain(data, offset, width, height)
+            states.append({
+                'player': {'x': px, 'y': py, 'hp': php},
+                'enemies': enemies,
+                'terrain': terrain,
+                'actions_left': actions_left,
+                'grid_size': grid_size,
+            })
+        else:
+            raise ValueError(f"Nepoznat zapis {tag} na {offset - 1}")
+    return options, states
+
+
+def _strip(state):
+    """Samo polja koja se kodiraju"""
+    return {
+        'player': {key: state['player'][key] for key in ('x', 'y', 'hp')},
+        'enemies': [{key: e[key] for key in ('type', 'x', 'y', 'hp')} for e in state['enemies']],
+        'terrain': [list(row) for row in state['terrain']],
+        'actions_left': state['actions_left'],
+        'grid_size': state['grid_size'],
+    }
+
+
+def check_codec(games, seed=FIRST_SEED):
+    """StateEncoder -> decode_states i zapis akcija -> decode_actions"""
+    states = collect_states(games * 4, seed)
+    encoder = StateEncoder()
+    encoder.options(0.05, 2, AGENT_WEIGHTS)
+    for state in states:
+        encoder.state(state)
+    options, decoded = decode_states(encoder.getvalue())
+
+    mismatches = []
+    if options != [(0.05, 2, dict(AGENT_WEIGHTS))]:
+        mismatches.append(('options', options))
+    if len(decoded) != len(states):
+        mismatches.append(('count', len(states), len(decoded)))
+    for index, (state, back) in enumerate(zip(states, decoded)):
+        if _strip(state) != back:
+            mismatches.append(('state', index))
+
+    # Izlazni zapis: tag p0 p1 (unsigned) p2 p3 (signed), kao write_action u batch.pl
+    tags = {name: tag for tag, name in ACTION_NAMES.items()}
+    actions = [None, ('move', [3, 4]), ('melee_attack', [1, 2, 2]),
+               ('melee_push', [5, 0, -1, 1]), ('range_attack', [0, 5, 1])]
+    data = b''
+    for action in actions:
+        if action is None:
+            data += struct.pack('<3B2b', 0, 0, 0, 0, 0)
+        else:
+            name, params = action
+            padded = params + [0] * (4 - len(params))
+            data += struct.pack('<3B2b', tags[name], *padded)
+    if decode_actions(data) != actions:
+        mismatches.append(('actions', decode_actions(data)))
+    return mismatches
+
+
+def _compact(action):
+    return game_state.action_from_dict(action) if action else None
+
+
+def _prolog_agent():
+    agent, reason = _load_prolog_agent()
+    if agent is None:
+        raise CheckSkipped(reason)
+    return agent
+
+
+def _prolog_enemy_action(agent, state, index):
+    """enemy_action/3 iz agent.pl kao kompaktni tuple (None = no_action)"""
+    agent._sync_tile_tables(state['terrain'])
+    query = f"enemy_action({agent._format_state(state)},{index},Action)"
+    results = list(agent.prolog.query(query, maxresult=1))
+    if not results:
+        return 'fail'
+    term = str(results[0]['Action'])
+    if '(' not in term:
+        return None
+    return (term[:term.index('(')],) + tuple(int(p) for p in agent._extract_params(term))
+
+
+def _prolog_enemy_turn(agent, state):
+    """enemy_turn/3 iz agent.pl kao jedinice game.state snapshot-a (player prvi)"""
+    agent._sync_tile_tables(state['terrain'])
+    query = (
+        f"enemy_turn({agent._format_state(state)},player(PX,PY,PHP),Enemies),"
+        f"findall([X,Y,HP],member(enemy(_,X,Y,HP),Enemies),Units)"
+    )
+    result = list(agent.prolog.query(query, maxresult=1))[0]
+    return [(result['PX'], result['PY'], result['PHP'])] + [tuple(unit) for unit in result['Units']]
+
+
+def _query(agent, query):
+    """Prvo rješenje upita (dict) ili None"""
+    results = list(agent.prolog.query(query, maxresult=1))
+    return results[0] if results else None
+
+
+def _check_tile_tables(agent, states):
+    """Skupovi tablica iz Pythona naspram Prolog gradnje, odabir i brisanje skupova"""
+    from prolog_comm import PrologAgent
+
+    terrains = {}
+    for state in states:
+        terrains.setdefault(flat_terrain(state['terrain']), state['terrain'])
+
+    mismatches = []
+    loaded = set()
+    for key, terrain in terrains.items():
+        agent._sync_tile_tables(terrain)
+        table_id = PrologAgent._table_sets[key]
+        loaded.add(table_id)
+        terrain_term = agent._format_terrain(terrain)
+        size = len(terrain)
+
+        # ensure_tile_tables/2 bira skup iz Pythona, accessori čitaju iz njega
+        chosen = _query(agent, f"ensure_tile_tables({terrain_term},{size}),"
+                               f"nb_getval(tile_set,Id)")
+        if chosen is None or chosen['Id'] != table_id:
+            mismatches.append(('ensure', table_id, chosen and chosen['Id']))
+        wrong = _query(agent, f"findall(I,(los_mask({table_id},I,M),\\+ los_mask(I,M)),Bad)")
+        if wrong['Bad']:
+            mismatches.append(('tile_set', table_id, wrong['Bad'][:SHOWN]))
+
+        # Ista pravila u agent.pl (bez Pythona) daju iste bitmape
+        compared = _query(agent, (
+            f"build_tile_tables({terrain_term},{size}),"
+            f"aggregate_all(count,los_mask(local,_,_),Count),"
+            f"findall(I,(los_mask({table_id},I,L),fire_mask({table_id},I,F),"
+            f"step_mask({table_id},I,S),adjacent_mask({table_id},I,A),"
+            f"\\+ (los_mask(local,I,L),fire_mask(local,I,F),"
+            f"step_mask(local,I,S),adjacent_mask(local,I,A))),Tiles),"
+            f"findall(T,(terrain_mask({table_id},T,M),\\+ terrain_mask(local,T,M)),Kinds),"
+            f"unload_tile_tables(local)"
+        ))
+        if compared is None:
+            mismatches.append(('build', table_id, None))
+        elif compared['Count'] != size * size or compared['Tiles'] or compared['Kinds']:
+            mismatches.append(('build', table_id, compared['Count'],
+                               compared['Tiles'][:SHOWN], compared['Kinds']))
+        if _query(agent, "(tile_set(local,_) ; los_mask(local,_,_))") is not None:
+            mismatches.append(('unload', 'local'))
+
+    # Skupovi izbačeni iz PrologAgent._table_sets nemaju više nijednu činjenicu
+    for table_id in loaded - set(PrologAgent._table_sets.values()):
+        left = _query(agent, (
+            f"(tile_set({table_id},_) ; los_mask({table_id},_,_) ; fire_mask({table_id},_,_) ; "
+            f"step_mask({table_id},_,_) ; adjacent_mask({table_id},_,_) ; "
+            f"terrain_mask({table_id},_,_) ; walk_row({table_id},_,_,_))"
+        ))
+        if left is not None:
+            mismatches.append(('unload', table_id))
+    return mismatches
+
+
+def _check_walk_tables(agent, states):
+    """walk_row/4 retci i walk_distance/7 naspram WalkDistances, od pozicije playera"""
+    from prolog_comm import PrologAgent
+
+    mismatches = []
+    seen = set()
+    for state in states:
+        key = flat_terrain(state['terrain'])
+        if key in seen:
+            continue
+        seen.add(key)
+        agent._sync_tile_tables(state['terrain'])
+        table_id = PrologAgent._table_sets[key]
+        width, height = len(state['terrain'][0]), len(state['terrain'])
+        px, py = state['player']['x'], state['player']['y']
+
+        for directions, diagonal in ((8, True), (4, False)):
+            distances = walk_distances(key, width, height, diagonal)
+            rows = _query(agent, f"aggregate_all(count,walk_row({table_id},{directions},_,_),Rows)")
+            expected_rows = width * height if distances is not None else 0
+            if rows['Rows'] != expected_rows:
+                mismatches.append(('walk_rows', table_id, directions, expected_rows, rows['Rows']))
+            if distances is None:
+                continue
+            expected = [distances.distance(px, py, j % width, j // width)
+                        for j in range(width * height)]
+            expected = [-1 if d is None else d for d in expected]
+            result = _query(agent, (
+                f"nb_setval(tile_set,{table_id}),"
+                f"findall(D,(between(0,{width * height - 1},J),X is J mod {width},"
+                f"Y is J // {width},(walk_distance({directions},{px},{py},X,Y,{width},W)"
+                f" -> D = W ; D = (-1))),Ds)"
+            ))
+            if result['Ds'] != expected:
+                mismatches.append(('walk', table_id, directions, (px, py)))
+    return mismatches
+
+
+def check_prolog(games, seed=FIRST_SEED):
+    """best_action/3 iz agent.pl naspram GreedyAgent-a (dubina 0) i pravila igre (pretraga)"""
+    agent = _prolog_agent()
+    greedy = GreedyAgent()
+    states = collect_states(games, seed)
+
+    mismatches = []
+    agent.max_depth = 0
+    for index, state in enumerate(states):
+        expected = _compact(greedy.get_action(state))
+        chosen = _compact(agent.get_action(state))
+        if chosen != expected:
+            mismatches.append(('greedy', index, expected, chosen))
+
+    agent.max_depth = SEARCH_DEPTH
+    agent.time_budget = SEARCH_BUDGET
+    for index, state in enumerate(states):
+        legal = {action for _priority, action in candidate_actions(state_from_dict(state))} or {None}
+        start = time.perf_counter()
+        chosen = _compact(agent.get_action(state))
+        elapsed = time.perf_counter() - start
+        if chosen not in legal:
+            mismatches.append(('search', index, chosen))
+        if elapsed > SEARCH_BUDGET + SEARCH_SLACK:
+            mismatches.append(('budget', index, round(elapsed, 3)))
+
+    # Odgovor neprijatelja iz pretrage naspram pravila igre
+    for index, state in enumerate(states):
+        snapshot = state_from_dict(state)
+        for actor in range(1, len(snapshot[game_state.UNITS])):
+            expected = enemy_action(snapshot, actor)
+            chosen = _prolog_enemy_action(agent, state, actor)
+            if chosen != expected:
+                mismatches.append(('enemy', index, actor, expected, chosen))
+        expected = [unit[1:] for unit in enemy_turn(snapshot)[game_state.UNITS]]
+        after = _prolog_enemy_turn(agent, state)
+        if after != expected:
+            mismatches.append(('enemy_turn', index, expected, after))
+
+    table_states = collect_states(games * 4, seed)
+    mismatches += _check_walk_tables(agent, table_states)
+    mismatches += _check_tile_tables(agent, table_states)
+    return mismatches
+
+
+def check_bulk(games, seed=FIRST_SEED):
+    """get_actions_bulk (batch.pl čitač i pisač) naspram get_action po stanju"""
+    agent = _prolog_agent()
+    agent.max_depth = 0
+    states = collect_states(games * 4, seed)
+    single = [_compact(agent.get_action(state)) for state in states]
+    bulk = [_compact(action) for action in agent.get_actions_bulk(states)]
+
+    mismatches = []
+    if len(bulk) != len(states):
+        mismatches.append(('count', len(states), len(bulk)))
+    for index, (expected, chosen) in enumerate(zip(single, bulk)):
+        if chosen != expected:
+            mismatches.append((index, expected, chosen))
+    return mismatches
+
+
+CHECKS = {
+    'state': check_state,
+    'zobrist': check_zobrist,
+    'batch': check_batch,
+    'codec': check_codec,
+    'prolog': check_prolog,
+    'bulk': check_bulk,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provjere pariteta s GameLoop-om")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES,
+                        help="Broj seed-anih partija po provjeri")
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), default=list(CHECKS))
+    parser.add_argument('--seed', type=int, default=FIRST_SEED)
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name in args.checks:
+        try:
+            mismatches = CHECKS[name](args.games, args.seed)
+        except CheckSkipped as e:
+            print(f"{name}: preskočeno ({e})")
+            continue
+        if mismatches:
+            failed += 1
+            print(f"{name}: RAZLIKA ({len(mismatches)}), npr. {mismatches[:SHOWN]}")
+        else:
+            print(f"{name}: isto ({args.games} partija)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# ============================================================================
+# DATOTEKA: benchmarks/soak.py
+# Uloga: Soak test - partije jedna za drugom, praćenje rasta memorije
+# ============================================================================
+#
+# Igra headless partije bez kraja (ili do --duration / --games) i svakih
+# --interval sekundi uzima uzorak:
+#   traced     - Python heap (tracemalloc, trenutno alocirano)
+#   rss        - resident memorija procesa (/proc/self/statm)
+#   objects    - broj GC-praćenih objekata, ukupno i po tipu
+#   swi.*      - SWI statistike (atomi, funktori, klauzule, stackovi,
+#                tabling) i je li pyswip upit ostao otvoren
+# Prvi uzorak je nakon --warmup partija (keševi se napune), pa je rast
+# mjeren od tamo. Na kraju se ispisuje trend svake metrike (nagib po
+# partiji i po satu, R^2), tipovi objekata koji rastu i mjesta u kodu koja
+# su alocirala najviše od prvog uzorka (tracemalloc usporedba snapshot-a).
+#
+# --restart reset ponovno koristi isti GameLoop (GameLoop.reset), a
+# recreate stvara novi za svaku partiju kao run_batch u main.py.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.soak --backend prolog                 # do Ctrl+C
+#   python3 -m benchmarks.soak --backend greedy --duration 600 --interval 30
+#   python3 -m benchmarks.soak --restart recreate --games 5000 --output soak.json
+
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+from collections import Counter
+
+from benchmarks.macro import AGENT_BACKENDS
+from benchmarks.stats import slope
+from game_loop import GameLoop
+
+SWI_STATISTICS = ('atoms', 'functors', 'clauses', 'globalused', 'localused',
+                  'trailused', 'table_space_used')
+
+# Tipovi s manje objekata se ne prate po uzorku
+MIN_TYPE_COUNT = 50
+TOP_SITES = 10
+TOP_TYPES = 10
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _swi_statistics(agent):
+    """SWI statistike agenta ili {} ako agent nema lokalni engine"""
+    prolog = getattr(agent, 'prolog', None)
+    if prolog is None:
+        return {}
+    values = {}
+    for key in SWI_STATISTICS:
+        # Ključevi kojih nema u ovoj verziji SWI-a se preskaču
+        result = list(prolog.query(f"catch(statistics({key},V),_,fail)"))
+        if result:
+            values[f"swi.{key}"] = result[0]['V']
+    # pyswip dopušta jedan otvoren upit - ako ostane otvoren, svi sljedeći padaju
+    values['swi.query_open'] = int(bool(getattr(type(prolog), '_queryIsOpen', False)))
+    return values
+
+
+def take_sample(agent, games, start):
+    gc.collect()
+    types = Counter(type(obj).__name__ for obj in gc.get_objects())
+    current, peak = tracemalloc.get_traced_memory()
+    sample = {
+        'seconds': time.perf_counter() - start,
+        'games': games,
+        'traced': current,
+        'traced_peak': peak,
+        'rss': _rss_bytes(),
+        'objects': sum(types.values()),
+        'types': {name: count for name, count in types.items() if count >= MIN_TYPE_COUNT},
+    }
+    sample.update(_swi_statistics(agent))
+    return sample
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def play_game(game, agent, restart, seed):
+    """Jedna partija - vraća (GameLoop, pobjednik ili 'draw')"""
+    random.seed(seed)
+    if game is None or restart == 'recreate':
+        game = GameLoop(headless=True, agent=agent)
+    else:
+        game.reset()
+    return game, game.play_headless() or 'draw'
+
+
+_PLAY_LINES = {line for _, _, line in play_game.__code__.co_lines() if line}
+
+
+def _is_own(traceback):
+    """Alokacija samog soak-a (uzorci, izvještaj), a ne igre"""
+    lines = [frame.lineno for frame in traceback if frame.filename == __file__]
+    return bool(lines) and not _PLAY_LINES.intersection(lines)
+
+
+def top_sites(baseline, snapshot, limit=TOP_SITES):
+    """Mjesta s najvećim rastom alokacija od baseline snapshot-a"""
+    sites = []
+    for stat in snapshot.compare_to(baseline, 'traceback'):
+        if stat.size_diff <= 0 or len(sites) >= limit:
+            break
+        if _is_own(stat.traceback):
+            continue
+        sites.append({
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        })
+    return sites
+
+
+def trends(samples):
+    """Nagib svake numeričke metrike po partiji i po satu"""
+    games = [s['games'] for s in samples]
+    hours = [s['seconds'] / 3600 for s in samples]
+    result = {}
+    for name in samples[0]:
+        if name in ('seconds', 'games', 'types'):
+            continue
+        values = [s.get(name) for s in samples]
+        if any(v is None for v in values):
+            continue
+        per_game, r_squared = slope(games, values)
+        per_hour, _ = slope(hours, values)
+        result[name] = {'per_game': per_game, 'per_hour': per_hour, 'r2': r_squared,
+                        'first': values[0], 'last': values[-1]}
+    return result
+
+
+def growing_types(samples, limit=TOP_TYPES):
+    """Tipovi objekata s najvećim rastom po partiji"""
+    games = [s['games'] for s in samples]
+    names = set().union(*(s['types'] for s in samples))
+    growth = []
+    for name in names:
+        counts = [s['types'].get(name, 0) for s in samples]
+        per_game, r_squared = slope(games, counts)
+        if per_game > 0:
+            growth.append({'type': name, 'per_game': per_game, 'r2': r_squared,
+                           'first': counts[0], 'last': counts[-1]})
+    growth.sort(key=lambda g: g['per_game'], reverse=True)
+    return growth[:limit]
+
+
+def soak(agent, restart='reset', duration=None, max_games=None, interval=10.0,
+         warmup=20, seed=0, frames=8, report=print):
+    """Igra dok ne istekne vrijeme, broj partija ili Ctrl+C - vraća izvještaj"""
+    tracemalloc.start(frames)
+    start = time.perf_counter()
+    game = None
+    games = 0
+    samples = []
+    baseline = None
+    next_sample = None
+    results = Counter()
+    try:
+        while max_games is None or games < max_games:
+            if duration is not None and time.perf_counter() - start >= duration:
+                break
+            game, result = play_game(game, agent, restart, seed + games)
+            results[result] += 1
+            games += 1
+
+            now = time.perf_counter()
+            if games == warmup or (baseline is None and games > warmup):
+                baseline = _snapshot()
+                samples.append(take_sample(agent, games, start))
+                next_sample = now + interval
+            elif baseline is not None and now >= next_sample:
+                sample = take_sample(agent, games, start)
+                samples.append(sample)
+                next_sample = now + interval
+                report(f"[{sample['seconds']:7.0f} s] {games} partija, "
+                       f"heap {sample['traced'] / 1e6:.2f} MB, "
+                       f"rss {(sample['rss'] or 0) / 1e6:.1f} MB, objekata {sample['objects']}")
+    except KeyboardInterrupt:
+        pass
+
+    if baseline is None:
+        tracemalloc.stop()
+        return {'games': games, 'error': f"manje od --warmup ({warmup}) partija"}
+
+    samples.append(take_sample(agent, games, start))
+    sites = top_sites(baseline, _snapshot())
+    tracemalloc.stop()
+    return {
+        'restart': restart,
+        'games': games,
+        'seconds': time.perf_counter() - start,
+        'results': dict(results),
+        'trend': trends(samples),
+        'growing_types': growing_types(samples),
+        'top_sites': sites,
+        'samples': samples,
+    }
+
+
+def print_report(report):
+    if 'error' in report:
+        print(f"Soak: {report['games']} partija - {report['error']}")
+        return
+    print(f"\nSoak: {report['games']} partija u {report['seconds']:.0f} s "
+          f"({report['restart']}), ishodi {report['results']}")
+    print(f"\n{'metrika':<22} {'prvi':>14} {'zadnji':>14} {'/partija':>12} {'/sat':>14} {'R^2':>6}")
+    for name, t in report['trend'].items():
+        print(f"{name:<22} {t['first']:>14.0f} {t['last']:>14.0f} "
+              f"{t['per_game']:>12.2f} {t['per_hour']:>14.0f} {t['r2']:>6.2f}")
+
+    if report['growing_types']:
+        print("\nTipovi objekata koji rastu:")
+        for g in report['growing_types']:
+            print(f"  {g['type']:<30} {g['first']:>8} -> {g['last']:<8} "
+                  f"{g['per_game']:+.3f}/partija (R^2 {g['r2']:.2f})")
+
+    if report['top_sites']:
+        print("\nNajveći rast alokacija od prvog uzorka:")
+        for site in report['top_sites']:
+            print(f"  {site['size_diff'] / 1024:+.1f} KiB ({site['count_diff']:+d} blokova)")
+            for line in reversed(site['traceback']):
+                print(f"      {line}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test - dugo igranje i rast memorije")
+    parser.add_argument('--backend', default='prolog', choices=sorted(AGENT_BACKENDS))
+    parser.add_argument('--restart', choices=['reset', 'recreate'], default='reset',
+                        help="reset: isti GameLoop (GameLoop.reset); recreate: novi po partiji")
+    parser.add_argument('--duration', type=float, help="Sekunde (default: do Ctrl+C)")
+    parser.add_argument('--games', type=int, help="Najviše partija")
+    parser.add_argument('--interval', type=float, default=10.0, help="Sekunde između uzoraka")
+    parser.add_argument('--warmup', type=int, default=20,
+                        help="Partija prije prvog uzorka (punjenje keševa)")
+    parser.add_argument('--frames', type=int, default=8, help="Dubina tracemalloc traceback-a")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON datoteka za izvještaj (s uzorcima)")
+    args = parser.parse_args(argv)
+
+    agent = AGENT_BACKENDS[args.backend]()
+    report = soak(agent, args.restart, args.duration, args.games, args.interval,
+                  args.warmup, args.seed, args.frames)
+    if hasattr(agent, 'close'):
+        agent.close()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nIzvještaj spremljen u {args.output}")
+
+
+if __name__ == '__main__':
+    main()
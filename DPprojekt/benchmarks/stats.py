@@ -0,0 +1,112 @@
+# ============================================================================
+# DATOTEKA: benchmarks/stats.py
+# Uloga: Statistika za benchmarkove (percentili, testovi značajnosti)
+# ============================================================================
+
+import math
+
+
+def percentile(values, q):
+    """Percentil q (0-100) s linearnom interpolacijom"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(pos)
+    upper = math.ceil(pos)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def slope(xs, ys):
+    """
+    Nagib pravca najmanjih kvadrata (ys po jedinici xs) i R^2 - trend
+    rasta npr. memorije po odigranoj partiji
+    """
+    n = len(xs)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    if sxx == 0:
+        return 0.0, 0.0
+    r_squared = sxy * sxy / (sxx * syy) if syy else 0.0
+    return sxy / sxx, r_squared
+
+
+def _normal_sf(z):
+    """P(Z > z) za standardnu normalnu razdiobu"""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _rank(values):
+    """Rangovi (1-based) s prosječnim rangom za izjednačene vrijednosti"""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    tie_groups = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        avg = (i + j) / 2.0 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg
+        tie_groups.append(j - i + 1)
+        i = j + 1
+    return ranks, tie_groups
+
+
+def wilcoxon_greater(old, new):
+    """
+    Wilcoxon signed-rank test za uparene uzorke (normalna aproksimacija)
+
+    Returns:
+        p-vrijednost jednostrane hipoteze "new je veći od old"
+    """
+    diffs = [n - o for o, n in zip(old, new) if n != o]
+    count = len(diffs)
+    if count == 0:
+        return 1.0
+
+    ranks, ties = _rank([abs(d) for d in diffs])
+    w_plus = sum(r for r, d in zip(ranks, diffs) if d > 0)
+
+    mean = count * (count + 1) / 4.0
+    var = count * (count + 1) * (2 * count + 1) / 24.0
+    var -= sum(t ** 3 - t for t in ties) / 48.0
+    if var <= 0:
+        return 1.0
+
+    z = (w_plus - mean - 0.5) / math.sqrt(var)
+    return _normal_sf(z)
+
+
+def mann_whitney_greater(old, new):
+    """
+    Mann-Whitney U test za nezavisne uzorke (normalna aproksimacija)
+
+    Returns:
+        p-vrijednost jednostrane hipoteze "new je stohastički veći od old"
+    """
+    n_old, n_new = len(old), len(new)
+    if n_old == 0 or n_new == 0:
+        return 1.0
+
+    ranks, ties = _rank(list(old) + list(new))
+    rank_sum_new = sum(ranks[n_old:])
+    u_new = rank_sum_new - n_new * (n_new + 1) / 2.0
+
+    total = n_old + n_new
+    mean = n_old * n_new / 2.0
+    tie_term = sum(t ** 3 - t for t in ties) / (total * (total - 1)) if total > 1 else 0
+    var = n_old * n_new / 12.0 * ((total + 1) - tie_term)
+    if var <= 0:
+        return 1.0
+
+    z = (u_new - mean - 0.5) / math.sqrt(var)
+    return _normal_sf(z)
@@ -0,0 +1,108 @@
+# ============================================================================
+# DATOTEKA: benchmarks/stress.py
+# Uloga: Stres tier-ovi (game/scenarios.py) - vrijeme po turn-u na velikim mapama
+# ============================================================================
+#
+# Za svaki tier (od 6x6 s 2 neprijatelja do 256x256 s 500) mjeri:
+#   setup    - generiranje mape i postavljanje jedinica (GameLoop)
+#   turn     - prosječno trajanje turn-a (player + svi neprijatelji)
+#   decision - prosječno trajanje jedne enemy odluke (decide_action)
+# Partija se igra najviše --turns turn-ova - na velikim tier-ovima se ne
+# očekuje kraj igre, mjeri se brzina enginea.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.stress
+#   python3 -m benchmarks.stress --tiers stress-1 stress-4 --turns 5 --backend montecarlo
+#   python3 -m benchmarks.stress --scenarios moji.json --output stress.json
+#   python3 -m benchmarks.stress --backend prolog --tiers stress-1 stress-2
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.macro import AGENT_BACKENDS
+from diagnostics.metrics import metrics
+from game.scenarios import stress_tiers, load_scenarios
+from game.tiles import MAX_TILE_CELLS
+from game_loop import GameLoop
+
+
+def run_tier(scenario, agent, turns, seed):
+    """Mjerenja za jedan scenarij"""
+    random.seed(seed)
+    metrics.reset()
+    metrics.enable()
+    try:
+        start = time.perf_counter()
+        game = GameLoop(headless=True, agent=agent, scenario=scenario)
+        setup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        winner = game.play_headless(max_turns=turns)
+        elapsed = time.perf_counter() - start
+        decisions = metrics.histograms.get('enemy.decide_action')
+    finally:
+        metrics.disable()
+
+    played = min(game.turn_manager.turn_number, turns)
+    return {
+        'scenario': scenario.name,
+        'size': f"{scenario.width}x{scenario.height}",
+        'enemies': scenario.enemy_count,
+        'setup_s': setup,
+        'turns': played,
+        'turn_s': elapsed / played,
+        'decisions': decisions.count if decisions else 0,
+        'decision_ms': decisions.total / decisions.count / 1000 if decisions else 0.0,
+        'alive': game.entities.alive_enemy_count(),
+        'winner': winner,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stres tier-ovi - brzina enginea na velikim mapama")
+    parser.add_argument('--backend', default='greedy', choices=sorted(AGENT_BACKENDS))
+    parser.add_argument('--tiers', nargs='+', metavar='NAME',
+                        help="Samo ovi tier-ovi (default: svi)")
+    parser.add_argument('--scenarios', metavar='PATH',
+                        help="Scenariji iz JSON datoteke umjesto stres tier-ova")
+    parser.add_argument('--turns', type=int, default=3, help="Najviše turn-ova po tier-u")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON datoteka za rezultate")
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else stress_tiers()
+    if args.tiers:
+        scenarios = [s for s in scenarios if s.name in args.tiers]
+    if args.backend == 'prolog':
+        from prolog_comm import PrologAgent
+        unsupported = []
+        for scenario in scenarios:
+            try:
+                PrologAgent.check_map(scenario.width, scenario.height)
+            except ValueError:
+                unsupported.append(f"{scenario.name} ({scenario.width}x{scenario.height})")
+        if unsupported:
+            parser.error(f"prolog backend podržava kvadratne mape do {MAX_TILE_CELLS} "
+                         f"tile-ova, odaberi --tiers bez: {', '.join(unsupported)}")
+
+    agent = AGENT_BACKENDS[args.backend]()
+    print(f"{'scenarij':<12} {'mapa':>9} {'neprij.':>8} {'setup':>9} {'turn':>10} "
+          f"{'odluka':>10} {'živih':>6}")
+    rows = []
+    for scenario in scenarios:
+        row = run_tier(scenario, agent, args.turns, args.seed)
+        rows.append(row)
+        print(f"{row['scenario']:<12} {row['size']:>9} {row['enemies']:>8} "
+              f"{row['setup_s'] * 1000:>7.1f}ms {row['turn_s'] * 1000:>8.1f}ms "
+              f"{row['decision_ms']:>8.3f}ms {row['alive']:>6}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'backend': args.backend, 'rows': rows}, f, indent=2)
+        print(f"Rezultati spremljeni u {args.output}")
+
+
+if __name__ == '__main__':
+    main()
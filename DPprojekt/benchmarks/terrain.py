@@ -0,0 +1,145 @@
+# ============================================================================
+# DATOTEKA: benchmarks/terrain.py
+# Uloga: Memorija i brzina terena u komadima (game/terrain.py) naspram gustog grida
+# ============================================================================
+#
+# Dvije vrste mapa:
+#   tier   - GameMap stres scenarija (game/scenarios.py) nakon --turns
+#            odigranih turn-ova greedy agentom - teren kakav je u igri, uz
+#            tablice (tiles, walk, influence) koje je mapa u međuvremenu izgradila
+#   world  - veliki svijet sa samo travom i --blobs nakupina planina/vode po
+#            komadu (udio komada s preprekama) - tipičan veliki otvoreni svijet
+# Za svaku se mjeri memorija terena u komadima (sentinel komadi se ne broje)
+# naspram gustog grida (lista redaka int-ova, gradi se samo za usporedbu),
+# broj spremljenih komada i vrijeme čitanja jednog tile-a (GameMap.get_terrain
+# za tier-ove) naspram gustog grida. Stupac tablice je memorija tablica
+# izvedenih iz terena koje drži GameMap.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.terrain
+#   python3 -m benchmarks.terrain --tiers stress-1 stress-5 --turns 3
+#   python3 -m benchmarks.terrain --worlds 1024 4096 --blobs 0.02 0.2
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from config.constants import TERRAIN_MOUNTAIN, TERRAIN_WATER
+from game.scenarios import stress_tiers
+from game.terrain import ChunkedTerrain
+from game_loop import GameLoop
+from monte_carlo_agent import GreedyAgent
+
+DEFAULT_WORLDS = [512, 2048]
+DEFAULT_BLOBS = [0.05, 0.25]
+# 256x256 tier igra ~40s po turn-u - zadano do 121x121
+DEFAULT_TIERS = ['stress-1', 'stress-2', 'stress-3', 'stress-4', 'stress-5']
+LOOKUPS = 200000
+
+
+def dense_bytes(rows):
+    """Lista redaka - pokazivači na (keširane) male int-ove"""
+    return sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+
+
+def sparse_world(size, blob_fraction, rng):
+    """Svijet trave s nakupinama planina i vode u blob_fraction komada"""
+    terrain = ChunkedTerrain(size, size)
+    blobs = int(len(terrain.chunks) * blob_fraction)
+    for _ in range(blobs):
+        kind = rng.choice((TERRAIN_MOUNTAIN, TERRAIN_WATER))
+        x0, y0 = rng.randrange(size), rng.randrange(size)
+        w, h = rng.randint(2, 8), rng.randint(2, 8)
+        for y in range(y0, min(y0 + h, size)):
+            for x in range(x0, min(x0 + w, size)):
+                terrain.set(x, y, kind)
+    return terrain
+
+
+def play_tier(scenario, turns, seed):
+    """GameMap tier-a nakon `turns` turn-ova seed-ane partije"""
+    random.seed(seed)
+    game = GameLoop(headless=True, agent=GreedyAgent(), scenario=scenario)
+    game.play_headless(max_turns=turns)
+    return game.game_map
+
+
+def table_bytes(game_map):
+    """Memorija numpy tablica koje je GameMap izgradio iz terena"""
+    total = 0
+    for table in game_map._tables.values():
+        if isinstance(table, tuple):
+            # influence: (ključ, InfluenceMap)
+            table = table[1]
+        if table is not None:
+            total += sum(value.nbytes for value in vars(table).values()
+                         if isinstance(value, np.ndarray))
+    return total
+
+
+def _lookup_ns(get, positions):
+    start = time.perf_counter()
+    for x, y in positions:
+        get(x, y)
+    return (time.perf_counter() - start) / len(positions) * 1e9
+
+
+def measure(name, terrain, get, rng, tables=None):
+    positions = [(rng.randrange(terrain.width), rng.randrange(terrain.height))
+                 for _ in range(LOOKUPS)]
+    rows = terrain.rows()
+    dense = dense_bytes(rows)
+    chunked = terrain.nbytes()
+    return {
+        'name': name,
+        'size': f"{terrain.width}x{terrain.height}",
+        'dense_bytes': dense,
+        'chunked_bytes': chunked,
+        'ratio': dense / chunked,
+        'chunks': len(terrain.chunks),
+        'stored_chunks': terrain.stored_chunks(),
+        'dense_ns': _lookup_ns(lambda x, y: rows[y][x], positions),
+        'chunked_ns': _lookup_ns(get, positions),
+        'tables': tables,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teren u komadima naspram gustog grida")
+    parser.add_argument('--worlds', type=int, nargs='+', default=DEFAULT_WORLDS,
+                        help="Veličine velikih svjetova")
+    parser.add_argument('--blobs', type=float, nargs='+', default=DEFAULT_BLOBS,
+                        help="Udio komada s preprekama u velikim svjetovima")
+    parser.add_argument('--tiers', nargs='*', default=DEFAULT_TIERS, metavar='NAME',
+                        help="Stres tier-ovi koji se igraju (bez imena = nijedan)")
+    parser.add_argument('--turns', type=int, default=1, help="Turn-ova po tier-u prije mjerenja")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rows = []
+    for scenario in stress_tiers():
+        if scenario.name in args.tiers:
+            game_map = play_tier(scenario, args.turns, args.seed)
+            rows.append(measure(scenario.name, game_map.terrain, game_map.get_terrain, rng,
+                                table_bytes(game_map)))
+    for size in args.worlds:
+        for blobs in args.blobs:
+            terrain = sparse_world(size, blobs, rng)
+            rows.append(measure(f"world {blobs:.0%}", terrain, terrain.get, rng))
+
+    print(f"{'mapa':<12} {'veličina':>10} {'gusto':>12} {'komadi':>12} {'x':>6} "
+          f"{'spremljeno':>14} {'gusto ns':>9} {'komadi ns':>10} {'tablice':>12}")
+    for row in rows:
+        tables = f"{row['tables'] / 1024:>10.1f}KB" if row['tables'] is not None else f"{'-':>12}"
+        print(f"{row['name']:<12} {row['size']:>10} {row['dense_bytes'] / 1024:>10.1f}KB "
+              f"{row['chunked_bytes'] / 1024:>10.1f}KB {row['ratio']:>6.1f} "
+              f"{row['stored_chunks']:>7}/{row['chunks']:<6} "
+              f"{row['dense_ns']:>9.0f} {row['chunked_ns']:>10.0f} {tables}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
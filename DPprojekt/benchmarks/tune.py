@@ -0,0 +1,301 @@
+# ============================================================================
+# DATOTEKA: benchmarks/tune.py
+# Uloga: Paralelno traženje težina prioriteta za agent.pl
+# ============================================================================
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m benchmarks.tune                              # ES nad batch engineom
+#   python3 -m benchmarks.tune --method random --generations 20
+#   python3 -m benchmarks.tune --backend prolog --population 32 --output best.json
+#
+# Fitness vektora težina = rezultat batch-a partija nad fiksnim seed-ovima.
+# Partije se dijele na worker procese (svaki ima svog agenta / Prolog
+# engine), a fitness se kešira u JSON po vektoru težina - ponovljeni ili
+# prekinuti run ne igra iste partije ponovo.
+#
+# Backend-ovi:
+#   batch  - game.batch NumPy engine (isti greedy, sve partije odjednom) - zadano
+#   greedy - GreedyAgent (ista pravila u Pythonu) u GameLoop-u
+#   prolog - PrologAgent (agent.pl) u GameLoop-u (treba SWI-Prolog)
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from config.constants import AGENT_WEIGHTS, PLAYER_HP, HEADLESS_MAX_TURNS
+
+# Raspon po težini - uzorci se zaokružuju na cijele brojeve
+WEIGHT_BOUNDS = {
+    'range_base': (0, 150),
+    'range_distance': (0, 20),
+    'range_hp': (0, 10),
+    'melee_base': (0, 150),
+    'melee_hp': (0, 10),
+    'move_base': (0, 100),
+    'move_distance': (0, 20),
+    'push_water': (0, 150),
+    'push_grass': (0, 100),
+}
+
+TUNE_SEEDS = tuple(range(2000, 2064))
+SEEDS_PER_TASK = 16
+HP_BONUS = 0.05  # Preživjeli HP razbija izjednačenja između jednakih win rate-ova
+DEFAULT_CACHE = 'tune_cache.json'
+
+_worker = {}
+
+
+# ----------------------------------------------------------------------------
+# Worker procesi
+# ----------------------------------------------------------------------------
+
+def _init_worker(backend, max_depth):
+    """Jedan agent (i Prolog engine) po worker procesu"""
+    _worker['backend'] = backend
+    _worker['states'] = {}
+    if backend == 'prolog':
+        from prolog_comm import PrologAgent
+        _worker['agent'] = PrologAgent(max_depth=max_depth)
+    else:
+        from monte_carlo_agent import GreedyAgent
+        _worker['agent'] = GreedyAgent()
+
+
+def _play_task(task):
+    """Odigra seed-ove s jednim vektorom težina - vraća (pobjednik, hp playera) po partiji"""
+    from game_loop import GameLoop
+
+    weights, seeds, max_turns = task
+    agent = _worker['agent']
+    agent.weights = dict(weights)
+
+    if _worker['backend'] == 'batch':
+        from game import state as game_state
+        from game.batch import BatchGames
+        states = []
+        for seed in seeds:
+            if seed not in _worker['states']:
+                random.seed(seed)
+                game = GameLoop(headless=True, agent=agent)
+                _worker['states'][seed] = game_state.from_game(game)
+            states.append(_worker['states'][seed])
+        batch = BatchGames(states, max_turns, weights)
+        results = batch.run()
+        return [(winner, int(hp)) for (winner, _turns), hp in zip(results, batch.hp[:, 0])]
+
+    outcomes = []
+    for seed in seeds:
+        random.seed(seed)
+        game = GameLoop(headless=True, agent=agent)
+        winner = game.play_headless(max_turns)
+        outcomes.append((winner, game.player.hp))
+    return outcomes
+
+
+# ----------------------------------------------------------------------------
+# Fitness i keš
+# ----------------------------------------------------------------------------
+
+def fitness(outcomes):
+    """Win rate (neriješeno = pola) + mali bonus za preživjeli HP"""
+    score = 0.0
+    hp = 0
+    for winner, player_hp in outcomes:
+        if winner == 'player':
+            score += 1.0
+        elif winner is None:
+            score += 0.5
+        hp += max(0, player_hp)
+    return score / len(outcomes) + HP_BONUS * hp / (len(outcomes) * PLAYER_HP)
+
+
+def weights_key(weights):
+    return ",".join(str(weights[name]) for name in AGENT_WEIGHTS)
+
+
+class Tuner:
+    """Evaluira populacije vektora težina na pool-u, s kešom po vektoru"""
+    def __init__(self, backend, seeds, workers, cache_path, max_turns, max_depth):
+        self.backend = backend
+        self.seeds = tuple(seeds)
+        self.max_turns = max_turns
+        self.cache_path = cache_path
+        self.pool = Pool(workers, initializer=_init_worker, initargs=(backend, max_depth))
+
+        # Fitness ovisi o backend-u i seed-ovima - svaki kontekst ima svoj keš
+        self.context = f"{backend}|{self.seeds[0]}-{self.seeds[-1]}|{max_turns}|d{max_depth}"
+        self.all_cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.all_cache = json.load(f)
+        self.cache = self.all_cache.setdefault(self.context, {})
+
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def _save(self):
+        if self.cache_path:
+            with open(self.cache_path, 'w') as f:
+                json.dump(self.all_cache, f, indent=1)
+
+    def evaluate(self, population):
+        """Fitness za svaki vektor - partije svih novih vektora idu na pool odjednom"""
+        pending = []
+        for weights in population:
+            key = weights_key(weights)
+            if key in self.cache or key in pending:
+                self.cache_hits += 1
+            else:
+                pending.append(key)
+
+        if pending:
+            by_key = {weights_key(w): w for w in population}
+            step = len(self.seeds) if self.backend == 'batch' else SEEDS_PER_TASK
+            tasks = []
+            owners = []
+            for key in pending:
+                for i in range(0, len(self.seeds), step):
+                    tasks.append((by_key[key], self.seeds[i:i + step], self.max_turns))
+                    owners.append(key)
+
+            outcomes = {key: [] for key in pending}
+            for key, result in zip(owners, self.pool.imap(_play_task, tasks)):
+                outcomes[key].extend(result)
+            for key in pending:
+                self.cache[key] = fitness(outcomes[key])
+            self.evaluations += len(pending)
+            self._save()
+
+        return [self.cache[weights_key(w)] for w in population]
+
+
+# ----------------------------------------------------------------------------
+# Pretraga
+# ----------------------------------------------------------------------------
+
+def _clip(name, value):
+    low, high = WEIGHT_BOUNDS[name]
+    return int(round(min(high, max(low, value))))
+
+
+def random_search(tuner, rng, generations, population):
+    """Uniformno uzorkovanje unutar WEIGHT_BOUNDS"""
+    best = (tuner.evaluate([AGENT_WEIGHTS])[0], dict(AGENT_WEIGHTS))
+    for generation in range(generations):
+        candidates = [
+            {name: rng.randint(*WEIGHT_BOUNDS[name]) for name in AGENT_WEIGHTS}
+            for _ in range(population)
+        ]
+        for score, weights in zip(tuner.evaluate(candidates), candidates):
+            if score > best[0]:
+                best = (score, weights)
+        yield generation, best
+
+
+def evolution_strategy(tuner, rng, generations, population):
+    """
+    (mu, lambda) ES s dijagonalnom kovarijancom (CMA-ES bez rotacije):
+    srednja vrijednost = težinska suma boljih uzoraka, sigma po dimenziji
+    se prilagođava raspršenosti izabranih koraka.
+    """
+    names = list(AGENT_WEIGHTS)
+    mean = {name: float(AGENT_WEIGHTS[name]) for name in names}
+    sigma = {name: (WEIGHT_BOUNDS[name][1] - WEIGHT_BOUNDS[name][0]) / 6 for name in names}
+
+    mu = max(1, population // 2)
+    ranks = [math.log(mu + 0.5) - math.log(i + 1) for i in range(mu)]
+    recombination = [r / sum(ranks) for r in ranks]
+    learning_rate = 0.3
+
+    best = (tuner.evaluate([AGENT_WEIGHTS])[0], dict(AGENT_WEIGHTS))
+    for generation in range(generations):
+        candidates = [
+            {name: _clip(name, rng.gauss(mean[name], sigma[name])) for name in names}
+            for _ in range(population)
+        ]
+        scores = tuner.evaluate(candidates)
+        ranked = sorted(zip(scores, range(population)), key=lambda item: -item[0])
+        elite = [candidates[i] for _score, i in ranked[:mu]]
+        if ranked[0][0] > best[0]:
+            best = (ranked[0][0], candidates[ranked[0][1]])
+
+        for name in names:
+            old_mean = mean[name]
+            mean[name] = sum(w * e[name] for w, e in zip(recombination, elite))
+            spread = sum(w * (e[name] - old_mean) ** 2 for w, e in zip(recombination, elite))
+            sigma[name] = max(0.5, math.sqrt((1 - learning_rate) * sigma[name] ** 2
+                                             + learning_rate * spread))
+        yield generation, best
+
+
+SEARCH_METHODS = {
+    'random': random_search,
+    'es': evolution_strategy,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tuning težina agent.pl prioriteta")
+    parser.add_argument('--backend', choices=['batch', 'greedy', 'prolog'], default='batch')
+    parser.add_argument('--method', choices=sorted(SEARCH_METHODS), default='es')
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=12)
+    parser.add_argument('--seeds', type=int, default=len(TUNE_SEEDS),
+                        help="Koliko seed-ova iz TUNE_SEEDS igrati po vektoru")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache', default=DEFAULT_CACHE,
+                        help="JSON keš fitness-a ('' = bez keša)")
+    parser.add_argument('--max-turns', type=int, default=HEADLESS_MAX_TURNS)
+    parser.add_argument('--depth', type=int, default=0,
+                        help="max_depth Prolog pretrage (0 = greedy, najbrže)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed same pretrage")
+    parser.add_argument('--output', help="JSON datoteka za najbolju konfiguraciju")
+    args = parser.parse_args(argv)
+
+    seeds = TUNE_SEEDS[:args.seeds]
+    tuner = Tuner(args.backend, seeds, args.workers, args.cache, args.max_turns, args.depth)
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+
+    try:
+        baseline = tuner.evaluate([AGENT_WEIGHTS])[0]
+        score, weights = baseline, dict(AGENT_WEIGHTS)
+        print(f"zadane težine: fitness {baseline:.4f}")
+        search = SEARCH_METHODS[args.method](tuner, rng, args.generations, args.population)
+        for generation, (score, weights) in search:
+            print(f"generacija {generation + 1}/{args.generations}: najbolji {score:.4f} "
+                  f"[{weights_key(weights)}] ({tuner.evaluations} evaluacija, "
+                  f"{tuner.cache_hits} iz keša)")
+    finally:
+        tuner.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nNajbolja konfiguracija (fitness {score:.4f}, zadano {baseline:.4f}, {elapsed:.1f} s):")
+    for name in AGENT_WEIGHTS:
+        print(f"  {name:<16} {weights[name]:>4}   (zadano {AGENT_WEIGHTS[name]})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'fitness': score,
+                'baseline_fitness': baseline,
+                'weights': weights,
+                'backend': args.backend,
+                'method': args.method,
+                'seeds': [seeds[0], seeds[-1]],
+            }, f, indent=2)
+        print(f"Spremljeno u {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,6 +37,36 @@ COLOR_LOSE = (255, 100, 100)
 
 # Game settings
 TURN_DELAY = 1.5  # Sekunde između turn-ova
+HEADLESS_MAX_TURNS = 100  # Nakon toliko turn-ova headless partija je neriješena
+
+# Prolog agent - lookahead pretraga
+AGENT_TIME_BUDGET = 0.2  # Sekunde po odluci (iterative deepening staje na roku)
+AGENT_MAX_DEPTH = 0  # Maksimalna dubina u player akcijama (0 = greedy, bez pretrage)
+
+# Agent service (agent_service.py) - pool Prolog enginea iza Unix socketa
+AGENT_SERVICE_SOCKET = '/tmp/dpprojekt-agent.sock'
+AGENT_SERVICE_TIMEOUT = 2.0  # Sekunde po zahtjevu prije restarta workera
+
+# Match server (match_server.py) - partije i gledatelji na Unix socketu
+MATCH_SERVER_SOCKET = '/tmp/dpprojekt-matches.sock'
+SPECTATOR_QUEUE = 64  # Poruka u redu gledatelja prije nego dobije snapshot
+
+# Težine greedy prioriteta (redoslijed = argumenti w(...) u agent.pl)
+AGENT_WEIGHTS = {
+    'range_base': 90,      # range: base - distance*range_distance - hp*range_hp
+    'range_distance': 5,
+    'range_hp': 3,
+    'melee_base': 95,      # melee: base - hp*melee_hp
+    'melee_hp': 3,
+    'move_base': 50,       # move:  base - min_distance*move_distance
+    'move_distance': 5,
+    'push_water': 100,     # push u vodu (ubija)
+    'push_grass': 20,      # push na travu
+}
+
+# Monte Carlo agent - playout-i
+MC_ROLLOUT_TURNS = 10  # Nakon toliko turn-ova playout je neriješen (nagrada 0.5)
+MC_EPSILON = 0.2  # Vjerojatnost nasumičnog poteza u scripted playout-u
 
 # Player settings
 PLAYER_HP = 5
@@ -0,0 +1,177 @@
+# ============================================================================
+# DATOTEKA: diagnostics/metrics.py
+# Uloga: Lagani timeri, brojači i histogrami za mjerenje turn-ova
+# ============================================================================
+#
+# Korištenje:
+#   from diagnostics.metrics import metrics
+#   with metrics.timer('prolog.query'):
+#       ...
+#   metrics.count('actions.move')
+#
+# Kad je mjerenje isključeno (default), timer() vraća dijeljeni no-op
+# context manager pa instrumentirani kod ne plaća gotovo ništa.
+
+import csv
+import json
+import time
+
+# Histogram bucket i = vrijednosti s bit_length i (0, 1, 2-3, 4-7, ...)
+NUM_BUCKETS = 48
+
+
+class Histogram:
+    """Histogram s log2 bucketima - fiksna memorija bez obzira na broj uzoraka"""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, value):
+        """Dodaje jedan uzorak"""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        index = min(int(value).bit_length(), NUM_BUCKETS - 1)
+        self.buckets[index] += 1
+
+    def percentile(self, q):
+        """Procjena percentila - gornja granica bucketa (ograničena s max)"""
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                upper = (1 << index) - 1 if index else 0
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Sažetak za ispis i export"""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class _NullTimer:
+    """No-op timer kad je mjerenje isključeno"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Mjeri trajanje bloka i upisuje ga u histogram (u mikrosekundama)"""
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add((time.perf_counter() - self.start) * 1e6)
+        return False
+
+
+class Metrics:
+    """Registar timera, brojača i histograma"""
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Briše sve skupljene podatke"""
+        self.counters.clear()
+        self.histograms.clear()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def timer(self, name):
+        """Context manager koji mjeri trajanje bloka (mikrosekunde)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self._histogram(name))
+
+    def observe(self, name, value):
+        """Dodaje proizvoljnu vrijednost u histogram"""
+        if self.enabled:
+            self._histogram(name).add(value)
+
+    def count(self, name, n=1):
+        """Povećava brojač"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Trenutno stanje svih metrika - može se pozivati tijekom igre"""
+        return {
+            'counters': dict(self.counters),
+            'histograms': {
+                name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())
+            },
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def dump_csv(self, path):
+        """Jedan red po metrici - brojači imaju samo count"""
+        fields = ['name', 'count', 'total', 'mean', 'min', 'max', 'p50', 'p95', 'p99']
+        snapshot = self.snapshot()
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for name, value in sorted(snapshot['counters'].items()):
+                writer.writerow({'name': name, 'count': value})
+            for name, summary in snapshot['histograms'].items():
+                writer.writerow(dict(summary, name=name))
+
+    def dump(self, path):
+        """Sprema u CSV ili JSON ovisno o ekstenziji"""
+        if path.endswith('.csv'):
+            self.dump_csv(path)
+        else:
+            self.dump_json(path)
+
+
+# Globalni registar koji koristi cijeli engine
+metrics = Metrics()
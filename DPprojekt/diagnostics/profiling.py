@@ -0,0 +1,189 @@
+# ============================================================================
+# DATOTEKA: diagnostics/profiling.py
+# Uloga: Profiliranje igre - cProfile ili sampling, raspodjela po podsustavima
+# ============================================================================
+#
+# profile_call(func, mode, prefix) pokreće func i zapisuje:
+#   <prefix>.prof       - cProfile statistika (samo mode='cprofile', za pstats/snakeviz)
+#   <prefix>.collapsed  - "a;b;c broj" linije za flamegraph.pl / speedscope
+#   <prefix>.json       - vrijeme po podsustavu + Prolog inferences po upitu
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from diagnostics.metrics import metrics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Relativna putanja (prefiks) -> podsustav
+SUBSYSTEMS = (
+    ('game_loop.py', 'game_loop'),
+    (os.path.join('game', 'pathfinding.py'), 'pathfinding'),
+    ('entities' + os.sep, 'entities'),
+    ('prolog_comm.py', 'prolog_comm'),
+    ('ui' + os.sep, 'renderer'),
+    ('game' + os.sep, 'game'),
+)
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # sekunde
+
+
+def subsystem_for(filename):
+    """Vraća podsustav za datoteku ili None ako nije dio projekta"""
+    if not filename.startswith(PROJECT_ROOT):
+        return None
+    relative = os.path.relpath(filename, PROJECT_ROOT)
+    for prefix, name in SUBSYSTEMS:
+        if relative.startswith(prefix):
+            return name
+    return None
+
+
+def _frame_label(code):
+    filename = os.path.relpath(code.co_filename, PROJECT_ROOT) \
+        if code.co_filename.startswith(PROJECT_ROOT) else os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Periodički uzorkuje stack jedne dretve iz pozadinske dretve"""
+    def __init__(self, thread_id=None, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.subsystems = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._sample(frame)
+
+    def _sample(self, frame):
+        labels = []
+        subsystem = None
+        while frame is not None:
+            code = frame.f_code
+            labels.append(_frame_label(code))
+            # Najdublji frame iz projekta određuje podsustav (npr. pyswip -> prolog_comm)
+            if subsystem is None:
+                subsystem = subsystem_for(code.co_filename)
+            frame = frame.f_back
+        labels.reverse()
+        self.stacks[';'.join(labels)] += 1
+        self.subsystems[subsystem or 'other'] += 1
+        self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def subsystem_seconds(self):
+        return {name: count * self.interval for name, count in self.subsystems.most_common()}
+
+
+def cprofile_subsystems(stats):
+    """
+    Raspodjela self-time-a iz cProfile statistike po podsustavima
+
+    Funkcije izvan projekta (builtins, pyswip, pygame) pripisuju se
+    podsustavu koji ih je pozvao, proporcionalno broju poziva.
+    """
+    totals = Counter()
+    for (filename, _line, _name), (_cc, _nc, tottime, _ct, callers) in stats.stats.items():
+        subsystem = subsystem_for(filename)
+        if subsystem is not None:
+            totals[subsystem] += tottime
+            continue
+
+        calls = sum(value[0] for value in callers.values())
+        if not calls:
+            totals['other'] += tottime
+            continue
+        for (caller_file, _l, _n), value in callers.items():
+            share = tottime * value[0] / calls
+            totals[subsystem_for(caller_file) or 'other'] += share
+    return dict(totals.most_common())
+
+
+def _inference_summary(counts):
+    if not counts:
+        return None
+    ordered = sorted(counts)
+    return {
+        'queries': len(counts),
+        'total': sum(counts),
+        'mean': sum(counts) / len(counts),
+        'median': ordered[len(ordered) // 2],
+        'max': ordered[-1],
+        'per_query': counts,
+    }
+
+
+def profile_call(func, mode='cprofile', prefix='profile', prolog_agent=None,
+                 interval=DEFAULT_SAMPLE_INTERVAL):
+    """
+    Pokreće func() pod profilerom i zapisuje rezultate
+
+    Args:
+        func: funkcija bez argumenata (igra ili headless batch)
+        mode: 'cprofile' (deterministički) ili 'sample'
+        prefix: putanja bez ekstenzije za izlazne datoteke
+        prolog_agent: PrologAgent s count_inferences=True (opcionalno)
+    """
+    sampler = SamplingProfiler(interval=interval)
+    profiler = cProfile.Profile() if mode == 'cprofile' else None
+
+    start = time.perf_counter()
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+    wall = time.perf_counter() - start
+
+    sampler.write_collapsed(prefix + '.collapsed')
+    report = {
+        'mode': mode,
+        'wall_seconds': wall,
+        'samples': sampler.samples,
+        'sampled_subsystem_seconds': sampler.subsystem_seconds(),
+    }
+
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(prefix + '.prof')
+        report['cprofile_subsystem_seconds'] = cprofile_subsystems(stats)
+
+    if prolog_agent is not None:
+        report['prolog_inferences'] = _inference_summary(prolog_agent.inference_counts)
+
+    if metrics.enabled:
+        report['metrics'] = metrics.snapshot()
+
+    with open(prefix + '.json', 'w') as f:
+        json.dump(report, f, indent=2)
+
+    return result, report
@@ -0,0 +1,163 @@
+# ============================================================================
+# DATOTEKA: diagnostics/trace.py
+# Uloga: Buffered event trace umjesto print() poziva u vrućim putanjama
+# ============================================================================
+#
+# Korištenje:
+#   from diagnostics.trace import trace
+#   trace.info("  → %s moved to %s", name, pos)
+#
+# Zapis je kompaktan tuple (vrijeme, level, format, args) u ring bufferu -
+# string se formatira tek kad ga netko čita (sink, lines()). Zapisi ispod
+# levela (default ERROR) se odbacuju odmah nakon jedne usporedbe.
+#
+# Dok nije dodan nijedan sink (engine ugrađen bez main.py - benchmarkovi,
+# testovi, vlastite skripte), greške idu na stderr da traceback ne ostane
+# samo u ring bufferu.
+
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {
+    'debug': DEBUG,
+    'info': INFO,
+    'warning': WARNING,
+    'error': ERROR,
+    'off': OFF,
+}
+
+DEFAULT_CAPACITY = 4096
+
+
+def format_record(record):
+    """Formatira jedan zapis u liniju teksta"""
+    _timestamp, _level, fmt, args = record
+    return fmt % args if args else fmt
+
+
+class ConsoleSink:
+    """Ispisuje zapise odmah na stdout (interaktivna igra)"""
+    def emit(self, record):
+        print(format_record(record))
+
+    def close(self):
+        pass
+
+
+class StderrSink:
+    """Ispisuje zapise na stderr - zadani izlaz grešaka kad nema drugih sinkova"""
+    def emit(self, record):
+        sys.stderr.write(format_record(record) + "\n")
+
+    def close(self):
+        pass
+
+
+class AsyncFileSink:
+    """Piše zapise u datoteku iz pozadinske dretve - igra ne čeka na disk"""
+    _STOP = object()
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name='trace-sink', daemon=True)
+        self.thread.start()
+
+    def emit(self, record):
+        self.queue.put(record)
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                break
+            timestamp, level, _fmt, _args = record
+            self.file.write(f"{timestamp:.6f} {level:>2} {format_record(record)}\n")
+        self.file.close()
+
+    def close(self):
+        """Ispiše sve zaostale zapise i zatvori datoteku"""
+        self.queue.put(self._STOP)
+        self.thread.join()
+
+
+class EventTrace:
+    """Ring buffer događaja s level gate-om i opcionalnim sinkovima"""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.level = ERROR
+        self.records = deque(maxlen=capacity)
+        self.sinks = []
+        # Koristi se samo dok je self.sinks prazan, i samo za ERROR
+        self.fallback = StderrSink()
+
+    def set_level(self, level):
+        """Postavlja minimalni level (int ili ime: 'debug', 'info', ...)"""
+        if isinstance(level, str):
+            level = LEVEL_NAMES[level.lower()]
+        self.level = level
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def close(self):
+        """Zatvara sve sinkove (flush asinkronih)"""
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+    def log(self, level, fmt, *args):
+        if level < self.level:
+            return
+        record = (time.perf_counter(), level, fmt, args)
+        self.records.append(record)
+        if not self.sinks:
+            if level >= ERROR and self.fallback is not None:
+                self.fallback.emit(record)
+            return
+        for sink in self.sinks:
+            sink.emit(record)
+
+    def debug(self, fmt, *args):
+        if DEBUG >= self.level:
+            self.log(DEBUG, fmt, *args)
+
+    def info(self, fmt, *args):
+        if INFO >= self.level:
+            self.log(INFO, fmt, *args)
+
+    def warning(self, fmt, *args):
+        if WARNING >= self.level:
+            self.log(WARNING, fmt, *args)
+
+    def error(self, fmt, *args):
+        if ERROR >= self.level:
+            self.log(ERROR, fmt, *args)
+
+    def lines(self, last=None):
+        """Formatirani zadnji zapisi iz ring buffera"""
+        records = list(self.records)
+        if last is not None:
+            records = records[-last:]
+        return [format_record(record) for record in records]
+
+    def dump(self, stream=None):
+        """Ispiše cijeli ring buffer (npr. nakon greške u batch runu)"""
+        stream = stream or sys.stdout
+        for line in self.lines():
+            stream.write(line + "\n")
+
+
+# Globalni trace koji koristi cijeli engine
+trace = EventTrace()
@@ -0,0 +1,350 @@
+# ============================================================================
+# DATOTEKA: diagnostics/trajectory.py
+# Uloga: Streaming zapis trajektorija (stanje, akcija, ishod) u stupčane datoteke
+# ============================================================================
+#
+# Svaka odluka (player ili neprijatelj) je jedan redak tablice `steps`.
+# Stupci su fiksne širine i svaki je svoja binarna datoteka
+# (<tablica>.<stupac>.bin) koja se samo nadopisuje, pa se cijeli skup
+# otvara s np.memmap bez učitavanja u RAM:
+#
+#   steps     game step turn actor_kind actor actions_left terrain
+#             kind[U] x[U] y[U] hp[U]        (U = max_units, prazno: kind 255)
+#             action target_x target_y dx dy damage reward outcome
+#   games     terrain first_step steps turns winner
+#   terrains  offset width height            (ćelije su u terrain.bin)
+#
+# Jedinice su redom kao u _prepare_game_state (player, pa živi
+# neprijatelji); actor je indeks jedinice koja je odlučivala (uint16, pa
+# max_units ide do 65536 - veći TrajectoryWriter odbija). Kodovi
+# akcija su isti kao u prolog_codec.py (0 = bez akcije).
+#
+# Nagrada je iz perspektive playera i rijetka: zadnji korak partije dobiva
+# +1 (pobjeda), -1 (poraz) ili 0 (neriješeno), ostali 0; outcome je taj
+# ishod u svakom retku partije. Zato se u memoriji drži samo trenutna
+# partija, a retci idu u buffere od CHUNK_ROWS koji se zapisuju kad se
+# napune. meta.json se piše nakon svakog zapisa - broj redaka u njoj nikad
+# nije veći od onoga što je na disku.
+#
+# Korištenje:
+#   recorder = TrajectoryWriter('traj')
+#   GameLoop(headless=True, recorder=recorder).play_headless()
+#   recorder.close()
+#   data = open_trajectories('traj'); data['steps']['hp'][:, 0]
+
+import json
+import os
+
+import numpy as np
+
+from entities.store import KIND_PLAYER, KIND_RANGE, KIND_MELEE
+from game.terrain import flat_terrain
+
+MAX_UNITS = 8
+CHUNK_ROWS = 1 << 14
+EMPTY_KIND = 255
+
+# Isti kodovi kao ACTION_NAMES u prolog_codec.py
+ACTION_CODES = {None: 0, 'move': 1, 'melee_attack': 2, 'melee_push': 3, 'range_attack': 4}
+
+KIND_BY_NAME = {'range': KIND_RANGE, 'melee': KIND_MELEE}
+OUTCOMES = {'player': 1, 'enemies': -1, None: 0}
+
+
+def _schema(max_units):
+    """tablica -> [(stupac, dtype, oblik retka)]"""
+    units = (max_units,)
+    return {
+        'steps': [
+            ('game', 'uint32', ()), ('step', 'uint32', ()), ('turn', 'uint16', ()),
+            ('actor_kind', 'uint8', ()), ('actor', 'uint16', ()), ('actions_left', 'uint8', ()),
+            ('terrain', 'uint32', ()),
+            ('kind', 'uint8', units), ('x', 'int16', units), ('y', 'int16', units),
+            ('hp', 'int16', units),
+            ('action', 'uint8', ()), ('target_x', 'int16', ()), ('target_y', 'int16', ()),
+            ('dx', 'int8', ()), ('dy', 'int8', ()), ('damage', 'uint8', ()),
+            ('reward', 'float32', ()), ('outcome', 'int8', ()),
+        ],
+        'games': [
+            ('terrain', 'uint32', ()), ('first_step', 'uint64', ()), ('steps', 'uint32', ()),
+            ('turns', 'uint16', ()), ('winner', 'int8', ()),
+        ],
+        'terrains': [
+            ('offset', 'uint64', ()), ('width', 'uint16', ()), ('height', 'uint16', ()),
+        ],
+    }
+
+
+class _Column:
+    """Jedan stupac - buffer od CHUNK_ROWS redaka koji se nadopisuje u datoteku"""
+    def __init__(self, path, dtype, shape, chunk_rows):
+        self.path = path
+        self.buffer = np.empty((chunk_rows,) + shape, dtype=dtype)
+        self.filled = 0
+
+    def extend(self, values):
+        """Dodaje retke - pun buffer se odmah zapisuje"""
+        values = np.asarray(values, dtype=self.buffer.dtype)
+        start = 0
+        while start < len(values):
+            room = len(self.buffer) - self.filled
+            part = values[start:start + room]
+            self.buffer[self.filled:self.filled + len(part)] = part
+            self.filled += len(part)
+            start += len(part)
+            if self.filled == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        if self.filled:
+            with open(self.path, 'ab') as f:
+                f.write(self.buffer[:self.filled].tobytes())
+            self.filled = 0
+
+
+class TrajectoryWriter:
+    """
+    Zapisuje trajektorije partija u direktorij `path` (nastavlja postojeći)
+
+    Args:
+        max_units: širina stupaca jedinica (player + neprijatelji)
+        chunk_rows: koliko redaka stupca se drži prije zapisa na disk
+    """
+    def __init__(self, path, max_units=MAX_UNITS, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta = _read_meta(path)
+        if meta is not None:
+            max_units = meta['max_units']
+            self.rows = {table: info['rows'] for table, info in meta['tables'].items()}
+            self.terrain_bytes = meta['terrain_bytes']
+        else:
+            self.rows = {'steps': 0, 'games': 0, 'terrains': 0}
+            self.terrain_bytes = 0
+        self.max_units = max_units
+        self.chunk_rows = chunk_rows
+
+        self.schema = _schema(max_units)
+        actor_dtype = dict((name, dtype) for name, dtype, _ in self.schema['steps'])['actor']
+        if max_units - 1 > np.iinfo(actor_dtype).max:
+            raise ValueError(f"max_units={max_units} ne stane u stupac actor ({actor_dtype})")
+        if meta is not None and _columns_meta(meta['tables']) != _columns_meta(self._tables_meta(self.rows)):
+            raise ValueError(f"Zapis u {path} ima drugačiju shemu stupaca - koristi novi direktorij")
+        self.columns = {
+            table: {
+                name: _Column(os.path.join(path, f"{table}.{name}.bin"), dtype, shape, chunk_rows)
+                for name, dtype, shape in columns
+            }
+            for table, columns in self.schema.items()
+        }
+        if meta is not None:
+            self._truncate()
+        self._terrain_file = open(os.path.join(path, 'terrain.bin'), 'ab')
+        self._last_terrain = None
+        self._game = []
+        self._written = dict(self.rows)
+
+    def _truncate(self):
+        """
+        Odrezuje retke zapisane nakon zadnjeg meta.json (prekinut proces) -
+        inače bi se novi retci nadovezali na stupce različitih duljina
+        """
+        sizes = {os.path.join(self.path, 'terrain.bin'): self.terrain_bytes}
+        for table, columns in self.schema.items():
+            for name, dtype, shape in columns:
+                row_bytes = np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+                sizes[os.path.join(self.path, f"{table}.{name}.bin")] = self.rows[table] * row_bytes
+        for path, size in sizes.items():
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def _terrain_id(self, terrain):
+        """Id terena - isti teren kao u prošlom retku dobiva isti id"""
+        last = self._last_terrain
+        if last is not None and (last[0] is terrain or last[0] == terrain):
+            return last[1]
+        cells = flat_terrain(terrain)
+        terrain_id = self.rows['terrains']
+        self.columns['terrains']['offset'].extend([self.terrain_bytes])
+        self.columns['terrains']['width'].extend([len(terrain[0])])
+        self.columns['terrains']['height'].extend([len(terrain)])
+        self._terrain_file.write(cells)
+        self.terrain_bytes += len(cells)
+        self.rows['terrains'] += 1
+        self._last_terrain = (terrain, terrain_id)
+        return terrain_id
+
+    def record(self, game_state, actor, action, turn):
+        """
+        Jedna odluka
+
+        Args:
+            game_state: dict iz _prepare_game_state (stanje prije akcije)
+            actor: player ili neprijatelj koji je odlučivao (x, y, KIND)
+            action: dict akcija agenta / decide_action ili None
+        """
+        player = game_state['player']
+        units = [(KIND_PLAYER, player['x'], player['y'], player['hp'])]
+        units += [(KIND_BY_NAME[e['type']], e['x'], e['y'], e['hp']) for e in game_state['enemies']]
+        if len(units) > self.max_units:
+            raise ValueError(f"Stanje ima {len(units)} jedinica, zapis ih podržava {self.max_units}")
+
+        actor_index = next(
+            (i for i, (kind, x, y, _hp) in enumerate(units)
+             if kind == actor.KIND and x == actor.x and y == actor.y),
+            0
+        )
+
+        target_x = target_y = dx = dy = damage = 0
+        action_type = action['type'] if action else None
+        if action:
+            target = action.get('target')
+            if isinstance(target, tuple):
+                target_x, target_y = target
+            elif isinstance(target, dict):
+                target_x, target_y = target['x'], target['y']
+            elif target is not None:
+                target_x, target_y = target.x, target.y
+            dx, dy = action.get('direction') or (0, 0)
+            damage = action.get('damage', 0)
+
+        padding = [(EMPTY_KIND, 0, 0, 0)] * (self.max_units - len(units))
+        self._game.append((
+            turn, actor.KIND, actor_index, game_state['actions_left'],
+            self._terrain_id(game_state['terrain']), units + padding,
+            ACTION_CODES[action_type], target_x, target_y, dx, dy, damage,
+        ))
+
+    def end_game(self, winner, turns):
+        """Kraj partije - retci partije dobivaju nagradu i idu u stupce"""
+        rows = self._game
+        self._game = []
+        game_id = self.rows['games']
+        first_step = self.rows['steps']
+        outcome = OUTCOMES[winner]
+
+        if rows:
+            count = len(rows)
+            (turn, actor_kind, actor, actions_left, terrain, units,
+             action, target_x, target_y, dx, dy, damage) = zip(*rows)
+            units = np.array(units, dtype=np.int16)
+            reward = np.zeros(count, dtype=np.float32)
+            reward[-1] = outcome
+            steps = self.columns['steps']
+            values = {
+                'game': np.full(count, game_id), 'step': np.arange(count), 'turn': turn,
+                'actor_kind': actor_kind, 'actor': actor, 'actions_left': actions_left,
+                'terrain': terrain,
+                'kind': units[:, :, 0], 'x': units[:, :, 1], 'y': units[:, :, 2],
+                'hp': units[:, :, 3],
+                'action': action, 'target_x': target_x, 'target_y': target_y,
+                'dx': dx, 'dy': dy, 'damage': damage,
+                'reward': reward, 'outcome': np.full(count, outcome),
+            }
+            for name, column in steps.items():
+                column.extend(values[name])
+            self.rows['steps'] += count
+            terrain_id = terrain[0]
+        else:
+            terrain_id = self._last_terrain[1] if self._last_terrain else 0
+
+        games = self.columns['games']
+        games['terrain'].extend([terrain_id])
+        games['first_step'].extend([first_step])
+        games['steps'].extend([len(rows)])
+        games['turns'].extend([turns])
+        games['winner'].extend([outcome])
+        self.rows['games'] += 1
+
+        if self.rows['steps'] - self._written['steps'] >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Zapisuje sve buffere i meta.json"""
+        for table in self.columns.values():
+            for column in table.values():
+                column.flush()
+        self._terrain_file.flush()
+        self._written = dict(self.rows)
+        _write_meta(self.path, {
+            'version': 1,
+            'max_units': self.max_units,
+            'terrain_bytes': self.terrain_bytes,
+            'action_codes': {name or 'none': code for name, code in ACTION_CODES.items()},
+            'tables': self._tables_meta(self.rows),
+        })
+
+    def _tables_meta(self, rows):
+        """'tables' dio meta.json za trenutnu shemu i zadane brojeve redaka"""
+        return {
+            table: {
+                'rows': rows[table],
+                'columns': {name: {'dtype': dtype, 'shape': list(shape)}
+                            for name, dtype, shape in columns},
+            }
+            for table, columns in self.schema.items()
+        }
+
+    def close(self):
+        """Zapisuje ostatak; nedovršena partija se odbacuje"""
+        self._game = []
+        self.flush()
+        self._terrain_file.close()
+
+
+def _columns_meta(tables):
+    return {table: info['columns'] for table, info in tables.items()}
+
+
+def _read_meta(path):
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _write_meta(path, meta):
+    # Zamjena atomskim rename-om - čitač nikad ne vidi pola datoteke
+    tmp = os.path.join(path, 'meta.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(path, 'meta.json'))
+
+
+def _open(path, dtype, shape):
+    rows = shape[0]
+    if rows == 0 or not os.path.exists(path):
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+
+def open_trajectories(path):
+    """
+    Otvara zapis kao np.memmap nizove (samo čitanje)
+
+    Returns:
+        {'steps': {stupac: niz}, 'games': {...}, 'terrains': {...},
+         'terrain': uint8 niz svih ćelija}
+    """
+    meta = _read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"Nema meta.json u {path}")
+    data = {}
+    for table, info in meta['tables'].items():
+        data[table] = {
+            name: _open(os.path.join(path, f"{table}.{name}.bin"), column['dtype'],
+                        (info['rows'],) + tuple(column['shape']))
+            for name, column in info['columns'].items()
+        }
+    data['terrain'] = _open(os.path.join(path, 'terrain.bin'), 'uint8', (meta['terrain_bytes'],))
+    return data
+
+
+def terrain_grid(data, terrain_id):
+    """(H, W) teren iz open_trajectories podataka"""
+    terrains = data['terrains']
+    offset = int(terrains['offset'][terrain_id])
+    width = int(terrains['width'][terrain_id])
+    height = int(terrains['height'][terrain_id])
+    return np.asarray(data['terrain'][offset:offset + width * height]).reshape(height, width)
@@ -1,14 +1,22 @@
 import random
 from game.pathfinding import get_next_move_towards, get_next_move_away_from
+from config.constants import RANGE_ENEMY_HP, MELEE_ENEMY_HP
+from entities.store import EntityView, KIND_RANGE, KIND_MELEE
 
-class Enemy:
-    """Base klasa za sve neprijatelje"""
-    def __init__(self, x, y, hp):
-        self.x = x
-        self.y = y
-        self.hp = hp
-        self.max_hp = hp
-        self.acted_this_turn = False
+class Enemy(EntityView):
+    """
+    Base klasa za sve neprijatelje
+    
+    Stanje (x, y, hp, max_hp, acted_this_turn) živi u EntityStore-u,
+    objekt je samo pogled na svoj red.
+    """
+    __slots__ = ()
+    
+    # Budžet akcija po enemy turn-u (TurnManager ga čita)
+    actions_per_turn = 1
+    
+    def __init__(self, x, y, hp, store=None):
+        super().__init__(x, y, hp, store)
     
     def take_damage(self, damage):
         """Prima damage"""
@@ -30,35 +38,46 @@ class Enemy:
         """Glavni distance method - koristi Chebyshev"""
         return self.chebyshev_distance(target)
     
-    def decide_action(self, player, game_map, other_enemies):
+    def decide_action(self, player, game_map, other_enemies, occupancy=None):
         """
         Odlučuje koju akciju izvršiti
         Override u child klasama
+        
+        occupancy: OccupancyGrid iz GameLoop-a (opcionalno) - ako je zadan,
+        koristi se direktno umjesto skupljanja zauzetih pozicija
         """
         raise NotImplementedError
     
-    def _get_occupied_positions(self, player, other_enemies):
-        """Vraća liste zauzenih pozicija"""
-        occupied = [(player.x, player.y)]
+    def _get_occupied_positions(self, player, other_enemies, occupancy=None):
+        """Vraća skup zauzetih pozicija (O(1) provjera za pathfinding)"""
+        if occupancy is not None:
+            return occupancy
+        occupied = {(player.x, player.y)}
         for enemy in other_enemies:
             if enemy.hp > 0 and enemy != self:
-                occupied.append((enemy.x, enemy.y))
+                occupied.add((enemy.x, enemy.y))
         return occupied
 
 
 class RangeEnemy(Enemy):
     """Range neprijatelj - napada s distance, drži se dalje od playera"""
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=3)
-        self.attack_range = 2  # Grid distance 2
-        self.preferred_distance = 2
+    __slots__ = ()
     
-    def decide_action(self, player, game_map, other_enemies):
+    KIND = KIND_RANGE
+    actions_per_turn = 1
+    attack_range = 2  # Grid distance 2
+    preferred_distance = 2
+    
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, RANGE_ENEMY_HP, store)
+    
+    def decide_action(self, player, game_map, other_enemies, occupancy=None):
         """
         Strategija: 
         - Ako je player u range-u (1-2) i IMA LOS -> napadni
-        - Ako je player u range-u ali NEMA LOS -> pomakni se
-        - Ako je player izvan range-a -> pomakni se
+        - Inače -> kiting: korak prema najbližem firing tile-u na
+          preferred_distance (influence mapa, zajednička za turn)
+        - Ako nijedan firing tile nije dostupan -> BFS prema playeru
         """
         distance = self.distance_to(player)
         
@@ -74,9 +93,15 @@ class RangeEnemy(Enemy):
             # U range-u ali NEMA LOS - idi se maknuti da dobiješ LOS
             # Fall through to movement
         
-        # PRIORITET 2: Približi se ili se pomakni za bolju poziciju
-        occupied = self._get_occupied_positions(player, other_enemies)
-        move_pos = get_next_move_towards(self, player, game_map, occupied)
+        # PRIORITET 2: Pomakni se prema firing poziciji
+        occupied = self._get_occupied_positions(player, other_enemies, occupancy)
+        influence = game_map.influence_map(
+            player.x, player.y, self.attack_range, self.preferred_distance
+        )
+        if influence.reachable(self.x, self.y):
+            move_pos = influence.step(self.x, self.y, occupied)
+        else:
+            move_pos = get_next_move_towards(self, player, game_map, occupied)
         
         if move_pos:
             return {
@@ -88,47 +113,21 @@ class RangeEnemy(Enemy):
     
     def _has_line_of_sight(self, target, game_map):
         """Provjerava da li ima liniju pogleda do targeta - samo planine blokiraju"""
-        from config.constants import TERRAIN_MOUNTAIN
-        
-        # Bresenham line algorithm za provjeru svih tile-ova između
-        x0, y0 = self.x, self.y
-        x1, y1 = target.x, target.y
-        
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-        
-        x, y = x0, y0
-        
-        while True:
-            # Skip start i end pozicije
-            if (x, y) != (x0, y0) and (x, y) != (x1, y1):
-                if game_map.get_terrain(x, y) == TERRAIN_MOUNTAIN:
-                    return False
-            
-            if x == x1 and y == y1:
-                break
-            
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-        
-        return True
+        # Bresenham linije su predizračunate po mapi (game/tiles.py)
+        return game_map.has_line_of_sight(self.x, self.y, target.x, target.y)
 
 
 class MeleeEnemy(Enemy):
     """Melee neprijatelj - agresivno se približava playeru"""
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=4)
-        self.actions_per_turn = 2
+    __slots__ = ()
+    
+    KIND = KIND_MELEE
+    actions_per_turn = 2
+    
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, MELEE_ENEMY_HP, store)
     
-    def decide_action(self, player, game_map, other_enemies):
+    def decide_action(self, player, game_map, other_enemies, occupancy=None):
         """
         Strategija:
         - Ako je player adjacent (grid distance 1 - SVI tile-ovi oko njega) -> napadni
@@ -148,7 +147,7 @@ class MeleeEnemy(Enemy):
             }
         
         # Inače se pomakni prema playeru koristeći pathfinding
-        occupied = self._get_occupied_positions(player, other_enemies)
+        occupied = self._get_occupied_positions(player, other_enemies, occupancy)
         move_pos = get_next_move_towards(self, player, game_map, occupied)
         
         if move_pos:
@@ -3,19 +3,24 @@
 # Uloga: Player entitet
 # ============================================================================
 
-class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.hp = 5
-        self.max_hp = 5
-        
-        # Akcije
-        self.actions_per_turn = 2
-        
-        # Attack ranges
-        self.melee_range = 1
-        self.range_attack_range = 2  # 2 pločice dalje od playera
+from config.constants import PLAYER_HP, PLAYER_ACTIONS
+from entities.store import EntityView, KIND_PLAYER
+
+class Player(EntityView):
+    """Player - pogled na svoj red u EntityStore-u (x, y, hp, max_hp)"""
+    __slots__ = ()
+    
+    KIND = KIND_PLAYER
+    
+    # Akcije
+    actions_per_turn = PLAYER_ACTIONS
+    
+    # Attack ranges
+    melee_range = 1
+    range_attack_range = 2  # 2 pločice dalje od playera
+    
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, PLAYER_HP, store)
     
     def take_damage(self, damage):
         """Prima damage"""
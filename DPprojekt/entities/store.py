@@ -0,0 +1,155 @@
+# ============================================================================
+# DATOTEKA: entities/store.py
+# Uloga: Struct-of-arrays spremište stanja svih jedinica
+# ============================================================================
+#
+# Autoritativno stanje (x, y, hp, max_hp, tip, acted) drži se u paralelnim
+# tipiziranim nizovima - jedan element po jedinici. Player/Enemy objekti su
+# samo tanki __slots__ pogledi (store, index) na te nizove, pa bulk
+# operacije (filtriranje živih, udaljenosti, export za Prolog) rade nad
+# nizovima bez obilaska objekata.
+#
+# Stupci su array.array - pojedinačni pristup (pogledi, GameLoop) vraća
+# obične int-ove i brži je nego nad NumPy nizom. Bulk operacije nad
+# VECTOR_MIN_UNITS i više jedinica rade vektorski nad NumPy pogledima na
+# iste buffere (np.frombuffer, bez kopiranja); ispod toga je Python petlja
+# brža od poziva u NumPy.
+
+from array import array
+
+import numpy as np
+
+# Od ovoliko jedinica bulk operacije idu kroz NumPy (stres tier-ovi)
+VECTOR_MIN_UNITS = 32
+
+KIND_PLAYER = 0
+KIND_RANGE = 1
+KIND_MELEE = 2
+
+# Imena tipova kakva očekuje Prolog agent (enemy(range, ...))
+KIND_NAMES = {
+    KIND_PLAYER: 'player',
+    KIND_RANGE: 'range',
+    KIND_MELEE: 'melee',
+}
+
+
+class EntityStore:
+    """Paralelni nizovi stanja jedinica"""
+    def __init__(self):
+        self.x = array('i')
+        self.y = array('i')
+        self.hp = array('i')
+        self.max_hp = array('i')
+        self.kind = array('B')
+        self.acted = array('B')
+
+    def add(self, kind, x, y, hp):
+        """Dodaje jedinicu i vraća njezin indeks"""
+        self.x.append(x)
+        self.y.append(y)
+        self.hp.append(hp)
+        self.max_hp.append(hp)
+        self.kind.append(kind)
+        self.acted.append(0)
+        return len(self.kind) - 1
+
+    def __len__(self):
+        return len(self.kind)
+
+    def columns(self, *names):
+        """NumPy pogledi na stupce bez kopiranja - ne čuvati ih preko add()"""
+        return [np.frombuffer(column, dtype=column.typecode)
+                for column in (getattr(self, name) for name in names)]
+
+    def _alive_enemy_mask(self):
+        hp, kind = self.columns('hp', 'kind')
+        return (hp > 0) & (kind != KIND_PLAYER)
+
+    def alive_indices(self, kinds=None):
+        """Indeksi živih jedinica (opcionalno samo zadanih tipova)"""
+        if len(self) >= VECTOR_MIN_UNITS:
+            hp, kind = self.columns('hp', 'kind')
+            alive = hp > 0
+            if kinds is not None:
+                alive &= np.isin(kind, list(kinds))
+            return np.flatnonzero(alive).tolist()
+        if kinds is None:
+            return [i for i, hp in enumerate(self.hp) if hp > 0]
+        return [i for i, (hp, kind) in enumerate(zip(self.hp, self.kind))
+                if hp > 0 and kind in kinds]
+
+    def alive_enemy_count(self):
+        """Broj živih neprijatelja"""
+        if len(self) >= VECTOR_MIN_UNITS:
+            return int(np.count_nonzero(self._alive_enemy_mask()))
+        return sum(1 for hp, kind in zip(self.hp, self.kind)
+                   if hp > 0 and kind != KIND_PLAYER)
+
+    def chebyshev_to(self, x, y):
+        """Grid (Chebyshev) udaljenost svih jedinica do (x, y)"""
+        if len(self) >= VECTOR_MIN_UNITS:
+            xs, ys = self.columns('x', 'y')
+            return np.maximum(np.abs(xs - x), np.abs(ys - y)).tolist()
+        return [max(abs(ux - x), abs(uy - y)) for ux, uy in zip(self.x, self.y)]
+
+    def reset_acted(self):
+        """Briše acted flag svim jedinicama"""
+        self.acted = array('B', bytes(len(self.acted)))
+
+    def export(self, index):
+        """Stanje jedne jedinice u formatu za Prolog agenta"""
+        return {'x': self.x[index], 'y': self.y[index], 'hp': self.hp[index]}
+
+    def export_enemies(self):
+        """Živi neprijatelji u formatu GameLoop._prepare_game_state"""
+        if len(self) >= VECTOR_MIN_UNITS:
+            alive = self._alive_enemy_mask()
+            # tolist() - int-ovi za JSON (agent service, match server)
+            kind, x, y, hp = (column[alive].tolist()
+                              for column in self.columns('kind', 'x', 'y', 'hp'))
+            return [
+                {'type': KIND_NAMES[k], 'x': ex, 'y': ey, 'hp': ehp}
+                for k, ex, ey, ehp in zip(kind, x, y, hp)
+            ]
+        return [
+            {'type': KIND_NAMES[kind], 'x': x, 'y': y, 'hp': hp}
+            for kind, x, y, hp in zip(self.kind, self.x, self.y, self.hp)
+            if hp > 0 and kind != KIND_PLAYER
+        ]
+
+
+def _column(name):
+    """Property koji čita/piše stupac `name` na indeksu pogleda"""
+    def getter(self):
+        return getattr(self.store, name)[self.index]
+
+    def setter(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(getter, setter)
+
+
+class EntityView:
+    """Tanki pogled na jednu jedinicu u EntityStore-u"""
+    __slots__ = ('store', 'index')
+
+    KIND = None
+
+    x = _column('x')
+    y = _column('y')
+    hp = _column('hp')
+    max_hp = _column('max_hp')
+
+    @property
+    def acted_this_turn(self):
+        return bool(self.store.acted[self.index])
+
+    @acted_this_turn.setter
+    def acted_this_turn(self, value):
+        self.store.acted[self.index] = 1 if value else 0
+
+    def __init__(self, x, y, hp, store=None):
+        # Bez zajedničkog store-a jedinica dobiva vlastiti (npr. u benchmarkovima)
+        self.store = store if store is not None else EntityStore()
+        self.index = self.store.add(self.KIND, x, y, hp)
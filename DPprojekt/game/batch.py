@@ -0,0 +1,425 @@
+# ============================================================================
+# DATOTEKA: game/batch.py
+# Uloga: Lockstep simulacija tisuća partija odjednom (NumPy)
+# ============================================================================
+#
+# Sve partije dijele veličinu mape. Stanje je složeno u nizove:
+#   terrain (G, C)  - teren po partiji, C = width * height (row-major)
+#   pos     (G, N)  - indeks ćelije svake jedinice, jedinica 0 je player
+#   hp      (G, N)  - mrtve jedinice ostaju s hp 0 (indeksi su stabilni)
+#   kind    (G, N)
+#
+# Svaka faza pravila je jedna NumPy operacija nad svim aktivnim partijama:
+# player akcija (vektorizirani greedy iz agent.pl), akcija jednog enemy
+# slota (napad ili BFS korak preko distance field-a), provjera pobjede.
+# Pravila su ista kao GameLoop._execute_action i entities/enemy.py, a
+# redoslijed provjera kao GameLoop.play_headless - za isti seed ishod i broj
+# turn-ova su isti kao kad GreedyAgent igra partiju po partiju.
+
+import numpy as np
+
+from config.constants import (
+    TERRAIN_GRASS, TERRAIN_MOUNTAIN, TERRAIN_WATER, PLAYER_ACTIONS, HEADLESS_MAX_TURNS,
+    AGENT_WEIGHTS
+)
+from entities.store import KIND_RANGE, KIND_MELEE
+from entities.enemy import RangeEnemy, MeleeEnemy
+from game import state as game_state
+from game.influence import PLAYER_MELEE_RANGE
+from game.tiles import line_cells, MAX_LINE_CELLS
+from game.walk import neighbour_table, all_pairs
+
+NO_WINNER = 0
+PLAYER_WON = 1
+ENEMIES_WON = 2
+DRAW = 3
+
+WINNER_NAMES = {PLAYER_WON: 'player', ENEMIES_WON: 'enemies', DRAW: None}
+
+MELEE_DAMAGE = 2
+RANGE_DAMAGE = 1
+
+# Budžet akcija po tipu (indeks = kind), kao InitiativeQueue
+ENEMY_BUDGET = np.zeros(3, dtype=np.int32)
+ENEMY_BUDGET[KIND_RANGE] = RangeEnemy.actions_per_turn
+ENEMY_BUDGET[KIND_MELEE] = MeleeEnemy.actions_per_turn
+
+# Smjerovi istim redoslijedom kao find_path_bfs i agent.pl
+DIRECTIONS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIRECTIONS_8 = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+NO_ACTION = -(1 << 20)
+UNREACHABLE = 1 << 20
+
+# LOS tablica je C^3 bool-ova - iznad ovoga je prevelika
+MAX_CELLS = MAX_LINE_CELLS
+
+
+class GridTables:
+    """Predizračunate tablice za jednu veličinu mape (susjedi, udaljenosti, LOS)"""
+    def __init__(self, width, height):
+        cells = width * height
+        if cells > MAX_CELLS:
+            raise ValueError(f"Batch engine podržava do {MAX_CELLS} ćelija, ne {cells}")
+        self.width = width
+        self.height = height
+        self.cells = cells
+
+        index = np.arange(cells)
+        self.xs = index % width
+        self.ys = index // width
+
+        # Susjedi - izvan mape pokazuje na sentinel stupac `cells`
+        self.neighbours4 = neighbour_table(width, height, DIRECTIONS_4)
+        self.neighbours8 = neighbour_table(width, height, DIRECTIONS_8)
+
+        self.chebyshev = np.maximum(
+            np.abs(self.xs[:, None] - self.xs[None, :]),
+            np.abs(self.ys[:, None] - self.ys[None, :])
+        )
+
+        # los_cells[a, b, c] - ćelija c je između a i b na Bresenham liniji
+        self.los_cells = line_cells(width, height)
+
+
+_tables_cache = {}
+
+
+def tables_for(width, height):
+    """GridTables se grade jednom po veličini mape"""
+    key = (width, height)
+    if key not in _tables_cache:
+        _tables_cache[key] = GridTables(width, height)
+    return _tables_cache[key]
+
+
+class BatchGames:
+    """
+    G nezavisnih partija koje se igraju u lockstep-u
+
+    Args:
+        states: lista game.state snapshot-a (player na potezu, turn 1)
+        max_turns: isto kao GameLoop.play_headless
+        weights: težine greedy prioriteta (nadopunjuju AGENT_WEIGHTS)
+    """
+    def __init__(self, states, max_turns=HEADLESS_MAX_TURNS, weights=None):
+        width, height = states[0][game_state.WIDTH], states[0][game_state.HEIGHT]
+        for state in states:
+            if (state[game_state.WIDTH], state[game_state.HEIGHT]) != (width, height):
+                raise ValueError("Sve partije u batch-u moraju imati istu veličinu mape")
+
+        self.tables = tables_for(width, height)
+        self.max_turns = max_turns
+        self.weights = dict(AGENT_WEIGHTS, **(weights or {}))
+        count = len(states)
+        units = max(len(state[game_state.UNITS]) for state in states)
+
+        self.terrain = np.frombuffer(
+            b''.join(state[game_state.TERRAIN] for state in states), dtype=np.uint8
+        ).reshape(count, self.tables.cells)
+        self.grass = self.terrain == TERRAIN_GRASS
+        self.mountain = self.terrain == TERRAIN_MOUNTAIN
+        self.water = self.terrain == TERRAIN_WATER
+        # Hodajuće udaljenosti (8 smjerova) za greedy prioritet move-a, kao game.walk
+        self.walk8 = all_pairs(self.grass, width, height, diagonal=True)
+        self.walk_unreachable = np.iinfo(self.walk8.dtype).max
+
+        # Partije s manje jedinica se popune mrtvima (budžet 0)
+        self.pos = np.zeros((count, units), dtype=np.intp)
+        self.hp = np.zeros((count, units), dtype=np.int32)
+        self.kind = np.zeros((count, units), dtype=np.intp)
+        for g, state in enumerate(states):
+            for i, (kind, x, y, hp) in enumerate(state[game_state.UNITS]):
+                self.pos[g, i] = y * width + x
+                self.hp[g, i] = hp
+                self.kind[g, i] = kind
+
+        self.turn = np.ones(count, dtype=np.int32)
+        self.winner = np.full(count, NO_WINNER, dtype=np.int8)
+        self.done = np.zeros(count, dtype=bool)
+
+    def __len__(self):
+        return len(self.done)
+
+    # ------------------------------------------------------------------
+    # Pomoćne operacije
+    # ------------------------------------------------------------------
+
+    def _occupied(self, games):
+        """(len(games), C + 1) - ćelije sa živim jedinicama (+ sentinel stupac)"""
+        occupied = np.zeros((len(games), self.tables.cells + 1), dtype=bool)
+        alive = self.hp[games] > 0
+        rows, units = np.nonzero(alive)
+        occupied[rows, self.pos[games][rows, units]] = True
+        return occupied
+
+    def _line_of_sight(self, games, src, dst):
+        """LOS za svaku partiju - samo planine blokiraju"""
+        between = self.tables.los_cells[src, dst]
+        return ~np.any(between & self.mountain[games], axis=1)
+
+    def _check(self, mask):
+        """GameLoop._check_game_state za partije u masci"""
+        mask = mask & ~self.done
+        lost = mask & (self.hp[:, 0] <= 0)
+        won = mask & ~lost & ~np.any(self.hp[:, 1:] > 0, axis=1)
+        self.winner[lost] = ENEMIES_WON
+        self.winner[won] = PLAYER_WON
+        self.done |= lost | won
+
+    # ------------------------------------------------------------------
+    # Player - vektorizirani greedy iz agent.pl
+    # ------------------------------------------------------------------
+
+    def _player_action(self, mask):
+        """
+        Jedna player akcija u svakoj partiji iz maske
+
+        Returns:
+            Maska partija u kojima player nije imao akciju (kraj turn-a)
+        """
+        tables = self.tables
+        weights = self.weights
+        games = np.nonzero(mask)[0]
+        rows = np.arange(len(games))
+        enemies = self.pos.shape[1] - 1
+
+        player = self.pos[games, 0]
+        enemy_pos = self.pos[games, 1:]
+        enemy_hp = self.hp[games, 1:]
+        alive = enemy_hp > 0
+        occupied = self._occupied(games)
+        distance = tables.chebyshev[player[:, None], enemy_pos]
+
+        # Slotovi redoslijedom findall-a u agent.pl: range, melee, push, move
+        priority = np.full((len(games), 3 * enemies + 8), NO_ACTION, dtype=np.float64)
+
+        for j in range(enemies):
+            in_range = alive[:, j] & (distance[:, j] >= 1) & (distance[:, j] <= 2)
+            if in_range.any():
+                los = self._line_of_sight(games, player, enemy_pos[:, j])
+                ok = in_range & los
+                priority[ok, j] = (weights['range_base']
+                                   - distance[:, j] * weights['range_distance']
+                                   - enemy_hp[:, j] * weights['range_hp'])[ok]
+
+        adjacent = alive & (distance == 1)
+        priority[:, enemies:2 * enemies] = np.where(
+            adjacent, weights['melee_base'] - enemy_hp * weights['melee_hp'], NO_ACTION)
+
+        # Push - smjer od playera prema neprijatelju
+        px, py = tables.xs[player][:, None], tables.ys[player][:, None]
+        ex, ey = tables.xs[enemy_pos], tables.ys[enemy_pos]
+        push_x = 2 * ex - px
+        push_y = 2 * ey - py
+        inside = (push_x >= 0) & (push_x < tables.width) & (push_y >= 0) & (push_y < tables.height)
+        push_cell = np.where(inside, push_y * tables.width + push_x, tables.cells)
+        padded_water = np.pad(self.water[games], ((0, 0), (0, 1)))
+        padded_grass = np.pad(self.grass[games], ((0, 0), (0, 1)))
+        into_water = padded_water[rows[:, None], push_cell]
+        onto_grass = padded_grass[rows[:, None], push_cell] & ~occupied[rows[:, None], push_cell]
+        push_priority = np.where(into_water, weights['push_water'],
+                                 np.where(onto_grass, weights['push_grass'], NO_ACTION))
+        priority[:, 2 * enemies:3 * enemies] = np.where(adjacent & inside, push_priority, NO_ACTION)
+
+        # Move - 8 smjerova, prioritet po hodajućoj udaljenosti (od neprijatelja
+        # do kandidata) do najbližeg živog neprijatelja, grid distance bez puta
+        targets = tables.neighbours8[player]
+        free = padded_grass[rows[:, None], targets] & ~occupied[rows[:, None], targets]
+        inside_targets = np.minimum(targets, tables.cells - 1)[:, :, None]
+        walk = self.walk8[games[:, None, None], enemy_pos[:, None, :], inside_targets]
+        walk = np.where(walk == self.walk_unreachable,
+                        tables.chebyshev[inside_targets, enemy_pos[:, None, :]], walk)
+        nearest = np.where(alive[:, None, :], walk, UNREACHABLE).min(axis=2)
+        move_priority = np.where(nearest < UNREACHABLE,
+                                 weights['move_base'] - nearest * weights['move_distance'], 30)
+        priority[:, 3 * enemies:] = np.where(free, move_priority, NO_ACTION)
+
+        # Prvi maksimum = stabilni sort(1, @>=, ...) u agent.pl
+        choice = priority.argmax(axis=1)
+        has_action = priority[rows, choice] > NO_ACTION
+        target = choice % enemies + 1 if enemies else choice
+
+        ranged = has_action & (choice < enemies)
+        melee = has_action & (choice >= enemies) & (choice < 2 * enemies)
+        push = has_action & (choice >= 2 * enemies) & (choice < 3 * enemies)
+        move = has_action & (choice >= 3 * enemies)
+
+        g, t = games[ranged], target[ranged]
+        self.hp[g, t] = np.maximum(0, self.hp[g, t] - RANGE_DAMAGE)
+        g, t = games[melee], target[melee]
+        self.hp[g, t] = np.maximum(0, self.hp[g, t] - MELEE_DAMAGE)
+
+        g, t = games[push], target[push]
+        new_cell = push_cell[rows[push], t - 1]
+        self.pos[g, t] = new_cell
+        drowned = into_water[rows[push], t - 1]
+        self.hp[g[drowned], t[drowned]] = 0
+
+        g = games[move]
+        self.pos[g, 0] = targets[rows[move], choice[move] - 3 * enemies]
+
+        no_action = np.zeros(len(self), dtype=bool)
+        no_action[games[~has_action]] = True
+        return no_action
+
+    # ------------------------------------------------------------------
+    # Neprijatelji - RangeEnemy / MeleeEnemy.decide_action
+    # ------------------------------------------------------------------
+
+    def _enemy_action(self, mask, unit):
+        """Jedna akcija jedinice `unit` u svakoj partiji iz maske"""
+        tables = self.tables
+        games = np.nonzero(mask)[0]
+        if not len(games):
+            return
+
+        player = self.pos[games, 0]
+        here = self.pos[games, unit]
+        kind = self.kind[games, unit]
+        distance = tables.chebyshev[here, player]
+
+        melee = (kind == KIND_MELEE) & (distance == 1)
+        ranged = (kind == KIND_RANGE) & (distance <= 2)
+        if ranged.any():
+            ranged &= self._line_of_sight(games, here, player)
+
+        self.hp[games[melee], 0] = np.maximum(0, self.hp[games[melee], 0] - MELEE_DAMAGE)
+        self.hp[games[ranged], 0] = np.maximum(0, self.hp[games[ranged], 0] - RANGE_DAMAGE)
+
+        moving = ~(melee | ranged)
+        kiting = moving & (kind == KIND_RANGE)
+        if kiting.any():
+            self._range_move(games[kiting], unit)
+        moving &= ~kiting
+        if moving.any():
+            self._enemy_move(games[moving], unit)
+
+    def _relax(self, field, passable):
+        """BFS distance field relaksacijom do fiksne točke (field ima sentinel stupac)"""
+        neighbours = self.tables.neighbours4
+        while True:
+            relaxed = field[:, neighbours].min(axis=2) + 1
+            updated = np.where(passable, np.minimum(field[:, :-1], relaxed), field[:, :-1])
+            if np.array_equal(updated, field[:, :-1]):
+                return field
+            field[:, :-1] = updated
+
+    def _range_move(self, games, unit):
+        """
+        RangeEnemy kiting - game.influence.InfluenceMap za sve partije odjednom
+
+        Goal tile-ovi (firing na preferred_distance izvan melee dosega, pa
+        sigurni firing, pa bilo koji firing), multi-source field do njih i
+        InfluenceMap.step nad slobodnim susjedima. Bez dostupnog goal-a
+        jedinica ide BFS-om prema playeru.
+        """
+        tables = self.tables
+        rows = np.arange(len(games))
+        player = self.pos[games, 0]
+        start = self.pos[games, unit]
+        grass = self.grass[games]
+
+        distance = tables.chebyshev[player]
+        between = tables.los_cells[:, player, :].transpose(1, 0, 2)
+        visible = ~np.any(between & self.mountain[games][:, None, :], axis=2)
+
+        firing = (grass & visible & (distance >= 1)
+                  & (distance <= RangeEnemy.attack_range))
+        safe = firing & (distance > PLAYER_MELEE_RANGE)
+        goal = safe & (distance == RangeEnemy.preferred_distance)
+        fallback = np.where(safe.any(axis=1)[:, None], safe, firing)
+        goal = np.where(goal.any(axis=1)[:, None], goal, fallback)
+
+        passable = grass.copy()
+        passable[rows, player] = False
+        field = np.full((len(games), tables.cells + 1), UNREACHABLE, dtype=np.int32)
+        field[:, :-1] = np.where(goal, 0, UNREACHABLE)
+        field = self._relax(field, passable)
+
+        here = field[rows, start]
+        reachable = here < UNREACHABLE
+
+        occupied = self._occupied(games)
+        options = tables.neighbours4[start]
+        option_value = np.where(occupied[rows[:, None], options], UNREACHABLE,
+                                field[rows[:, None], options])
+        best = option_value.argmin(axis=1)
+        step = reachable & (option_value[rows, best] < here)
+        self.pos[games[step], unit] = options[rows[step], best[step]]
+
+        if not reachable.all():
+            self._enemy_move(games[~reachable], unit)
+
+    def _enemy_move(self, games, unit):
+        """
+        find_path_bfs preko distance field-a od playera
+
+        BFS vraća prvog susjeda (redoslijedom DIRECTIONS_4) koji je na
+        najkraćem putu do cilja kad je početna ćelija zatvorena - to je
+        susjed s najmanjom udaljenošću u polju iz kojeg je start izbačen.
+        """
+        tables = self.tables
+        rows = np.arange(len(games))
+        player = self.pos[games, 0]
+        start = self.pos[games, unit]
+
+        occupied = self._occupied(games)
+        walkable = self.grass[games] & ~occupied[:, :-1]
+        walkable[rows, start] = False
+
+        field = np.full((len(games), tables.cells + 1), UNREACHABLE, dtype=np.int32)
+        field[rows, player] = 0
+        field = self._relax(field, walkable)
+
+        options = tables.neighbours4[start]
+        option_distance = field[rows[:, None], options]
+        best = option_distance.argmin(axis=1)
+        step = options[rows, best]
+
+        # Korak na playera nije validan move (zauzeto) - jedinica ostaje
+        valid = (option_distance[rows, best] < UNREACHABLE) & (step != player)
+        self.pos[games[valid], unit] = step[valid]
+
+    # ------------------------------------------------------------------
+    # Turn-ovi
+    # ------------------------------------------------------------------
+
+    def step_turn(self):
+        """Jedan puni turn (player pa neprijatelji) za sve aktivne partije"""
+        draw = ~self.done & (self.turn > self.max_turns)
+        self.winner[draw] = DRAW
+        self.done |= draw
+
+        turn_over = self.done.copy()
+        for _ in range(PLAYER_ACTIONS):
+            self._check(~turn_over)
+            acting = ~self.done & ~turn_over
+            if not acting.any():
+                break
+            turn_over |= self._player_action(acting)
+        self._check(~self.done)
+
+        # InitiativeQueue: po jedna akcija svima, pa druge akcije (melee)
+        budget = ENEMY_BUDGET[self.kind]
+        for used in range(int(ENEMY_BUDGET.max())):
+            for unit in range(1, self.pos.shape[1]):
+                self._check(~self.done)
+                acting = ~self.done & (self.hp[:, unit] > 0) & (budget[:, unit] > used)
+                self._enemy_action(acting, unit)
+        self._check(~self.done)
+
+        self.turn[~self.done] += 1
+
+    def run(self):
+        """Igra dok sve partije ne završe - vraća results()"""
+        while not self.done.all():
+            self.step_turn()
+        return self.results()
+
+    def results(self):
+        """Lista (pobjednik, turn) po partiji - isti format kao play_headless + turn_number"""
+        return [
+            (WINNER_NAMES.get(int(winner)), int(turn))
+            for winner, turn in zip(self.winner, self.turn)
+        ]
@@ -0,0 +1,218 @@
+# ============================================================================
+# DATOTEKA: game/influence.py
+# Uloga: Influence mapa za range neprijatelje (kiting) - NumPy
+# ============================================================================
+#
+# Jedna mapa po poziciji playera (tj. po enemy turn-u), izračunata za sve
+# tile-ove odjednom:
+#   distance - Chebyshev udaljenost do playera
+#   visible  - LOS od tile-a do playera (Bresenham kao _has_line_of_sight)
+#   firing   - prohodni tile-ovi s kojih se može pucati (1..attack_range + LOS)
+#   danger   - tile-ovi u melee dosegu playera
+#   goal     - najbolji firing tile-ovi: preferred_distance izvan opasnosti,
+#              pa bilo koji siguran firing tile, pa bilo koji firing tile
+#   field    - hodajuća udaljenost do najbližeg goal tile-a (multi-source BFS)
+#
+# Svaka range jedinica bira korak jednim pogledom u field (susjed s najmanjom
+# vrijednošću) umjesto vlastitih pretraga.
+#
+# prolog/agent.pl (kiting_layers) gradi isti goal i field iz fire/grass
+# bitmapa za pretragu - promjena pravila ovdje mijenja i tamo
+# (benchmarks.parity --checks prolog).
+
+from functools import lru_cache
+
+import numpy as np
+
+from config.constants import TERRAIN_GRASS, TERRAIN_MOUNTAIN
+
+UNREACHABLE = np.iinfo(np.int32).max // 2
+
+PLAYER_MELEE_RANGE = 1
+
+# Isti redoslijed kao find_path_bfs
+DIRECTIONS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+def _clear_lines(flat_mountain, width, x, y, tx, ty, steps):
+    """
+    Bresenham od (x, y) do (tx, ty) za niz parova odjednom - True ako
+    nijedan tile između krajeva nije planina
+    """
+    x = x.copy()
+    y = y.copy()
+    dx = np.abs(tx - x)
+    dy = np.abs(ty - y)
+    sx = np.where(x < tx, 1, -1)
+    sy = np.where(y < ty, 1, -1)
+    err = dx - dy
+
+    visible = np.ones(x.shape, dtype=bool)
+    active = ~((x == tx) & (y == ty))
+
+    for _ in range(steps):
+        if not active.any():
+            break
+        e2 = 2 * err
+        step_x = active & (e2 > -dy)
+        step_y = active & (e2 < dx)
+        err = err - np.where(step_x, dy, 0) + np.where(step_y, dx, 0)
+        x = np.where(step_x, x + sx, x)
+        y = np.where(step_y, y + sy, y)
+
+        arrived = (x == tx) & (y == ty)
+        # Krajevi linije se ne provjeravaju, samo tile-ovi između
+        between = active & ~arrived
+        visible &= ~(between & flat_mountain[y * width + x])
+        active &= ~arrived
+
+    return visible
+
+
+def line_of_sight_to(mountain, tx, ty):
+    """
+    LOS od svakog tile-a do (tx, ty) - Bresenham za sve tile-ove odjednom
+
+    Args:
+        mountain: bool (H, W) - blokirajući tile-ovi
+    Returns:
+        bool (H, W)
+    """
+    height, width = mountain.shape
+    ys, xs = np.indices((height, width))
+    visible = _clear_lines(mountain.ravel(), width, xs.ravel(), ys.ravel(),
+                           tx, ty, max(width, height))
+    return visible.reshape(height, width)
+
+
+def line_of_sight_matrix(mountain, block=1 << 16):
+    """
+    LOS za sve parove tile-ova: [a, b] je True ako je linija a -> b čista
+    (a, b su row-major indeksi). Parovi se obrađuju u blokovima da
+    privremeni nizovi ostanu mali i na velikim mapama.
+    """
+    height, width = mountain.shape
+    cells = width * height
+    flat_mountain = mountain.ravel()
+    index = np.arange(cells)
+    xs = index % width
+    ys = index // width
+
+    visible = np.empty((cells, cells), dtype=bool)
+    rows = max(1, block // cells)
+    for start in range(0, cells, rows):
+        sources = index[start:start + rows]
+        a = np.repeat(sources, cells)
+        b = np.tile(index, len(sources))
+        clear = _clear_lines(flat_mountain, width, xs[a], ys[a], xs[b], ys[b],
+                             max(width, height))
+        visible[start:start + len(sources)] = clear.reshape(len(sources), cells)
+    return visible
+
+
+def distance_field(passable, sources):
+    """
+    Multi-source BFS udaljenost (4 smjera) kroz prohodne tile-ove
+
+    Args:
+        passable: bool (H, W)
+        sources: bool (H, W) - tile-ovi s udaljenošću 0
+    """
+    field = np.where(sources, 0, UNREACHABLE).astype(np.int32)
+    padded = np.full((field.shape[0] + 2, field.shape[1] + 2), UNREACHABLE, dtype=np.int32)
+    while True:
+        padded[1:-1, 1:-1] = field
+        nearest = np.minimum(
+            np.minimum(padded[:-2, 1:-1], padded[2:, 1:-1]),
+            np.minimum(padded[1:-1, :-2], padded[1:-1, 2:])
+        ) + 1
+        relaxed = np.where(passable, np.minimum(field, nearest), field)
+        if np.array_equal(relaxed, field):
+            return field
+        field = relaxed
+
+
+class InfluenceMap:
+    """Influence mapa za jednu poziciju playera"""
+    def __init__(self, terrain, player_x, player_y, attack_range=2, preferred_distance=2):
+        terrain = np.asarray(terrain, dtype=np.uint8)
+        height, width = terrain.shape
+        self.width = width
+        self.height = height
+        self.player = (player_x, player_y)
+
+        walkable = terrain == TERRAIN_GRASS
+        ys, xs = np.indices((height, width))
+        self.distance = np.maximum(np.abs(xs - player_x), np.abs(ys - player_y))
+        self.visible = line_of_sight_to(terrain == TERRAIN_MOUNTAIN, player_x, player_y)
+
+        in_range = (self.distance >= 1) & (self.distance <= attack_range)
+        self.firing = walkable & in_range & self.visible
+        self.danger = self.distance <= PLAYER_MELEE_RANGE
+
+        safe = self.firing & ~self.danger
+        goal = safe & (self.distance == preferred_distance)
+        if not goal.any():
+            goal = safe if safe.any() else self.firing
+        self.goal = goal
+
+        # Kroz playera se ne prolazi
+        passable = walkable.copy()
+        passable[player_y, player_x] = False
+        self.field = distance_field(passable, goal)
+
+    @classmethod
+    def from_state(cls, state, player_x, player_y, attack_range=2, preferred_distance=2):
+        """Influence mapa nad game.state snapshot-om"""
+        terrain, width, height, _units = state
+        grid = np.frombuffer(terrain, dtype=np.uint8).reshape(height, width)
+        return cls(grid, player_x, player_y, attack_range, preferred_distance)
+
+    def reachable(self, x, y):
+        """Može li se s (x, y) doći do nekog goal tile-a"""
+        return self.field[y, x] < UNREACHABLE
+
+    def step(self, x, y, occupied):
+        """
+        Kiting korak s (x, y): slobodni susjed s najmanjom field vrijednošću
+        (prvi po redoslijedu DIRECTIONS_4), samo ako je bliži cilju.
+
+        Args:
+            occupied: skup {(x, y), ...} ili OccupancyGrid
+        Returns:
+            (x, y) ili None
+        """
+        best = None
+        best_value = self.field[y, x]
+        for dx, dy in DIRECTIONS_4:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                continue
+            if (nx, ny) in occupied:
+                continue
+            value = self.field[ny, nx]
+            if value < best_value:
+                best = (nx, ny)
+                best_value = value
+        return best
+
+
+# InfluenceMap za GameMap drži sama mapa (GameMap.influence_map). Agenti
+# nad game.state snapshot-ima dijele ograničeni LRU keš po (teren, pozicija
+# playera) - partije koje se izmjenjuju (match server) ne izbacuju jedna
+# drugoj jedini unos, a ogromne mape ne drže neograničeno nizova.
+STATE_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=STATE_CACHE_SIZE)
+def _influence_for_terrain(terrain, width, height, player_x, player_y, attack_range,
+                           preferred_distance):
+    return InfluenceMap.from_state((terrain, width, height, ()), player_x, player_y,
+                                   attack_range, preferred_distance)
+
+
+def influence_for_state(state, player_x, player_y, attack_range=2, preferred_distance=2):
+    """Keširana InfluenceMap za game.state (ključ su terrain bytes, ne identitet)"""
+    terrain, width, height, _units = state
+    return _influence_for_terrain(terrain, width, height, player_x, player_y,
+                                  attack_range, preferred_distance)
@@ -4,44 +4,86 @@
 # ============================================================================
 
 import random
+import numpy as np
 from config.constants import TERRAIN_GRASS, TERRAIN_MOUNTAIN, TERRAIN_WATER
+from game import walk
+from game.influence import InfluenceMap
+from game.tiles import tile_tables, line_is_clear
+from game.terrain import ChunkedTerrain, TerrainRows, CHUNK_BITS, CHUNK_MASK
+
+# Zadani udjeli terena (trava, planina, voda) pri generiranju
+DEFAULT_TERRAIN_MIX = (0.80, 0.10, 0.10)
+
+# Iznad ovoliko tile-ova se najbliži povezani tile traži po prstenovima oko
+# izoliranog tile-a umjesto prolaza kroz sve povezane (O(n) po tile-u)
+RING_SEARCH_CELLS = 4096
 
 class GameMap:
-    def __init__(self, width, height):
+    def __init__(self, width, height, rng=None, terrain_mix=None):
         self.width = width
         self.height = height
-        self.grid = self._generate_map()
+        # Vlastiti random.Random za generiranje u pozadinskoj dretvi
+        # (zadano globalni random - seed-ane partije ostaju iste)
+        self.rng = rng if rng is not None else random
+        self.terrain_mix = terrain_mix or DEFAULT_TERRAIN_MIX
+        # Teren se čuva samo u komadima (game/terrain.py) i generira se
+        # direktno u njih - gustog grida nema ni pri generiranju
+        self._set_terrain_store(self._generate_map())
+    
+    @classmethod
+    def from_grid(cls, grid, rng=None):
+        """GameMap s gotovim terenom (npr. primljenim od match servera) - bez generiranja"""
+        game_map = cls.__new__(cls)
+        game_map.width = len(grid[0]) if grid else 0
+        game_map.height = len(grid)
+        game_map.rng = rng if rng is not None else random
+        game_map.terrain_mix = DEFAULT_TERRAIN_MIX
+        game_map._set_terrain_store(ChunkedTerrain.from_rows(grid))
+        return game_map
+    
+    def _set_terrain_store(self, terrain):
+        self.terrain = terrain
+        # get_terrain čita listu komada direktno
+        self._chunks = terrain.chunks
+        self._chunks_x = terrain.chunks_x
+        # Pogled na retke za game_state['terrain'] - isti objekt cijelu
+        # partiju (teren se nakon generiranja ne mijenja), pa keševi agenata
+        # po identitetu terena pogađaju
+        self.rows = TerrainRows(terrain)
+        # Tablice izvedene iz terena (tiles, walk, influence) - vlasnik je
+        # mapa, pa partije koje se izmjenjuju (match server) ne dijele keš
+        self._tables = {}
+    
+    def _terrain_array(self):
+        """Teren kao numpy uint8 (height, width) za graditelje tablica"""
+        return np.frombuffer(self.terrain.flat(), dtype=np.uint8).reshape(self.height, self.width)
     
     def _generate_map(self):
         """Generira random mapu s više livade"""
-        grid = []
+        # Trava je zadana u komadima - upisuju se samo planine i voda
+        terrain = ChunkedTerrain(self.width, self.height)
+        grass, mountain, _water = self.terrain_mix
+        # Zadano 80% grass (bilo 65%), 10% mountain (bilo 20%), 10% water (bilo 15%)
+        mountain_limit = grass + mountain
         
         for y in range(self.height):
-            row = []
             for x in range(self.width):
                 # Random terrain s MNOGO više livade
-                rand = random.random()
-                if rand < 0.80:  # 80% grass (bilo 65%)
-                    terrain = TERRAIN_GRASS
-                elif rand < 0.90:  # 10% mountain (bilo 20%)
-                    terrain = TERRAIN_MOUNTAIN
-                else:  # 10% water (bilo 15%)
-                    terrain = TERRAIN_WATER
-                
-                row.append(terrain)
-            grid.append(row)
+                rand = self.rng.random()
+                if rand >= grass:
+                    terrain.set(x, y, TERRAIN_MOUNTAIN if rand < mountain_limit else TERRAIN_WATER)
         
         # Osiguraj da mapa ima dovoljno walkable tile-ova i da je povezana
-        self._ensure_playability(grid)
+        self._ensure_playability(terrain)
+        # Komadi koje je popravak pretvorio u svu travu vraćaju se na sentinel
+        terrain.compact()
     
-        return grid
+        return terrain
 
-    def _ensure_playability(self, grid):
+    def _ensure_playability(self, terrain):
         """Osigurava da mapa ima dovoljno prolaznih tile-ova i da su povezani"""
         # 1. Osiguraj minimalno 70% walkable tiles
-        walkable_count = sum(
-            1 for row in grid for cell in row if cell == TERRAIN_GRASS
-        )
+        walkable_count = terrain.count(TERRAIN_GRASS)
         
         total_tiles = self.width * self.height
         min_walkable = int(total_tiles * 0.70)  # Barem 70% walkable
@@ -53,20 +95,21 @@ class GameMap:
                 for x in range(self.width):
                     if tiles_to_fix <= 0:
                         break
-                    if grid[y][x] != TERRAIN_GRASS:
-                        grid[y][x] = TERRAIN_GRASS
+                    if terrain.get(x, y) != TERRAIN_GRASS:
+                        terrain.set(x, y, TERRAIN_GRASS)
                         tiles_to_fix -= 1
         
         # 2. Osiguraj connectivity - flood fill od (0,0)
-        self._ensure_connectivity(grid)
+        self._ensure_connectivity(terrain)
 
-    def _ensure_connectivity(self, grid):
+    def _ensure_connectivity(self, terrain):
         """Osigurava da su sve walkable tile-ove povezane"""
+        get = terrain.get
         # Pronađi prvu walkable poziciju
         start_x, start_y = None, None
         for y in range(self.height):
             for x in range(self.width):
-                if grid[y][x] == TERRAIN_GRASS:
+                if get(x, y) == TERRAIN_GRASS:
                     start_x, start_y = x, y
                     break
             if start_x is not None:
@@ -85,7 +128,7 @@ class GameMap:
                 continue
             if not (0 <= x < self.width and 0 <= y < self.height):
                 continue
-            if grid[y][x] != TERRAIN_GRASS:
+            if get(x, y) != TERRAIN_GRASS:
                 continue
             
             visited.add((x, y))
@@ -98,22 +141,25 @@ class GameMap:
         # ili napravi puteve do njih
         for y in range(self.height):
             for x in range(self.width):
-                if grid[y][x] == TERRAIN_GRASS and (x, y) not in visited:
+                if get(x, y) == TERRAIN_GRASS and (x, y) not in visited:
                     # Ova tile je izolirano - napravi put do nje
-                    self._create_path_to(grid, x, y, visited)
+                    self._create_path_to(terrain, x, y, visited)
 
-    def _create_path_to(self, grid, target_x, target_y, connected_tiles):
+    def _create_path_to(self, terrain, target_x, target_y, connected_tiles):
         """Stvara put od connected area do target tile-a"""
         # Jednostavna implementacija - napravi direktan put
         # Pronađi najbližu connected tile
-        min_dist = float('inf')
-        closest = None
-        
-        for (cx, cy) in connected_tiles:
-            dist = abs(target_x - cx) + abs(target_y - cy)
-            if dist < min_dist:
-                min_dist = dist
-                closest = (cx, cy)
+        if self.width * self.height > RING_SEARCH_CELLS:
+            closest = self._nearest_by_rings(target_x, target_y, connected_tiles)
+        else:
+            min_dist = float('inf')
+            closest = None
+            
+            for (cx, cy) in connected_tiles:
+                dist = abs(target_x - cx) + abs(target_y - cy)
+                if dist < min_dist:
+                    min_dist = dist
+                    closest = (cx, cy)
         
         if closest is None:
             return
@@ -130,19 +176,70 @@ class GameMap:
             elif y > target_y:
                 y -= 1
             
-            grid[y][x] = TERRAIN_GRASS
+            terrain.set(x, y, TERRAIN_GRASS)
             connected_tiles.add((x, y))
     
+    def _nearest_by_rings(self, target_x, target_y, connected_tiles):
+        """Najbliži connected tile (Manhattan) - prsten po prsten oko cilja"""
+        for dist in range(1, self.width + self.height):
+            for dx in range(-dist, dist + 1):
+                rest = dist - abs(dx)
+                for dy in ((rest, -rest) if rest else (0,)):
+                    if (target_x + dx, target_y + dy) in connected_tiles:
+                        return (target_x + dx, target_y + dy)
+        return None
+    
     def get_terrain(self, x, y):
         """Vraća tip terena na poziciji"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.grid[y][x]
+            return self._chunks[(y >> CHUNK_BITS) * self._chunks_x + (x >> CHUNK_BITS)][
+                ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)]
         return None
     
     def is_walkable(self, x, y):
         """Provjerava da li se može hodati na tile"""
-        terrain = self.get_terrain(x, y)
-        return terrain == TERRAIN_GRASS
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._chunks[(y >> CHUNK_BITS) * self._chunks_x + (x >> CHUNK_BITS)][
+                ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)] == TERRAIN_GRASS
+        return False
+    
+    def walk_distances(self, diagonal=False):
+        """
+        Hodajuće udaljenosti između svih tile-ova (game/walk.py) - gradi se
+        lijeno, jednom po mapi. None ako je mapa prevelika za tablicu.
+        """
+        key = ('walk', diagonal)
+        tables = self._tables
+        if key not in tables:
+            tables[key] = walk.walk_distances(self.terrain.flat(), self.width, self.height, diagonal)
+        return tables[key]
+    
+    def tile_tables(self):
+        """Bitmape po tile-u (game/tiles.py) ili None ako je mapa prevelika"""
+        tables = self._tables
+        if 'tiles' not in tables:
+            tables['tiles'] = tile_tables(self._terrain_array())
+        return tables['tiles']
+    
+    def has_line_of_sight(self, x0, y0, x1, y1):
+        """LOS iz tablica mape ili Bresenhamom za velike mape - samo planine blokiraju"""
+        tables = self.tile_tables()
+        if tables is not None:
+            return tables.has_line_of_sight(x0, y0, x1, y1)
+        return line_is_clear(self.get_terrain, self.width, x0, y0, x1, y1)
+    
+    def influence_map(self, player_x, player_y, attack_range=2, preferred_distance=2):
+        """
+        InfluenceMap (game/influence.py) za poziciju playera - jedna po mapi:
+        player stoji dok neprijatelji igraju, pa je dijele sve range jedinice
+        u turn-u
+        """
+        key = (player_x, player_y, attack_range, preferred_distance)
+        last = self._tables.get('influence')
+        if last is None or last[0] != key:
+            last = self._tables['influence'] = (key, InfluenceMap(
+                self._terrain_array(), player_x, player_y, attack_range, preferred_distance))
+        return last[1]
     
     def get_random_walkable_position(self, exclude=None):
         """Vraća random walkable poziciju"""
@@ -153,8 +250,8 @@ class GameMap:
         max_attempts = 100
         
         while attempts < max_attempts:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
+            x = self.rng.randint(0, self.width - 1)
+            y = self.rng.randint(0, self.height - 1)
             
             if self.is_walkable(x, y) and (x, y) not in exclude:
                 return (x, y)
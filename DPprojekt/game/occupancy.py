@@ -0,0 +1,49 @@
+# ============================================================================
+# DATOTEKA: game/occupancy.py
+# Uloga: Prostorni indeks - koja živa jedinica stoji na kojem tile-u
+# ============================================================================
+
+class OccupancyGrid:
+    """
+    Hash mapa (x, y) -> živi entitet
+
+    GameLoop je ažurira na svaki move, push i smrt, pa su upiti
+    "tko je na (x, y)" i "je li slobodno" O(1) bez obzira na broj
+    neprijatelja. Podržava `in` pa se može proslijediti pathfindingu
+    kao skup zauzetih pozicija.
+    """
+    def __init__(self, entities=()):
+        self.cells = {}
+        for entity in entities:
+            self.add(entity)
+
+    def add(self, entity):
+        """Dodaje živi entitet na njegovu trenutnu poziciju"""
+        if entity.hp > 0:
+            self.cells[(entity.x, entity.y)] = entity
+
+    def remove(self, entity):
+        """Miče entitet (npr. nakon smrti)"""
+        pos = (entity.x, entity.y)
+        if self.cells.get(pos) is entity:
+            del self.cells[pos]
+
+    def move(self, entity, new_pos):
+        """Pomiče entitet i ažurira indeks"""
+        self.remove(entity)
+        entity.x, entity.y = new_pos
+        self.add(entity)
+
+    def at(self, x, y):
+        """Vraća entitet na poziciji ili None"""
+        return self.cells.get((x, y))
+
+    def is_free(self, x, y):
+        """Provjerava da li na poziciji nema žive jedinice"""
+        return (x, y) not in self.cells
+
+    def __contains__(self, pos):
+        return pos in self.cells
+
+    def __len__(self):
+        return len(self.cells)
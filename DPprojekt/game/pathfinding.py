@@ -1,5 +1,6 @@
 from collections import deque
-from config.constants import TERRAIN_GRASS, GRID_SIZE
+from config.constants import TERRAIN_GRASS
+from diagnostics.metrics import metrics
 
 def find_path_bfs(start_x, start_y, target_x, target_y, game_map, occupied_positions):
     """
@@ -9,7 +10,7 @@ def find_path_bfs(start_x, start_y, target_x, target_y, game_map, occupied_posit
         start_x, start_y: početna pozicija
         target_x, target_y: ciljna pozicija
         game_map: GameMap objekt
-        occupied_positions: lista pozicija koje su zauzete [(x,y), ...]
+        occupied_positions: zauzete pozicije - skup {(x,y), ...} ili OccupancyGrid
     
     Returns:
         Sljedeća pozicija (x, y) prema cilju, ili None ako nema puta
@@ -17,7 +18,16 @@ def find_path_bfs(start_x, start_y, target_x, target_y, game_map, occupied_posit
     if start_x == target_x and start_y == target_y:
         return None
     
+    # Statička tablica udaljenosti: ako nema puta ni bez jedinica, nema ga
+    # ni s njima - BFS se preskače
+    walk_distances = game_map.walk_distances()
+    if walk_distances is not None and walk_distances.distance(
+            start_x, start_y, target_x, target_y) is None:
+        metrics.count('pathfinding.unreachable')
+        return None
+    
     # BFS
+    width, height = game_map.width, game_map.height
     queue = deque([(start_x, start_y, [])])  # (x, y, path)
     visited = {(start_x, start_y)}
     
@@ -29,7 +39,7 @@ def find_path_bfs(start_x, start_y, target_x, target_y, game_map, occupied_posit
             nx, ny = x + dx, y + dy
             
             # Skip ako je izvan granica
-            if not (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE):
+            if not (0 <= nx < width and 0 <= ny < height):
                 continue
             
             # Skip ako je već posjećeno
@@ -69,17 +79,18 @@ def get_next_move_towards(entity, target, game_map, occupied_positions):
         entity: entitet koji se kreće
         target: cilj (mora imati .x i .y)
         game_map: GameMap objekt
-        occupied_positions: lista zauzenih pozicija
+        occupied_positions: skup zauzetih pozicija (ili OccupancyGrid)
     
     Returns:
         Tuple (x, y) sljedeće pozicije ili None
     """
-    next_pos = find_path_bfs(
-        entity.x, entity.y,
-        target.x, target.y,
-        game_map,
-        occupied_positions
-    )
+    with metrics.timer('pathfinding.towards'):
+        next_pos = find_path_bfs(
+            entity.x, entity.y,
+            target.x, target.y,
+            game_map,
+            occupied_positions
+        )
     
     return next_pos
 
@@ -92,12 +103,13 @@ def get_next_move_away_from(entity, threat, game_map, occupied_positions, max_se
         entity: entitet koji se kreće
         threat: prijetnja od koje bježimo
         game_map: GameMap objekt
-        occupied_positions: lista zauzenih pozicija
+        occupied_positions: skup zauzetih pozicija (ili OccupancyGrid)
         max_search: maksimalna dubina pretraživanja
     
     Returns:
         Tuple (x, y) sljedeće pozicije ili None
     """
+    metrics.count('pathfinding.away')
     current_dist = max(abs(entity.x - threat.x), abs(entity.y - threat.y))
     
     best_move = None
@@ -108,7 +120,7 @@ def get_next_move_away_from(entity, threat, game_map, occupied_positions, max_se
         nx, ny = entity.x + dx, entity.y + dy
         
         # Skip ako je izvan granica
-        if not (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE):
+        if not (0 <= nx < game_map.width and 0 <= ny < game_map.height):
             continue
         
         # Skip ako je terrain neprohodan
@@ -0,0 +1,129 @@
+# ============================================================================
+# DATOTEKA: game/scenarios.py
+# Uloga: Scenariji kao podaci - dimenzije mape, mješavina terena, jedinice
+# ============================================================================
+#
+# Scenarij opisuje jednu vrstu partije:
+#   width, height - dimenzije mape
+#   terrain       - udjeli (trava, planina, voda) pri generiranju
+#                   (GameMap i dalje osigura barem 70% trave i povezanost)
+#   enemies       - broj neprijatelja po vrsti, npr. {'range': 1, 'melee': 1}
+# GameLoop(scenario=...) stvara mapu i jedinice prema scenariju; bez njega
+# se igra DEFAULT_SCENARIO (6x6, jedan range i jedan melee).
+#
+# Scenariji se mogu čitati iz JSON-a (lista objekata s istim poljima), a
+# stress_tiers() generira stupnjevane stres scenarije od 6x6 s 2
+# neprijatelja do 256x256 s 500 (geometrijski između) za mjerenje
+# performansi na velikim mapama.
+#
+# Napomena: PrologAgent radi samo s kvadratnim mapama do MAX_TILE_CELLS
+# tile-ova (bitmape u game/tiles.py) - veće tier-ove igraju Python agenti;
+# main.py i benchmarks/stress.py odbijaju takav scenarij s prolog backendom
+# (PrologAgent.check_map).
+
+import json
+
+from config.constants import GRID_SIZE
+from entities.enemy import RangeEnemy, MeleeEnemy
+from game.map import GameMap, DEFAULT_TERRAIN_MIX
+
+# Vrsta neprijatelja u scenariju -> klasa (redoslijed = redoslijed stvaranja)
+ENEMY_CLASSES = {
+    'range': RangeEnemy,
+    'melee': MeleeEnemy,
+}
+
+
+class Scenario:
+    """
+    Jedna vrsta partije
+
+    Args:
+        name: ime scenarija (CLI, izvještaji)
+        width, height: dimenzije mape
+        enemies: {'range': n, 'melee': m}
+        terrain: udjeli (trava, planina, voda)
+    """
+    def __init__(self, name, width, height, enemies, terrain=DEFAULT_TERRAIN_MIX):
+        unknown = set(enemies) - set(ENEMY_CLASSES)
+        if unknown:
+            raise ValueError(f"Nepoznate vrste neprijatelja: {sorted(unknown)}")
+        if abs(sum(terrain) - 1.0) > 1e-9:
+            raise ValueError(f"Udjeli terena moraju dati 1, ne {sum(terrain)}")
+        if 1 + sum(enemies.values()) > width * height * 0.7:
+            raise ValueError(f"{name}: previše jedinica za {width}x{height} mapu")
+        self.name = name
+        self.width = width
+        self.height = height
+        self.enemies = {kind: enemies.get(kind, 0) for kind in ENEMY_CLASSES}
+        self.terrain = tuple(terrain)
+
+    @property
+    def enemy_count(self):
+        return sum(self.enemies.values())
+
+    def make_map(self, rng=None):
+        """Nova mapa prema scenariju (rng kao u GameMap)"""
+        return GameMap(self.width, self.height, rng, self.terrain)
+
+    def enemy_classes(self):
+        """Klase neprijatelja redom kojim se stvaraju"""
+        for kind, cls in ENEMY_CLASSES.items():
+            for _ in range(self.enemies[kind]):
+                yield cls
+
+    def to_dict(self):
+        return {'name': self.name, 'width': self.width, 'height': self.height,
+                'enemies': dict(self.enemies), 'terrain': list(self.terrain)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['width'], data['height'], data['enemies'],
+                   tuple(data.get('terrain', DEFAULT_TERRAIN_MIX)))
+
+    def __repr__(self):
+        return f"Scenario({self.name}: {self.width}x{self.height}, {self.enemies})"
+
+
+DEFAULT_SCENARIO = Scenario('default', GRID_SIZE, GRID_SIZE, {'range': 1, 'melee': 1})
+
+
+def stress_tiers(tiers=6, min_size=6, max_size=256, min_enemies=2, max_enemies=500,
+                 terrain=DEFAULT_TERRAIN_MIX):
+    """
+    Stupnjevani stres scenariji - veličina mape i broj neprijatelja rastu
+    geometrijski od (min_size, min_enemies) do (max_size, max_enemies).
+    Pola neprijatelja su range, pola melee.
+    """
+    scenarios = []
+    for i in range(tiers):
+        t = i / (tiers - 1) if tiers > 1 else 1.0
+        size = round(min_size * (max_size / min_size) ** t)
+        count = round(min_enemies * (max_enemies / min_enemies) ** t)
+        ranged = count // 2
+        scenarios.append(Scenario(f"stress-{i + 1}", size, size,
+                                  {'range': ranged, 'melee': count - ranged}, terrain))
+    return scenarios
+
+
+def load_scenarios(path):
+    """Scenariji iz JSON datoteke (lista objekata kao Scenario.to_dict)"""
+    with open(path) as f:
+        return [Scenario.from_dict(data) for data in json.load(f)]
+
+
+def builtin_scenarios():
+    """Ime -> scenarij za zadani scenarij i stres tier-ove"""
+    scenarios = {DEFAULT_SCENARIO.name: DEFAULT_SCENARIO}
+    scenarios.update((scenario.name, scenario) for scenario in stress_tiers())
+    return scenarios
+
+
+def get_scenario(name_or_path):
+    """Ugrađeni scenarij po imenu ili prvi scenarij iz JSON datoteke"""
+    scenarios = builtin_scenarios()
+    if name_or_path in scenarios:
+        return scenarios[name_or_path]
+    if name_or_path.endswith('.json'):
+        return load_scenarios(name_or_path)[0]
+    raise ValueError(f"Nepoznat scenarij: {name_or_path} (ugrađeni: {', '.join(scenarios)})")
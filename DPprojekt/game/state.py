@@ -0,0 +1,208 @@
+# ============================================================================
+# DATOTEKA: game/state.py
+# Uloga: Nepromjenjivi kompaktni snapshot stanja igre + čisti apply/undo
+# ============================================================================
+#
+# Stanje je običan tuple:
+#   (terrain, width, height, units)
+#   terrain - bytes, row-major (terrain[y * width + x]), dijeli se između stanja
+#   units   - tuple (kind, x, y, hp) po jedinici, units[0] je player
+#
+# Mrtve jedinice ostaju u tuple-u s hp 0 pa su indeksi stabilni. Kopija
+# stanja je samo referenca, a apply() gradi novi units tuple - originalno
+# stanje se nikad ne mijenja, pa je undo samo povratak na prethodno stanje.
+#
+# Akcije su tuple-ovi s istim imenima kao dict akcije u GameLoop-u:
+#   ('move', x, y)
+#   ('melee_attack', tx, ty, damage)
+#   ('melee_push', tx, ty, dx, dy)
+#   ('range_attack', tx, ty, damage)
+
+from config.constants import TERRAIN_MOUNTAIN, TERRAIN_WATER
+from entities.store import KIND_PLAYER
+from game.terrain import flat_terrain
+
+TERRAIN = 0
+WIDTH = 1
+HEIGHT = 2
+UNITS = 3
+
+PLAYER_INDEX = 0
+
+
+def make_state(grid, units):
+    """Gradi stanje iz terena (2D grid ili GameMap.rows) i liste (kind, x, y, hp)"""
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    terrain = flat_terrain(grid)
+    return (terrain, width, height, tuple(tuple(u) for u in units))
+
+
+def from_game(game):
+    """Snapshot trenutnog stanja GameLoop-a (player prvi, pa neprijatelji)"""
+    store = game.entities
+    order = [game.player.index] + [enemy.index for enemy in game.enemies]
+    units = [
+        (store.kind[i], store.x[i], store.y[i], store.hp[i])
+        for i in order
+    ]
+    return make_state(game.game_map.rows, units)
+
+
+def action_from_dict(action):
+    """Pretvara dict akciju (GameLoop/PrologAgent format) u kompaktni tuple"""
+    action_type = action['type']
+    if action_type == 'move':
+        x, y = action['target']
+        return ('move', x, y)
+
+    target = action['target']
+    if isinstance(target, dict):
+        tx, ty = target['x'], target['y']
+    else:
+        tx, ty = target.x, target.y
+
+    if action_type == 'melee_push':
+        dx, dy = action['direction']
+        return ('melee_push', tx, ty, dx, dy)
+    if action_type == 'melee_attack':
+        return ('melee_attack', tx, ty, action.get('damage', 2))
+    return ('range_attack', tx, ty, action.get('damage', 1))
+
+
+def unit_at(state, x, y):
+    """Indeks žive jedinice na poziciji ili -1"""
+    for index, (_kind, ux, uy, hp) in enumerate(state[UNITS]):
+        if hp > 0 and ux == x and uy == y:
+            return index
+    return -1
+
+
+def terrain_at(state, x, y):
+    """Teren na poziciji ili None izvan granica"""
+    width = state[WIDTH]
+    if 0 <= x < width and 0 <= y < state[HEIGHT]:
+        return state[TERRAIN][y * width + x]
+    return None
+
+
+def has_line_of_sight(state, x0, y0, x1, y1):
+    """Bresenham kao GameLoop._has_line_of_sight - samo planine blokiraju"""
+    terrain = state[TERRAIN]
+    width = state[WIDTH]
+
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+
+    x, y = x0, y0
+    while True:
+        if (x, y) != (x0, y0) and (x, y) != (x1, y1):
+            if terrain[y * width + x] == TERRAIN_MOUNTAIN:
+                return False
+        if x == x1 and y == y1:
+            return True
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+
+
+def apply(state, actor, action):
+    """
+    Vraća novo stanje nakon što jedinica `actor` izvrši akciju
+
+    Pravila su ista kao GameLoop._execute_action: nevažeća akcija
+    (zauzeto, teren, nema mete, nema LOS) ne mijenja ništa i vraća
+    isto stanje.
+    """
+    terrain, width, height, units = state
+    action_type = action[0]
+
+    if action_type == 'move':
+        x, y = action[1], action[2]
+        if not (0 <= x < width and 0 <= y < height):
+            return state
+        cell = terrain[y * width + x]
+        if cell == TERRAIN_MOUNTAIN or cell == TERRAIN_WATER:
+            return state
+        for unit in units:
+            if unit[1] == x and unit[2] == y and unit[3] > 0:
+                return state
+        unit = units[actor]
+        moved = (unit[0], x, y, unit[3])
+        return (terrain, width, height, units[:actor] + (moved,) + units[actor + 1:])
+
+    target = unit_at(state, action[1], action[2])
+    if target < 0:
+        return state
+    kind, tx, ty, hp = units[target]
+
+    if action_type == 'melee_attack':
+        hit = (kind, tx, ty, max(0, hp - action[3]))
+        return (terrain, width, height, units[:target] + (hit,) + units[target + 1:])
+
+    if action_type == 'melee_push':
+        nx, ny = tx + action[3], ty + action[4]
+        if not (0 <= nx < width and 0 <= ny < height):
+            return state
+        cell = terrain[ny * width + nx]
+        if cell == TERRAIN_MOUNTAIN:
+            return state
+        if cell != TERRAIN_WATER:
+            for _k, ux, uy, uhp in units:
+                if uhp > 0 and ux == nx and uy == ny:
+                    return state
+        # Push u vodu - instant smrt
+        pushed = (kind, nx, ny, 0 if cell == TERRAIN_WATER else hp)
+        return (terrain, width, height, units[:target] + (pushed,) + units[target + 1:])
+
+    if action_type == 'range_attack':
+        _akind, ax, ay, _ahp = units[actor]
+        if not has_line_of_sight(state, ax, ay, tx, ty):
+            return state
+        hit = (kind, tx, ty, max(0, hp - action[3]))
+        return (terrain, width, height, units[:target] + (hit,) + units[target + 1:])
+
+    return state
+
+
+def winner(state):
+    """'enemies' ako je player mrtav, 'player' ako nema živih neprijatelja, inače None"""
+    units = state[UNITS]
+    if units[PLAYER_INDEX][3] <= 0:
+        return "enemies"
+    for kind, _x, _y, hp in units:
+        if hp > 0 and kind != KIND_PLAYER:
+            return None
+    return "player"
+
+
+class StateHistory:
+    """Undo stack nad nepromjenjivim stanjima"""
+    def __init__(self, state):
+        self.stack = [state]
+
+    @property
+    def current(self):
+        return self.stack[-1]
+
+    def apply(self, actor, action):
+        """Primjenjuje akciju i pamti prethodno stanje"""
+        state = apply(self.stack[-1], actor, action)
+        self.stack.append(state)
+        return state
+
+    def undo(self):
+        """Vraća se na prethodno stanje"""
+        if len(self.stack) > 1:
+            self.stack.pop()
+        return self.stack[-1]
+
+    def __len__(self):
+        return len(self.stack) - 1
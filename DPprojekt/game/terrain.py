@@ -0,0 +1,162 @@
+# ============================================================================
+# DATOTEKA: game/terrain.py
+# Uloga: Teren u komadima (chunks) - bajt po tile-u, prazni komadi se ne čuvaju
+# ============================================================================
+#
+# Mapa je podijeljena na komade CHUNK x CHUNK tile-ova, svaki je bytearray
+# (bajt = tip terena, row-major unutar komada). Komad koji je sav trava je
+# zajednički nepromjenjivi GRASS_CHUNK - veliki svjetovi s većinom trave
+# drže samo komade u kojima ima planina ili vode. Upis u GRASS_CHUNK stvara
+# vlastitu kopiju komada (copy-on-write), compact() vraća komade koji su
+# ponovno sva trava na sentinel.
+#
+# Tile (x, y) je u komadu (y >> CHUNK_BITS) * chunks_x + (x >> CHUNK_BITS),
+# na mjestu ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK). Ćelije
+# rubnih komada izvan mape su trava - granice provjerava GameMap.
+#
+# Kod koji treba cijelu mapu (agenti, game_state['terrain']) dobiva
+# TerrainRows - pogled koji gradi redak (bytes) iz komada kad se zatraži,
+# bez guste kopije uz komade. flat_terrain() daje cijeli teren kao bytes.
+
+import sys
+
+from config.constants import TERRAIN_GRASS
+
+CHUNK_BITS = 4
+CHUNK = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK - 1
+
+# Zajednički komad za sve tile-ove trave - bytes, pa se ne može slučajno promijeniti
+GRASS_CHUNK = bytes([TERRAIN_GRASS]) * (CHUNK * CHUNK)
+
+
+class ChunkedTerrain:
+    """Teren width x height u komadima od CHUNK x CHUNK bajtova"""
+    __slots__ = ('width', 'height', 'chunks_x', 'chunks_y', 'chunks')
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.chunks_x = (width + CHUNK_MASK) >> CHUNK_BITS
+        self.chunks_y = (height + CHUNK_MASK) >> CHUNK_BITS
+        self.chunks = [GRASS_CHUNK] * (self.chunks_x * self.chunks_y)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Iz 2D liste redaka (npr. teren primljen od match servera)"""
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        terrain = cls(width, height)
+        for cy in range(terrain.chunks_y):
+            band = rows[cy * CHUNK:(cy + 1) * CHUNK]
+            for cx in range(terrain.chunks_x):
+                x0 = cx * CHUNK
+                chunk = bytearray(GRASS_CHUNK)
+                for ry, row in enumerate(band):
+                    segment = row[x0:x0 + CHUNK]
+                    chunk[ry * CHUNK:ry * CHUNK + len(segment)] = bytes(segment)
+                if chunk != GRASS_CHUNK:
+                    terrain.chunks[cy * terrain.chunks_x + cx] = chunk
+        return terrain
+
+    def get(self, x, y):
+        """Tip terena na (x, y) - bez provjere granica"""
+        return self.chunks[(y >> CHUNK_BITS) * self.chunks_x + (x >> CHUNK_BITS)][
+            ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)]
+
+    def set(self, x, y, terrain):
+        """Upisuje tip terena - komad trave se kopira tek kad treba"""
+        index = (y >> CHUNK_BITS) * self.chunks_x + (x >> CHUNK_BITS)
+        chunk = self.chunks[index]
+        if chunk is GRASS_CHUNK:
+            if terrain == TERRAIN_GRASS:
+                return
+            chunk = self.chunks[index] = bytearray(GRASS_CHUNK)
+        chunk[((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)] = terrain
+
+    def compact(self):
+        """Komadi koji su ponovno sva trava postaju sentinel - vraća broj oslobođenih"""
+        freed = 0
+        for index, chunk in enumerate(self.chunks):
+            if chunk is not GRASS_CHUNK and chunk == GRASS_CHUNK:
+                self.chunks[index] = GRASS_CHUNK
+                freed += 1
+        return freed
+
+    def rows(self):
+        """Gusta 2D lista redaka (lista int-ova po retku) - npr. za JSON"""
+        return [list(self.row(y)) for y in range(self.height)]
+
+    def count(self, terrain):
+        """Broj tile-ova tipa terrain (rubne ćelije izvan mape se ne broje)"""
+        stored = [chunk for chunk in self.chunks if chunk is not GRASS_CHUNK]
+        if terrain == TERRAIN_GRASS:
+            return self.width * self.height - sum(
+                len(chunk) - chunk.count(TERRAIN_GRASS) for chunk in stored)
+        return sum(chunk.count(terrain) for chunk in stored)
+
+    def row(self, y):
+        """Redak y kao bytes"""
+        offset = (y & CHUNK_MASK) << CHUNK_BITS
+        base = (y >> CHUNK_BITS) * self.chunks_x
+        return b''.join(
+            chunk[offset:offset + CHUNK] for chunk in self.chunks[base:base + self.chunks_x]
+        )[:self.width]
+
+    def flat(self):
+        """Cijeli teren kao bytes, row-major (kao game.state)"""
+        return b''.join(self.row(y) for y in range(self.height))
+
+    def stored_chunks(self):
+        """Broj komada koji nisu sentinel"""
+        return sum(1 for chunk in self.chunks if chunk is not GRASS_CHUNK)
+
+    def nbytes(self):
+        """Memorija komada i liste komada (sentinel se ne broji)"""
+        return sys.getsizeof(self.chunks) + sum(
+            sys.getsizeof(chunk) for chunk in self.chunks if chunk is not GRASS_CHUNK)
+
+
+class TerrainRows:
+    """
+    Teren kao niz redaka za game_state['terrain'] - terrain[y][x] radi kao
+    na 2D listi, ali redak (bytes) se gradi iz komada tek kad se zatraži
+    """
+    __slots__ = ('terrain',)
+
+    def __init__(self, terrain):
+        self.terrain = terrain
+
+    def __len__(self):
+        return self.terrain.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.terrain.height:
+            raise IndexError(y)
+        return self.terrain.row(y)
+
+    def __iter__(self):
+        return (self.terrain.row(y) for y in range(self.terrain.height))
+
+    def __eq__(self, other):
+        if isinstance(other, TerrainRows):
+            return self.terrain is other.terrain or self.flat() == other.flat()
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def flat(self):
+        return self.terrain.flat()
+
+    def tolist(self):
+        """2D lista redaka - za JSON (match server, agent service)"""
+        return self.terrain.rows()
+
+
+def flat_terrain(grid):
+    """Teren row-major kao bytes - iz TerrainRows (bez prolaza po ćelijama) ili 2D liste"""
+    if isinstance(grid, TerrainRows):
+        return grid.flat()
+    return bytes(cell for row in grid for cell in row)
@@ -0,0 +1,156 @@
+# ============================================================================
+# DATOTEKA: game/tiles.py
+# Uloga: Predizračunate bitmape po tile-u (LOS, doseg, prijetnja)
+# ============================================================================
+#
+# Jednom po mapi se za svaki par tile-ova (i, j) izračuna može li jedinica
+# na tile-u i:
+#   visible  - vidjeti j (Bresenham linija i -> j bez planina između)
+#   fire     - gađati j range napadom (1..RANGE_ATTACK_DISTANCE + LOS)
+#   adjacent - napasti j melee napadom (grid distance 1)
+#   steps    - doći na j jednom akcijom kretanja (8 smjerova, trava)
+# Indeks tile-a je y * width + x (row-major, kao game.state).
+#
+# Tablice ovise samo o terenu - vrijede za svaku poziciju jedinica, pa i u
+# simuliranim stanjima lookahead pretrage. Vlasnik tablica je GameMap
+# (GameMap.tile_tables / has_line_of_sight - Enemy AI i GameLoop), a
+# PrologAgent ih šalje agent.pl-u kao indeksirane činjenice s bitmapama
+# (Python int, bit j) preko load_tile_tables/5, jednom po terenu.
+#
+# Ćelije na Bresenham liniji ne ovise o terenu pa se računaju jednom po
+# veličini mape; LOS za novu mapu je tada jedno bool množenje matrica.
+
+import numpy as np
+
+from config.constants import TERRAIN_GRASS, TERRAIN_MOUNTAIN, TERRAIN_WATER
+from game.influence import line_of_sight_matrix
+
+RANGE_ATTACK_DISTANCE = 2
+
+# Tablica ćelija na linijama je C^3 bool-ova - iznad ovoga se LOS računa
+# vektoriziranim Bresenhamom za svaku mapu
+MAX_LINE_CELLS = 256
+
+# Tablice su C^2 po vrsti - za veće mape (stres scenariji) se ne grade,
+# tile_tables vraća None i LOS se računa Bresenhamom po paru
+MAX_TILE_CELLS = 1024
+
+
+def _line_between(width, a, b):
+    """Ćelije između a i b (bez krajeva) - isto kao state.has_line_of_sight"""
+    x0, y0 = a % width, a // width
+    x1, y1 = b % width, b // width
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+
+    x, y = x0, y0
+    while True:
+        if (x, y) != (x0, y0) and (x, y) != (x1, y1):
+            yield y * width + x
+        if x == x1 and y == y1:
+            return
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+
+
+_line_cells_cache = {}
+
+
+def line_cells(width, height):
+    """
+    line_cells[a, b, c] - ćelija c je između a i b na Bresenham liniji.
+    Gradi se jednom po veličini mape (do MAX_LINE_CELLS ćelija).
+    """
+    key = (width, height)
+    if key not in _line_cells_cache:
+        cells = width * height
+        if cells > MAX_LINE_CELLS:
+            raise ValueError(f"Tablica linija podržava do {MAX_LINE_CELLS} ćelija, ne {cells}")
+        table = np.zeros((cells, cells, cells), dtype=bool)
+        for a in range(cells):
+            for b in range(cells):
+                for c in _line_between(width, a, b):
+                    table[a, b, c] = True
+        _line_cells_cache[key] = table
+    return _line_cells_cache[key]
+
+
+def _masks(matrix):
+    """bool matrica -> lista int bitmapa po retku (bit j = matrix[i, j])"""
+    packed = np.packbits(matrix, axis=-1, bitorder='little')
+    return [int.from_bytes(row.tobytes(), 'little') for row in packed]
+
+
+class TileTables:
+    """Tablice za jedan teren (2D grid ili numpy niz (height, width))"""
+    def __init__(self, grid):
+        terrain = np.asarray(grid, dtype=np.uint8)
+        height, width = terrain.shape
+        self.width = width
+        self.height = height
+        self.cells = width * height
+
+        flat = terrain.ravel()
+        self.grass = flat == TERRAIN_GRASS
+        self.water = flat == TERRAIN_WATER
+        mountain = flat == TERRAIN_MOUNTAIN
+
+        if self.cells <= MAX_LINE_CELLS:
+            between = line_cells(width, height).reshape(self.cells * self.cells, self.cells)
+            self.visible = ~(between @ mountain).reshape(self.cells, self.cells)
+        else:
+            self.visible = line_of_sight_matrix(mountain.reshape(height, width))
+
+        index = np.arange(self.cells)
+        xs = index % width
+        ys = index // width
+        distance = np.maximum(np.abs(xs[:, None] - xs[None, :]),
+                              np.abs(ys[:, None] - ys[None, :]))
+
+        self.fire = self.visible & (distance >= 1) & (distance <= RANGE_ATTACK_DISTANCE)
+        self.adjacent = distance == 1
+        self.steps = self.adjacent & self.grass[None, :]
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def has_line_of_sight(self, x0, y0, x1, y1):
+        """Isto kao _has_line_of_sight u GameLoop-u i RangeEnemy-u, jedan pogled u tablicu"""
+        return bool(self.visible[y0 * self.width + x0, y1 * self.width + x1])
+
+    def can_fire(self, x0, y0, x1, y1):
+        """Range napad s (x0, y0) na (x1, y1) - udaljenost i LOS"""
+        return bool(self.fire[y0 * self.width + x0, y1 * self.width + x1])
+
+    def prolog_arguments(self):
+        """Argumenti za load_tile_tables/5 iza Id-a i terena: [t(I, Los, Fire, Steps, Adjacent), ...], Grass, Water"""
+        rows = zip(_masks(self.visible), _masks(self.fire), _masks(self.steps), _masks(self.adjacent))
+        tiles = ",".join(
+            f"t({i},{los},{fire},{steps},{adjacent})"
+            for i, (los, fire, steps, adjacent) in enumerate(rows)
+        )
+        grass, water = _masks(np.stack([self.grass, self.water]))
+        return f"[{tiles}],{grass},{water}"
+
+
+def tile_tables(grid):
+    """Nove TileTables za 2D grid ili None ako je mapa prevelika - keš drži vlasnik"""
+    if len(grid) * len(grid[0]) > MAX_TILE_CELLS:
+        return None
+    return TileTables(grid)
+
+
+def line_is_clear(terrain_at, width, x0, y0, x1, y1):
+    """LOS Bresenhamom bez tablica - terrain_at(x, y) daje teren (npr. GameMap.get_terrain)"""
+    return not any(
+        terrain_at(c % width, c // width) == TERRAIN_MOUNTAIN
+        for c in _line_between(width, y0 * width + x0, y1 * width + x1)
+    )
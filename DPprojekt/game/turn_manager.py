@@ -3,38 +3,108 @@
 # Uloga: Upravlja turn-ovima
 # ============================================================================
 
-class TurnManager:
+import heapq
+from config.constants import PLAYER_ACTIONS
+
+class InitiativeQueue:
+    """
+    Priority queue neprijatelja za jedan enemy turn
+
+    Svaka jedinica dobiva budžet akcija iz svog actions_per_turn.
+    Na potezu je jedinica s najmanje iskorištenih akcija (pa redoslijed
+    spawna), tako da se jedinice izmjenjuju - "next to act" je O(log n).
+    """
     def __init__(self):
+        self.heap = []
+        self.remaining = {}
+        self.total_budget = 0
+
+    def start_round(self, units):
+        """Puni queue živim jedinicama i njihovim budžetima"""
+        self.heap = []
+        self.remaining = {}
+        self.total_budget = 0
+        for order, unit in enumerate(units):
+            if unit.hp <= 0:
+                continue
+            budget = getattr(unit, 'actions_per_turn', 1)
+            if budget <= 0:
+                continue
+            self.remaining[order] = budget
+            self.total_budget += budget
+            self.heap.append((0, order, unit))
+        heapq.heapify(self.heap)
+
+    def pop(self):
+        """
+        Vraća sljedeću jedinicu na potezu (i troši joj jednu akciju)
+        ili None kad su svi budžeti potrošeni. Mrtve jedinice se preskaču.
+        """
+        while self.heap:
+            used, order, unit = heapq.heappop(self.heap)
+            if unit.hp <= 0:
+                continue
+            self.remaining[order] -= 1
+            if self.remaining[order] > 0:
+                heapq.heappush(self.heap, (used + 1, order, unit))
+            else:
+                unit.acted_this_turn = True
+            return unit
+        return None
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class TurnManager:
+    def __init__(self, enemies=None):
         self.current_turn = "player"  # "player" ili "enemies"
-        self.actions_left = 2  # Player ima 2 akcije po turn-u
+        self.actions_left = PLAYER_ACTIONS  # Player ima 2 akcije po turn-u
         self.turn_number = 1
-    
+
+        # Neprijatelji (redoslijed = redoslijed spawna) i njihov queue
+        self.enemies = enemies if enemies is not None else []
+        self.initiative = InitiativeQueue()
+
     def next_turn(self):
         """Prelazi na sljedeći turn"""
         if self.current_turn == "player":
             self.current_turn = "enemies"
-            self.actions_left = self._get_enemy_actions()
+            self.initiative.start_round(self.enemies)
+            self.actions_left = self.initiative.total_budget
         else:
             self.current_turn = "player"
-            self.actions_left = 2
+            self.actions_left = PLAYER_ACTIONS
             self.turn_number += 1
-    
-    def _get_enemy_actions(self):
-        """Vraća broj akcija za enemy turn"""
-        # Range enemy ima 1, melee ima 2
-        # Za jednostavnost, ovdje vraćamo ukupan broj
-        # U game_loop.py se svaki enemy izvršava zasebno
-        return 3  # 1 za range + 2 za melee
-    
+
+    def next_enemy(self):
+        """Sljedeći neprijatelj na potezu ili None ako je enemy turn gotov"""
+        return self.initiative.pop()
+
+    def resolve_enemy_turn(self, act, keep_going=None):
+        """
+        Batch - odigra sve preostale enemy akcije u turn-u odjednom (headless)
+
+        Args:
+            act: funkcija act(enemy) koja izvršava jednu akciju
+            keep_going: opcionalna provjera prije svake akcije (npr. kraj igre)
+        """
+        while keep_going is None or keep_going():
+            enemy = self.next_enemy()
+            if enemy is None:
+                break
+            act(enemy)
+            self.use_action()
+
     def use_action(self):
         """Koristi jednu akciju"""
         self.actions_left = max(0, self.actions_left - 1)
-    
+
     def get_current_entity(self):
         """Vraća koji entitet je trenutno na potezu"""
         return self.current_turn
-    
+
     def reset_enemy_actions(self, enemies):
         """Resetuje acted_this_turn flag za sve neprijatelje"""
         for enemy in enemies:
-            enemy.acted_this_turn = False
\ No newline at end of file
+            enemy.acted_this_turn = False
@@ -0,0 +1,195 @@
+# ============================================================================
+# DATOTEKA: game/walk.py
+# Uloga: Tablica hodajućih udaljenosti između svih parova tile-ova
+# ============================================================================
+#
+# Teren se ne mijenja tijekom partije, pa se najkraći put između svih parova
+# tile-ova izračuna jednom po mapi i dalje je svaki upit jedan pogled u
+# (C, C) niz. Kao u find_path_bfs, koraci idu samo na travu, a početni
+# tile može biti bilo koji:
+#   diagonal=True  - 8 smjerova (kretanje playera, greedy prioritet move-a)
+#   diagonal=False - 4 smjera (neprijatelji, find_path_bfs)
+#
+# Tablica je (C, C) niz u table_dtype(C) (uint8 do 254 tile-a, inače
+# uint16) - gradi se lijeno, cijela odjednom (all_pairs) na prvi upit, a
+# distance() čita element direktno iz međuspremnika niza. Vlasnik tablice je
+# GameMap (GameMap.walk_distances), pa živi koliko i mapa. Za mape veće od
+# MAX_WALK_CELLS walk_distances vraća None i korisnici se vraćaju na grid
+# distance / BFS. Nedostupni parovi imaju vrijednost `unreachable`.
+
+from functools import lru_cache
+
+import numpy as np
+
+from config.constants import TERRAIN_GRASS
+
+# C^2 ćelija tablice - 24x24 mapa je ~330 KB (uint16)
+MAX_WALK_CELLS = 576
+
+DIRECTIONS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIRECTIONS_8 = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# Koliko parova (partija x izvor x cilj) relaksirati odjednom
+_BLOCK = 1 << 22
+
+
+_neighbour_cache = {}
+
+
+def neighbour_table(width, height, directions):
+    """(C, len(directions)) indeksi susjeda - izvan mape pokazuje na sentinel `C`"""
+    key = (width, height, directions)
+    if key not in _neighbour_cache:
+        _neighbour_cache[key] = _neighbours(width, height, directions)
+    return _neighbour_cache[key]
+
+
+def _neighbours(width, height, directions):
+    cells = width * height
+    index = np.arange(cells)
+    xs = index % width
+    ys = index // width
+    table = np.full((cells, len(directions)), cells, dtype=np.intp)
+    for k, (dx, dy) in enumerate(directions):
+        nx = xs + dx
+        ny = ys + dy
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        table[inside, k] = (ny * width + nx)[inside]
+    return table
+
+
+def table_dtype(cells):
+    """Najmanji tip u koji stanu udaljenosti (max C - 1) i sentinel"""
+    return np.uint8 if cells < np.iinfo(np.uint8).max else np.uint16
+
+
+def _window_min(field, diagonal):
+    """
+    Minimum svakog tile-a i njegovih susjeda (prve dvije osi su y, x).
+    8 smjerova je 3x3 prozor - separabilan u horizontalni pa vertikalni
+    prolaz; 4 smjera je križ. Sve su pomaci pogleda, bez kopiranja susjeda.
+    """
+    rows = field.copy()
+    np.minimum(rows[:, 1:], field[:, :-1], out=rows[:, 1:])
+    np.minimum(rows[:, :-1], field[:, 1:], out=rows[:, :-1])
+    source = rows if diagonal else field
+    result = rows.copy() if diagonal else rows
+    np.minimum(result[1:], source[:-1], out=result[1:])
+    np.minimum(result[:-1], source[1:], out=result[:-1])
+    return result
+
+
+def all_pairs(grass, width, height, diagonal=False):
+    """
+    Hodajuće udaljenosti za G mapa iste veličine
+
+    Args:
+        grass: bool (G, C) - prohodni tile-ovi
+    Returns:
+        (G, C, C) u table_dtype(C); [g, a, b] = koraci od a do b ili max tipa
+    """
+    count, cells = grass.shape
+    dtype = table_dtype(cells)
+    unreachable = np.iinfo(dtype).max
+    result = np.empty((count, cells, cells), dtype=dtype)
+    sources = np.arange(cells)
+
+    chunk = max(1, _BLOCK // (cells * cells))
+    for start in range(0, count, chunk):
+        block = grass[start:start + chunk]
+        games = len(block)
+        # Ciljni tile je na prve dvije osi (y, x) pa su susjedi pomaci pogleda
+        # Neprohodni ciljevi: unreachable (maksimum s njim poništava korak)
+        blocked = np.where(block.T, 0, unreachable).astype(dtype).reshape(height, width, games, 1)
+        field = np.full((cells, games, cells), unreachable, dtype=dtype)
+        field[sources, :, sources] = 0
+        field = field.reshape(height, width, games, cells)
+        while True:
+            nearest = _window_min(field, diagonal)
+            # unreachable + 1 ostaje unreachable
+            np.minimum(nearest, unreachable - 1, out=nearest)
+            nearest += 1
+            np.maximum(nearest, blocked, out=nearest)
+            np.minimum(nearest, field, out=nearest)
+            if np.array_equal(nearest, field):
+                break
+            field = nearest
+        # (cilj, partija, izvor) -> (partija, izvor, cilj)
+        result[start:start + games] = field.reshape(cells, games, cells).transpose(1, 2, 0)
+    return result
+
+
+class WalkDistances:
+    """
+    Hodajuće udaljenosti za jedan teren (row-major terrain niz)
+
+    Cijela tablica (`table`) se računa vektorizirano na prvi upit; upiti
+    čitaju element iz ravnog pogleda na isti niz (memoryview) - bez
+    pretvaranja u Python liste.
+    """
+    def __init__(self, terrain, width, height, diagonal=False):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.diagonal = diagonal
+        self.unreachable = int(np.iinfo(table_dtype(self.cells)).max)
+
+        self._grass = np.frombuffer(bytes(terrain), dtype=np.uint8) == TERRAIN_GRASS
+        self._table = None
+        self._flat = None
+
+    @property
+    def table(self):
+        """(C, C) niz svih udaljenosti"""
+        if self._table is None:
+            self._build()
+        return self._table
+
+    def _build(self):
+        table = all_pairs(self._grass[None, :], self.width, self.height, self.diagonal)[0]
+        # Pogled se postavlja zadnji - tko vidi _flat, vidi i _table
+        self._table = table
+        self._flat = memoryview(table.reshape(-1))
+        return self._flat
+
+    def distance(self, x0, y0, x1, y1):
+        """Broj koraka od (x0, y0) do (x1, y1) ili None ako nema puta"""
+        flat = self._flat
+        if flat is None:
+            flat = self._build()
+        value = flat[(y0 * self.width + x0) * self.cells + y1 * self.width + x1]
+        return None if value == self.unreachable else value
+
+    def prolog_rows(self):
+        """Lista d(D0, D1, ...) redaka za agent.pl (-1 = nema puta)"""
+        table = self.table.astype(np.int32)
+        rows = np.where(table == self.unreachable, -1, table)
+        return "[" + ",".join("d(" + ",".join(map(str, row)) + ")" for row in rows.tolist()) + "]"
+
+
+def walk_distances(terrain, width, height, diagonal=False):
+    """
+    Nova WalkDistances za row-major teren (bytes ili lista) ili None ako je
+    mapa prevelika. Ne kešira - tablicu drži vlasnik (GameMap.walk_distances).
+    """
+    if width * height > MAX_WALK_CELLS:
+        return None
+    return WalkDistances(terrain, width, height, diagonal)
+
+
+# Keš za game.state snapshot-e (agenti bez GameMap-a) - ograničeni LRU po
+# terenu, pa se tablice partija koje se izmjenjuju (match server) ne grade
+# iznova na svaku odluku. Snapshot-i iste partije imaju jednake terrain
+# bytes (ne nužno isti objekt), pa je ključ jednakost.
+STATE_CACHE_SIZE = 8
+
+
+@lru_cache(maxsize=2 * STATE_CACHE_SIZE)
+def _walk_for_terrain(terrain, width, height, diagonal):
+    return walk_distances(terrain, width, height, diagonal)
+
+
+def walk_distances_for_state(state, diagonal=False):
+    """WalkDistances za game.state snapshot ili None ako je mapa prevelika"""
+    terrain, width, height, _units = state
+    return _walk_for_terrain(terrain, width, height, diagonal)
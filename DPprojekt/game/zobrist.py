@@ -0,0 +1,208 @@
+# ============================================================================
+# DATOTEKA: game/zobrist.py
+# Uloga: Zobrist hashiranje stanja igre i transposition table
+# ============================================================================
+#
+# Hash stanja je XOR 64-bitnih ključeva:
+#   - teren svakog tile-a (x, y, tip)
+#   - svaka živa jedinica (tip, x, y, hp) - mrtve jedinice nemaju ključ
+#   - SIDE_KEY kad su na potezu neprijatelji
+#
+# Ključevi se ne drže u tablicama (mapa može biti ogromna) nego se računaju
+# deterministički (splitmix64). Ključevi jedinica i ostali mali ključevi se
+# keširaju do KEY_CACHE_LIMIT unosa (tada se keš isprazni - ključevi su isti
+# i kad se ponovno izračunaju); ključevi terena trebaju samo punom hash-u pa
+# se ne keširaju. Svaki move, push, damage i smrt mijenja hash s dva XOR-a - O(1).
+#
+# MonteCarloAgent drži TranspositionTable statistika playout-a po hash-u
+# stanja nakon kandidat akcije (apply_hashed + actions_key).
+
+from game import state as game_state
+
+MASK64 = (1 << 64) - 1
+
+_TAG_TERRAIN = 1
+_TAG_UNIT = 2
+_TAG_SIDE = 3
+_TAG_ACTIONS = 4
+
+KEY_CACHE_LIMIT = 1 << 16
+
+_key_cache = {}
+
+
+def _splitmix64(value):
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def _key(feature):
+    key = _key_cache.get(feature)
+    if key is None:
+        if len(_key_cache) >= KEY_CACHE_LIMIT:
+            _key_cache.clear()
+        # hash tuple-a intova nije nasumičan između pokretanja - ključevi su stabilni
+        key = _key_cache[feature] = _splitmix64(hash(feature) & MASK64)
+    return key
+
+
+def terrain_key(x, y, terrain):
+    return _splitmix64(hash((_TAG_TERRAIN, x, y, terrain)) & MASK64)
+
+
+def unit_key(kind, x, y, hp):
+    """Ključ žive jedinice (0 za mrtvu - mrtve ne ulaze u hash)"""
+    if hp <= 0:
+        return 0
+    return _key((_TAG_UNIT, kind, x, y, hp))
+
+
+SIDE_KEY = _key((_TAG_SIDE,))
+
+
+def actions_key(actions_left):
+    """Ključ broja preostalih player akcija u turn-u (čvorovi pretrage unutar turn-a)"""
+    return _key((_TAG_ACTIONS, actions_left))
+
+
+def hash_state(state, enemies_to_move=False):
+    """Puni hash game.state snapshot-a (za provjeru i inicijalizaciju)"""
+    terrain, width, height, units = state
+    value = 0
+    for index, cell in enumerate(terrain):
+        value ^= terrain_key(index % width, index // width, cell)
+    for kind, x, y, hp in units:
+        value ^= unit_key(kind, x, y, hp)
+    if enemies_to_move:
+        value ^= SIDE_KEY
+    return value
+
+
+def apply_hashed(state, value, actor, action):
+    """
+    game.state.apply koji uz novo stanje vraća i inkrementalno ažurirani hash
+
+    Returns:
+        (novo_stanje, novi_hash)
+    """
+    new_state = game_state.apply(state, actor, action)
+    if new_state is state:
+        return state, value
+
+    if action[0] == 'move':
+        index = actor
+    else:
+        index = game_state.unit_at(state, action[1], action[2])
+
+    old = state[game_state.UNITS][index]
+    new = new_state[game_state.UNITS][index]
+    value ^= unit_key(*old) ^ unit_key(*new)
+    return new_state, value
+
+
+class ZobristHash:
+    """Inkrementalni hash koji GameLoop ažurira u _execute_action"""
+    def __init__(self, value=0):
+        self.value = value
+
+    @classmethod
+    def from_state(cls, state, enemies_to_move=False):
+        return cls(hash_state(state, enemies_to_move))
+
+    def move(self, kind, hp, old_pos, new_pos):
+        """Jedinica se pomaknula (move ili push)"""
+        self.value ^= unit_key(kind, old_pos[0], old_pos[1], hp)
+        self.value ^= unit_key(kind, new_pos[0], new_pos[1], hp)
+
+    def damage(self, kind, pos, old_hp, new_hp):
+        """Promjena HP-a - new_hp 0 znači smrt (jedinica nestaje iz hash-a)"""
+        self.value ^= unit_key(kind, pos[0], pos[1], old_hp)
+        self.value ^= unit_key(kind, pos[0], pos[1], new_hp)
+
+    def death(self, kind, pos, hp):
+        """Jedinica je umrla (npr. utopila se)"""
+        self.value ^= unit_key(kind, pos[0], pos[1], hp)
+
+    def toggle_side(self):
+        """Promjena strane na potezu"""
+        self.value ^= SIDE_KEY
+
+
+class TranspositionTable:
+    """
+    Ograničena tablica hash -> vrijednost (fiksni kapacitet, bez serijalizacije)
+
+    Politike zamjene kad se dva ključa sudare na istom slotu:
+        'always' - novi unos uvijek pobjeđuje
+        'depth'  - zamijeni samo ako je novi unos barem jednako dubok
+        'age'    - unosi iz starije generacije (new_generation) uvijek se
+                   mijenjaju, unutar iste generacije kao 'depth'
+    """
+    POLICIES = ('always', 'depth', 'age')
+
+    def __init__(self, capacity=1 << 16, policy='depth'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Nepoznata politika zamjene: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.depths = [0] * capacity
+        self.ages = [0] * capacity
+        self.generation = 0
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.replacements = 0
+
+    def new_generation(self):
+        """Označava novu pretragu - za 'age' politiku stari unosi postaju zamjenjivi"""
+        self.generation += 1
+
+    def get(self, key, min_depth=0):
+        """Vraća spremljenu vrijednost ili None"""
+        slot = key % self.capacity
+        if self.keys[slot] == key and self.depths[slot] >= min_depth:
+            self.hits += 1
+            return self.values[slot]
+        self.misses += 1
+        return None
+
+    def put(self, key, value, depth=0):
+        """Sprema vrijednost - vraća False ako politika odbije zamjenu"""
+        slot = key % self.capacity
+        existing = self.keys[slot]
+        if existing is not None and existing != key:
+            if not self._should_replace(slot, depth):
+                return False
+            self.replacements += 1
+        elif existing is None:
+            self.used += 1
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.ages[slot] = self.generation
+        return True
+
+    def _should_replace(self, slot, depth):
+        if self.policy == 'always':
+            return True
+        if self.policy == 'age' and self.ages[slot] != self.generation:
+            return True
+        return depth >= self.depths[slot]
+
+    def clear(self):
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.depths = [0] * self.capacity
+        self.ages = [0] * self.capacity
+        self.used = 0
+
+    def __len__(self):
+        return self.used
+
+    def __contains__(self, key):
+        return self.keys[key % self.capacity] == key
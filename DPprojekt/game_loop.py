@@ -4,29 +4,58 @@
 # ============================================================================
 
 import pygame
+import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from config.constants import *
-from game.map import GameMap
 from game.turn_manager import TurnManager
+from game.occupancy import OccupancyGrid
+from game.zobrist import ZobristHash
+from game.scenarios import DEFAULT_SCENARIO
+from game import state as game_state
 from entities.player import Player
-from entities.enemy1 import RangeEnemy, MeleeEnemy
+from entities.enemy import RangeEnemy
+from entities.store import EntityStore
 from ui.renderer import Renderer
 from prolog_comm import PrologAgent
+from diagnostics.metrics import metrics
+from diagnostics.trace import trace, DEBUG
 
 class GameLoop:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Into The Breach - Prolog AI")
-        self.clock = pygame.time.Clock()
+    def __init__(self, headless=False, agent=None, recorder=None, scenario=None):
+        # Headless mod - bez prozora, renderiranja i pauza (benchmarkovi, simulacije)
+        self.headless = headless
+        
+        # Dimenzije mape, teren i jedinice (game/scenarios.py)
+        self.scenario = scenario if scenario is not None else DEFAULT_SCENARIO
+        
+        # Opcionalni zapis trajektorija (diagnostics/trajectory.py)
+        self.recorder = recorder
+        
+        if headless:
+            self.screen = None
+            self.clock = None
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Into The Breach - Prolog AI")
+            self.clock = pygame.time.Clock()
         
         # Inicijalizacija komponenti
-        self.game_map = GameMap(GRID_SIZE, GRID_SIZE)
-        self.turn_manager = TurnManager()
-        self.renderer = Renderer(self.screen, self.game_map)
-        self.prolog_agent = PrologAgent()
+        self.game_map = self.scenario.make_map()
+        self.renderer = None if headless else Renderer(self.screen, self.game_map)
+        self.prolog_agent = agent if agent is not None else PrologAgent()
         
-        # Inicijalizacija entiteta
+        # Interaktivno se sljedeća mapa generira u pozadini dok traje partija
+        self._map_prefetch = None if headless else ThreadPoolExecutor(max_workers=1)
+        self._next_map = None
+        
+        self._start_game()
+        self._prefetch_map()
+    
+    def _start_game(self):
+        """Entiteti, turn-ovi i stanje igre za trenutnu self.game_map"""
         self._init_entities()
+        self.turn_manager = TurnManager(self.enemies)
         
         # Game state
         self.running = True
@@ -35,25 +64,56 @@ class GameLoop:
         self.winner = None
         self.turn_delay_timer = 0
         self.waiting_for_next_turn = False
+    
+    def _prefetch_map(self):
+        """Pokreće generiranje sljedeće mape u pozadinskoj dretvi"""
+        if self._map_prefetch is None:
+            return
+        # Seed se uzima iz globalnog random-a pa je niz mapa i dalje ponovljiv
+        rng = random.Random(random.getrandbits(64))
+        self._next_map = self._map_prefetch.submit(self.scenario.make_map, rng)
+    
+    def reset(self):
+        """
+        Nova partija bez ponovnog stvaranja prozora, renderera i agenta
+        
+        Uzima unaprijed generiranu mapu (ako postoji) i odmah naručuje sljedeću.
+        """
+        if self._next_map is not None:
+            self.game_map = self._next_map.result()
+        else:
+            self.game_map = self.scenario.make_map()
+        if self.renderer is not None:
+            self.renderer.game_map = self.game_map
+        
+        self._start_game()
+        self._prefetch_map()
+        metrics.count('restarts')
+        trace.info("=== NEW GAME ===")
         
     def _init_entities(self):
-        """Inicijalizira playera i neprijatelje na random pozicijama"""
+        """Inicijalizira playera i neprijatelje scenarija na random pozicijama"""
+        # Stanje svih jedinica u paralelnim nizovima - objekti su pogledi
+        self.entities = EntityStore()
+        
         # Player na random poziciji
         player_pos = self.game_map.get_random_walkable_position()
-        self.player = Player(player_pos[0], player_pos[1])
+        self.player = Player(player_pos[0], player_pos[1], self.entities)
         
-        # Neprijatelji na random pozicijama (različitim od playera)
+        # Neprijatelji na random pozicijama (različitim od playera i međusobno),
+        # redom range pa melee
         self.enemies = []
+        taken = {player_pos}
+        for enemy_class in self.scenario.enemy_classes():
+            pos = self.game_map.get_random_walkable_position(exclude=taken)
+            self.enemies.append(enemy_class(pos[0], pos[1], self.entities))
+            taken.add(pos)
         
-        # Range enemy
-        range_pos = self.game_map.get_random_walkable_position(exclude=[player_pos])
-        self.enemies.append(RangeEnemy(range_pos[0], range_pos[1]))
+        # Prostorni indeks živih jedinica - održava se na svaki move/push/smrt
+        self.occupancy = OccupancyGrid([self.player] + self.enemies)
         
-        # Melee enemy
-        melee_pos = self.game_map.get_random_walkable_position(
-            exclude=[player_pos, range_pos]
-        )
-        self.enemies.append(MeleeEnemy(melee_pos[0], melee_pos[1]))
+        # Zobrist hash stanja - inkrementalno se ažurira u _execute_action
+        self.zobrist = ZobristHash.from_state(game_state.from_game(self))
         
     def run(self):
         """Glavni game loop"""
@@ -63,12 +123,35 @@ class GameLoop:
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0  # Delta time u sekundama
             
-            self._handle_events()
-            
-            if not self.paused and not self.game_over:
-                self._update(dt)
-            
-            self._render()
+            with metrics.timer('frame'):
+                self._handle_events()
+                
+                if not self.paused and not self.game_over:
+                    self._update(dt)
+                
+                self._render()
+        
+        if self._map_prefetch is not None:
+            self._map_prefetch.shutdown(wait=False)
+    
+    def play_headless(self, max_turns=HEADLESS_MAX_TURNS):
+        """Odigra cijelu partiju bez delay-a - vraća pobjednika (None = neriješeno)"""
+        while not self.game_over:
+            if self.turn_manager.turn_number > max_turns:
+                if self.recorder is not None:
+                    self.recorder.end_game(None, self.turn_manager.turn_number)
+                return None
+            if (self.turn_manager.current_turn == "enemies"
+                    and not self.waiting_for_next_turn):
+                # Cijeli enemy turn odjednom, bez povratka u _update po akciji
+                self.turn_manager.resolve_enemy_turn(
+                    self._execute_enemy_action, self._check_game_state
+                )
+                self._end_enemy_turn()
+            else:
+                # Jedna player akcija ili preskok delay-a između turn-ova
+                self._update(TURN_DELAY)
+        return self.winner
         
     def _handle_events(self):
         """Obrađuje input events"""
@@ -81,8 +164,8 @@ class GameLoop:
                     if self.waiting_for_next_turn:
                         self.paused = not self.paused
                 elif event.key == pygame.K_r and self.game_over:
-                    # Restart igre
-                    self.__init__()
+                    # Restart igre - prozor, renderer i agent ostaju
+                    self.reset()
     
     def _update(self, dt):
         """Update game state"""
@@ -96,6 +179,8 @@ class GameLoop:
                 self.turn_delay_timer = 0
                 self.waiting_for_next_turn = False
                 self.turn_manager.next_turn()
+                self.zobrist.toggle_side()
+                metrics.count('turns')
             return
         
         # Provjeri pobjedu/poraz
@@ -120,67 +205,83 @@ class GameLoop:
         # Pripremi game state za Prolog
         game_state = self._prepare_game_state()
         
-        print(f"\n=== PLAYER TURN (Action {3 - self.turn_manager.actions_left}/2) ===")
+        trace.info("\n=== PLAYER TURN (Action %d/2) ===", 3 - self.turn_manager.actions_left)
         
         # Dobij akciju od Prolog agenta
-        action = self.prolog_agent.get_action(game_state)
+        with metrics.timer('player.get_action'):
+            action = self.prolog_agent.get_action(game_state)
         
+        if self.recorder is not None:
+            self.recorder.record(game_state, self.player, action, self.turn_manager.turn_number)
+        self._apply_player_action(action)
+    
+    def _apply_player_action(self, action):
+        """Izvršava odluku agenta (ili završava player turn ako je nema)"""
         if action:
             self._execute_action(self.player, action)
             self.turn_manager.use_action()
         else:
             # Nema više validnih akcija
-            print("No valid actions available")
+            trace.info("No valid actions available")
             self.waiting_for_next_turn = True
         
     def _execute_enemy_turn(self):
-        """Izvršava neprijateljske turn-ove"""
-        if self.turn_manager.actions_left <= 0:
-            # Reset acted flags before ending turn
-            for enemy in self.enemies:
-                enemy.acted_this_turn = False
-            self.waiting_for_next_turn = True
+        """Izvršava jednu akciju sljedećeg neprijatelja iz initiative queue-a"""
+        enemy = self.turn_manager.next_enemy()
+        if enemy is None:
+            # Svi budžeti potrošeni - reset i wait
+            self._end_enemy_turn()
             return
         
-        # Pronađi prvog živog neprijatelja koji još nije odigrao
-        for enemy in self.enemies:
-            if enemy.hp > 0 and not enemy.acted_this_turn:
-                print(f"\n=== {type(enemy).__name__.upper()} TURN ===")
-                
-                # Debug: prikaži distance do playera
-                dist = enemy.distance_to(self.player)
-                print(f"  Distance to player: {dist} (grid distance)")
-                print(f"  Positions: Enemy({enemy.x},{enemy.y}), Player({self.player.x},{self.player.y})")
-                
-                action = enemy.decide_action(
-                    self.player, self.game_map, self.enemies
-                )
-                if action:
-                    print(f"  Enemy decision: {action['type']}")
-                    self._execute_action(enemy, action)
-                else:
-                    print("  No valid action")
-                
-                enemy.acted_this_turn = True
-                self.turn_manager.use_action()
-                return
-        
-        # Svi neprijatelji su odigrali - reset i wait
-        for enemy in self.enemies:
-            enemy.acted_this_turn = False
+        self._execute_enemy_action(enemy)
+        self.turn_manager.use_action()
+    
+    def _end_enemy_turn(self):
+        """Resetira acted flagove i čeka sljedeći turn"""
+        self.entities.reset_acted()
         self.waiting_for_next_turn = True
+    
+    def _execute_enemy_action(self, enemy):
+        """Jedna odluka i akcija zadanog neprijatelja"""
+        trace.info("\n=== %s TURN ===", type(enemy).__name__.upper())
+        
+        # Debug: prikaži distance do playera
+        if trace.enabled_for(DEBUG):
+            trace.debug("  Distance to player: %d (grid distance)",
+                        enemy.distance_to(self.player))
+            trace.debug("  Positions: Enemy(%d,%d), Player(%d,%d)",
+                        enemy.x, enemy.y, self.player.x, self.player.y)
+        
+        # Stanje prije odluke se gradi samo kad se trajektorije zapisuju
+        recorded_state = self._prepare_game_state() if self.recorder is not None else None
+        
+        with metrics.timer('enemy.decide_action'):
+            action = enemy.decide_action(
+                self.player, self.game_map, self.enemies, self.occupancy
+            )
+        if recorded_state is not None:
+            self.recorder.record(recorded_state, enemy, action, self.turn_manager.turn_number)
+        if action:
+            trace.info("  Enemy decision: %s", action['type'])
+            self._execute_action(enemy, action)
+        else:
+            trace.info("  No valid action")
 
     def _execute_action(self, entity, action):
         "Izvršava akciju za dani entitet - radi s objektima i dictionary-ima"
-        pygame.display.flip()
-        pygame.time.wait(1000)  # Pauza 1000ms (1 sekunde)
+        if not self.headless:
+            pygame.display.flip()
+            pygame.time.wait(1000)  # Pauza 1000ms (1 sekunde)
         action_type = action.get('type')
+        if metrics.enabled:
+            metrics.count(f"actions.{action_type}")
         
         if action_type == 'move':
             target_pos = action.get('target')
             if self._is_valid_move(entity, target_pos):
-                entity.x, entity.y = target_pos
-                print(f"  → {type(entity).__name__} moved to {target_pos}")
+                self.zobrist.move(entity.KIND, entity.hp, (entity.x, entity.y), target_pos)
+                self.occupancy.move(entity, target_pos)
+                trace.info("  → %s moved to %s", type(entity).__name__, target_pos)
         
         elif action_type == 'melee_attack':
             target = action.get('target')
@@ -191,10 +292,15 @@ class GameLoop:
             
             if target and hasattr(target, 'take_damage'):
                 damage = action.get('damage', 2)
+                old_hp = target.hp
                 target.take_damage(damage)
-                print(f"  → Melee attack on {type(target).__name__} at ({target.x}, {target.y}) for {damage} damage! HP: {target.hp}")
+                self.zobrist.damage(target.KIND, (target.x, target.y), old_hp, target.hp)
+                if not target.is_alive():
+                    self.occupancy.remove(target)
+                trace.info("  → Melee attack on %s at (%d, %d) for %d damage! HP: %d",
+                           type(target).__name__, target.x, target.y, damage, target.hp)
             else:
-                print(f"  → Melee attack FAILED - no valid target")
+                trace.warning("  → Melee attack FAILED - no valid target")
         
         elif action_type == 'melee_push':
             target = action.get('target')
@@ -208,14 +314,17 @@ class GameLoop:
                 new_x = target.x + direction[0]
                 new_y = target.y + direction[1]
                 if self._is_valid_push(target, (new_x, new_y)):
-                    target.x, target.y = new_x, new_y
-                    print(f"  → Pushed {type(target).__name__} to ({new_x}, {new_y})")
+                    self.zobrist.move(target.KIND, target.hp, (target.x, target.y), (new_x, new_y))
+                    self.occupancy.move(target, (new_x, new_y))
+                    trace.info("  → Pushed %s to (%d, %d)", type(target).__name__, new_x, new_y)
                     # Check if pushed into water
                     if self.game_map.get_terrain(new_x, new_y) == TERRAIN_WATER:
+                        self.zobrist.death(target.KIND, (new_x, new_y), target.hp)
                         target.hp = 0  # Instant death
-                        print(f"  → {type(target).__name__} drowned! ☠️")
+                        self.occupancy.remove(target)
+                        trace.info("  → %s drowned! ☠️", type(target).__name__)
             else:
-                print(f"  → Push FAILED - no valid target or direction")
+                trace.warning("  → Push FAILED - no valid target or direction")
         
         elif action_type == 'range_attack':
             target = action.get('target')
@@ -227,40 +336,36 @@ class GameLoop:
             if target and hasattr(target, 'take_damage'):
                 if self._has_line_of_sight(entity, target):
                     damage = action.get('damage', 1)
+                    old_hp = target.hp
                     target.take_damage(damage)
-                    print(f"  → Range attack on {type(target).__name__} at ({target.x}, {target.y}) for {damage} damage! HP: {target.hp}")
+                    self.zobrist.damage(target.KIND, (target.x, target.y), old_hp, target.hp)
+                    if not target.is_alive():
+                        self.occupancy.remove(target)
+                    trace.info("  → Range attack on %s at (%d, %d) for %d damage! HP: %d",
+                               type(target).__name__, target.x, target.y, damage, target.hp)
                 else:
-                    print(f"  → Range attack FAILED - no line of sight")
+                    trace.warning("  → Range attack FAILED - no line of sight")
             else:
-                print(f"  → Range attack FAILED - no valid target")
+                trace.warning("  → Range attack FAILED - no valid target")
 
     def _get_entity_at(self, x, y):
         """Pronalazi bilo koji entitet (player ili enemy) na zadanoj poziciji"""
-        # Check player
-        if self.player.x == x and self.player.y == y and self.player.hp > 0:
-            return self.player
-        
-        # Check enemies
-        for enemy in self.enemies:
-            if enemy.x == x and enemy.y == y and enemy.hp > 0:
-                return enemy
-        
-        return None
+        return self.occupancy.at(x, y)
 
     
     def _find_enemy_at(self, x, y):
         """Pronalazi enemy objekt na zadanoj poziciji"""
-        for enemy in self.enemies:
-            if enemy.hp > 0 and enemy.x == x and enemy.y == y:
-                return enemy
-        return None
+        entity = self.occupancy.at(x, y)
+        if entity is self.player:
+            return None
+        return entity
     
     def _is_valid_move(self, entity, target_pos):
         """Provjerava da li je pomak validan"""
         x, y = target_pos
         
         # Provjeri granice
-        if not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
+        if not (0 <= x < self.game_map.width and 0 <= y < self.game_map.height):
             return False
         
         # Provjeri terrain
@@ -269,20 +374,14 @@ class GameLoop:
             return False
         
         # Provjeri da li je pozicija zauzeta
-        if self.player.x == x and self.player.y == y:
-            return False
-        for enemy in self.enemies:
-            if enemy.hp > 0 and enemy.x == x and enemy.y == y:
-                return False
-        
-        return True
+        return self.occupancy.is_free(x, y)
     
     def _is_valid_push(self, target, new_pos):
         """Provjerava da li je push validan"""
         x, y = new_pos
         
         # Provjeri granice
-        if not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
+        if not (0 <= x < self.game_map.width and 0 <= y < self.game_map.height):
             return False
         
         # Push u vodu je validan (ubija)
@@ -295,94 +394,54 @@ class GameLoop:
             return False
         
         # Provjeri da li je pozicija zauzeta
-        if self.player.x == x and self.player.y == y:
-            return False
-        for enemy in self.enemies:
-            if enemy.hp > 0 and enemy.x == x and enemy.y == y:
-                return False
-        
-        return True
+        return self.occupancy.is_free(x, y)
     
     def _has_line_of_sight(self, source, target):
         """Provjerava liniju pogleda za range attack - samo planine blokiraju"""
-        from config.constants import TERRAIN_MOUNTAIN
-        
-        # Bresenham line algorithm
-        x0, y0 = source.x, source.y
-        x1, y1 = target.x, target.y
-        
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-        
-        x, y = x0, y0
-        
-        while True:
-            # Skip start i end pozicije - samo provjeri tile-ove između
-            if (x, y) != (x0, y0) and (x, y) != (x1, y1):
-                terrain = self.game_map.get_terrain(x, y)
-                if terrain == TERRAIN_MOUNTAIN:
-                    return False
-            
-            if x == x1 and y == y1:
-                break
-            
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-        
-        return True
+        # Bresenham linije su predizračunate po mapi (game/tiles.py)
+        return self.game_map.has_line_of_sight(source.x, source.y, target.x, target.y)
     
     def _prepare_game_state(self):
         """Priprema game state za Prolog agenta"""
-        # Živi neprijatelji
-        alive_enemies = [
-            {
-                'type': type(e).__name__.lower().replace('enemy', ''),
-                'x': e.x,
-                'y': e.y,
-                'hp': e.hp
-            }
-            for e in self.enemies if e.hp > 0
-        ]
-        
+        # Export direktno iz nizova EntityStore-a (živi neprijatelji)
         return {
-            'player': {
-                'x': self.player.x,
-                'y': self.player.y,
-                'hp': self.player.hp
-            },
-            'enemies': alive_enemies,
-            'terrain': self.game_map.grid,
+            'player': self.entities.export(self.player.index),
+            'enemies': self.entities.export_enemies(),
+            'terrain': self.game_map.rows,
             'actions_left': self.turn_manager.actions_left,
-            'grid_size': GRID_SIZE
+            'grid_size': self.game_map.width,
+            # Inkrementalni Zobrist hash - ključ transposition table-a u MonteCarloAgent-u
+            'hash': self.zobrist.value
         }
     
     def _check_game_state(self):
         """Provjerava win/lose stanje"""
         # Provjeri da li je player mrtav
         if self.player.hp <= 0:
-            self.game_over = True
-            self.winner = "enemies"
+            self._finish("enemies")
             return False
         
         # Provjeri da li su svi neprijatelji mrtvi
-        alive_enemies = [e for e in self.enemies if e.hp > 0]
-        if not alive_enemies:
-            self.game_over = True
-            self.winner = "player"
+        if not self.entities.alive_enemy_count():
+            self._finish("player")
             return False
         
         return True
     
+    def _finish(self, winner):
+        """Kraj partije - zapis trajektorije se zatvara samo jednom"""
+        if not self.game_over and self.recorder is not None:
+            self.recorder.end_game(winner, self.turn_manager.turn_number)
+        self.game_over = True
+        self.winner = winner
+    
     def _render(self):
         """Renderuje sve na ekran"""
+        with metrics.timer('render'):
+            self._render_frame()
+    
+    def _render_frame(self):
+        """Crta mapu, entitete i UI u jedan frame"""
         self.screen.fill(COLOR_BG)
         
         # Renderuj mapu
@@ -3,17 +3,151 @@
 # Uloga: Entry point - pokreće cijelu igru
 # ============================================================================
 
+import argparse
+import random
+import sys
 import pygame
 from game_loop import GameLoop
+from game.scenarios import get_scenario
+from diagnostics.metrics import metrics
+from diagnostics.trace import trace, ConsoleSink, AsyncFileSink, LEVEL_NAMES
 
-def main():
-    """Pokreće igru"""
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Into The Breach - Prolog AI")
+    parser.add_argument(
+        '--metrics', metavar='PATH',
+        help="Uključi mjerenje i na kraju spremi metrike (.json ili .csv)"
+    )
+    parser.add_argument(
+        '--log-level', default='info', choices=sorted(LEVEL_NAMES),
+        help="Minimalni level događaja koji se ispisuju (default: info)"
+    )
+    parser.add_argument(
+        '--trace-file', metavar='PATH',
+        help="Događaje piši u datoteku (asinkrono) umjesto na ekran"
+    )
+    parser.add_argument(
+        '--headless', type=int, metavar='N',
+        help="Odigraj N partija bez prozora umjesto interaktivne igre"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Početni seed za headless partije (partija i dobiva seed+i)"
+    )
+    parser.add_argument(
+        '--agent', choices=['prolog', 'montecarlo'], default='prolog',
+        help="Player backend (default: prolog)"
+    )
+    parser.add_argument(
+        '--service', metavar='PATH',
+        help="Prolog agent preko agent_service-a na Unix socketu PATH umjesto lokalnog enginea"
+    )
+    parser.add_argument(
+        '--scenario', default='default', metavar='NAME',
+        help="Scenarij (game/scenarios.py): default, stress-1 .. stress-6 ili JSON datoteka"
+    )
+    parser.add_argument(
+        '--record', metavar='DIR',
+        help="Zapiši trajektorije (stanje, akcija, ishod) u stupčane datoteke u DIR"
+    )
+    parser.add_argument(
+        '--profile', choices=['cprofile', 'sample'],
+        help="Pokreni pod profilerom (deterministički ili sampling)"
+    )
+    parser.add_argument(
+        '--profile-out', default='profile', metavar='PREFIX',
+        help="Prefiks izlaznih datoteka profilera (default: profile)"
+    )
+    return parser.parse_args(argv)
+
+def run_game(agent=None, recorder=None, scenario=None):
+    """Interaktivna igra s prozorom"""
     pygame.init()
-    
-    game = GameLoop()
+
+    game = GameLoop(agent=agent, recorder=recorder, scenario=scenario)
     game.run()
-    
+
     pygame.quit()
 
+def run_batch(games, seed=None, agent=None, recorder=None, scenario=None):
+    """Headless batch - vraća broj pobjeda po strani"""
+    results = {}
+    for i in range(games):
+        if seed is not None:
+            random.seed(seed + i)
+        game = GameLoop(headless=True, agent=agent, recorder=recorder, scenario=scenario)
+        # Isti agent (i Prolog engine) za sve partije
+        agent = game.prolog_agent
+        winner = game.play_headless()
+        results[winner] = results.get(winner, 0) + 1
+    print(f"Headless batch: {results}")
+    return results
+
+def main(argv=None):
+    """Pokreće igru"""
+    args = parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    trace.set_level(args.log_level)
+    if args.trace_file:
+        trace.add_sink(AsyncFileSink(args.trace_file))
+    else:
+        trace.add_sink(ConsoleSink())
+
+    agent = None
+    if args.agent == 'montecarlo':
+        from monte_carlo_agent import MonteCarloAgent
+        agent = MonteCarloAgent()
+    elif args.service:
+        from prolog_comm import PrologAgent
+        agent = PrologAgent(service=args.service)
+    elif args.profile:
+        from prolog_comm import PrologAgent
+        agent = PrologAgent(count_inferences=True)
+
+    scenario = get_scenario(args.scenario)
+    if args.agent == 'prolog':
+        # Odbij odmah - inače bi Prolog player na većoj mapi samo javljao greške
+        from prolog_comm import PrologAgent
+        try:
+            PrologAgent.check_map(scenario.width, scenario.height)
+        except ValueError as e:
+            sys.exit(f"--scenario {scenario.name}: {e}")
+
+    recorder = None
+    if args.record:
+        from diagnostics.trajectory import TrajectoryWriter, MAX_UNITS
+        recorder = TrajectoryWriter(args.record, max_units=max(MAX_UNITS, 1 + scenario.enemy_count))
+
+    if args.headless:
+        target = lambda: run_batch(args.headless, args.seed, agent, recorder, scenario)
+    else:
+        target = lambda: run_game(agent, recorder, scenario)
+
+    if args.profile:
+        from diagnostics.profiling import profile_call
+        prolog_agent = agent if args.agent == 'prolog' else None
+        profile_call(target, args.profile, args.profile_out, prolog_agent=prolog_agent)
+        print(f"Profil spremljen u {args.profile_out}.*")
+    else:
+        target()
+
+    if args.agent == 'prolog' and args.service:
+        agent.close()
+    if args.agent == 'montecarlo':
+        agent.close()
+        print(f"Monte Carlo: {agent.rollouts_per_sec:.0f} rollouts/s")
+
+    if recorder is not None:
+        recorder.close()
+        print(f"Trajektorije spremljene u {args.record} ({recorder.rows['games']} partija)")
+
+    trace.close()
+
+    if args.metrics:
+        metrics.dump(args.metrics)
+        print(f"Metrike spremljene u {args.metrics}")
+
 if __name__ == "__main__":
     main()
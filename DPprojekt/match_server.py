@@ -0,0 +1,332 @@
+# ============================================================================
+# DATOTEKA: match_server.py
+# Uloga: Asyncio server s više istovremenih partija i gledateljima
+# ============================================================================
+#
+# Svaka partija (Match) je headless GameLoop koji korača kao asyncio task:
+# jedna player akcija, jedna enemy akcija ili prijelaz turn-a po koraku.
+# Odluke agenta idu u executor (event loop ne čeka Prolog/greedy), a sve
+# promjene stanja igre rade se samo u event loop-u.
+#
+# Gledatelji se spajaju na Unix socket, JSON po retku:
+#   klijent:  {"op": "list"}                 -> {"type": "matches", ...}
+#             {"op": "watch", "match": 3}    -> snapshot pa delte
+#   server:   {"type": "snapshot", "seq", teren, jedinice, turn info}
+#             {"type": "delta", "seq", "units": [[i, x, y, hp], ...],
+#              + samo promijenjena turn polja}
+# Delte nose apsolutne vrijednosti, pa klijent samo preskače one sa
+# seq <= seq zadnjeg snapshot-a.
+#
+# Backpressure: svaki gledatelj ima ograničen red poruka. Kad se red
+# napuni (klijent ne stiže čitati), zaostatak se odbacuje i klijent
+# sljedeće dobiva svježi snapshot - partije nikad ne čekaju gledatelje.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m match_server --matches 8 --agent greedy
+#   python3 -m spectator --match 3
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config.constants import (
+    TURN_DELAY, HEADLESS_MAX_TURNS, MATCH_SERVER_SOCKET, SPECTATOR_QUEUE
+)
+from diagnostics.metrics import metrics
+from diagnostics.trace import trace, ConsoleSink
+from game_loop import GameLoop
+
+# Marker u redu gledatelja - umjesto njega se šalje trenutni snapshot
+RESYNC = object()
+
+
+def _encode(message):
+    return (json.dumps(message, separators=(',', ':')) + "\n").encode()
+
+
+class Spectator:
+    """Jedan gledatelj jedne partije - ograničen red i task koji ga prazni"""
+    def __init__(self, match, writer, queue_size=SPECTATOR_QUEUE):
+        self.match = match
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.resyncs = 0
+        self.queue.put_nowait(RESYNC)
+        self.task = asyncio.create_task(self._pump())
+
+    def push(self, message):
+        if self.queue.full():
+            # Klijent zaostaje - odbaci zaostatak, sljedeće ide snapshot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resyncs += 1
+            metrics.count('server.resyncs')
+        else:
+            self.queue.put_nowait(message)
+
+    async def _pump(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                if message is RESYNC:
+                    message = self.match.snapshot()
+                self.writer.write(_encode(message))
+                # drain čeka dok se socket buffer ne isprazni - dotle se
+                # poruke skupljaju u redu
+                await self.writer.drain()
+        except ConnectionError:
+            pass    # Klijent je otišao - _handle_client ga odjavljuje
+
+    def close(self):
+        self.task.cancel()
+
+
+class Match:
+    """
+    Jedna partija na serveru - niz igara na istom GameLoop-u
+
+    Args:
+        match_id: broj partije (za gledatelje)
+        agent: player agent s get_action(game_state)
+        executor: gdje se izvršavaju odluke agenta
+        step_delay: sekunde između koraka (0 = puna brzina)
+    """
+    def __init__(self, match_id, agent, executor, step_delay=0.5,
+                 max_turns=HEADLESS_MAX_TURNS):
+        self.id = match_id
+        self.agent = agent
+        self.executor = executor
+        self.step_delay = step_delay
+        self.max_turns = max_turns
+
+        self.game = GameLoop(headless=True, agent=agent)
+        self.game_number = 1
+        self.results = {}
+        self.seq = 0
+        self.spectators = set()
+        self._units = self._current_units()
+        self._info = self._current_info()
+
+    def _current_units(self):
+        game = self.game
+        return [(unit.KIND, unit.x, unit.y, unit.hp) for unit in [game.player] + game.enemies]
+
+    def _current_info(self):
+        game = self.game
+        return {
+            'turn': game.turn_manager.turn_number,
+            'current': game.turn_manager.current_turn,
+            'actions_left': game.turn_manager.actions_left,
+            'game_over': game.game_over,
+            'winner': game.winner,
+        }
+
+    def snapshot(self):
+        """Cijelo stanje partije - prva poruka gledatelju i nakon resync-a"""
+        message = {
+            'type': 'snapshot',
+            'match': self.id,
+            'game': self.game_number,
+            'seq': self.seq,
+            'terrain': self.game.game_map.terrain.rows(),
+            'units': [list(unit) for unit in self._units],
+        }
+        message.update(self._info)
+        return message
+
+    def summary(self):
+        return {'id': self.id, 'game': self.game_number, 'turn': self._info['turn'],
+                'spectators': len(self.spectators), 'results': self.results,
+                'resyncs': sum(spectator.resyncs for spectator in self.spectators)}
+
+    def _publish(self, message):
+        for spectator in self.spectators:
+            spectator.push(message)
+
+    def _publish_changes(self):
+        """Delta od zadnje objave - samo promijenjene jedinice i polja"""
+        units = self._current_units()
+        info = self._current_info()
+        changed = [
+            [i, x, y, hp]
+            for i, (old, (_kind, x, y, hp)) in enumerate(zip(self._units, units))
+            if old[1:] != (x, y, hp)
+        ]
+        fields = {name: value for name, value in info.items() if self._info[name] != value}
+        self._units = units
+        self._info = info
+        if not changed and not fields:
+            return
+        self.seq += 1
+        message = {'type': 'delta', 'match': self.id, 'seq': self.seq, 'units': changed}
+        message.update(fields)
+        self._publish(message)
+
+    async def _step(self):
+        """Jedan korak igre - odluka playera ide u executor"""
+        game = self.game
+        manager = game.turn_manager
+        if (game.waiting_for_next_turn or manager.current_turn != 'player'
+                or manager.actions_left <= 0):
+            # Prijelaz turn-a, jedna enemy akcija ili kraj player turn-a
+            game._update(TURN_DELAY)
+            return
+        if not game._check_game_state():
+            return
+        state = game._prepare_game_state()
+        loop = asyncio.get_running_loop()
+        with metrics.timer('server.get_action'):
+            action = await loop.run_in_executor(self.executor, self.agent.get_action, state)
+        game._apply_player_action(action)
+
+    async def run(self, games=None):
+        """Igra igre jednu za drugom (games=None - dok se task ne otkaže)"""
+        while games is None or self.game_number <= games:
+            game = self.game
+            while not game.game_over and game.turn_manager.turn_number <= self.max_turns:
+                await self._step()
+                self._publish_changes()
+                await asyncio.sleep(self.step_delay)
+
+            winner = game.winner if game.game_over else None
+            key = winner or 'draw'
+            self.results[key] = self.results.get(key, 0) + 1
+            metrics.count('server.games')
+            trace.info("Match %d: igra %d - %s", self.id, self.game_number, key)
+            if games is not None and self.game_number >= games:
+                return
+
+            await asyncio.sleep(self.step_delay * 4)
+            game.reset()
+            self.game_number += 1
+            self._units = self._current_units()
+            self._info = self._current_info()
+            # Nova mapa i jedinice - delta ne bi imala smisla
+            self._publish(self.snapshot())
+
+
+class MatchServer:
+    """
+    Više partija u jednom procesu i Unix socket za gledatelje
+
+    Args:
+        agent_factory: funkcija koja stvara agenta za jednu partiju
+        executor: executor za odluke agenata
+    """
+    def __init__(self, agent_factory, executor, matches=4, step_delay=0.5,
+                 socket_path=MATCH_SERVER_SOCKET, queue_size=SPECTATOR_QUEUE):
+        self.matches = {
+            i: Match(i, agent_factory(), executor, step_delay)
+            for i in range(matches)
+        }
+        self.socket_path = socket_path
+        self.queue_size = queue_size
+        self._clients = set()
+
+    async def serve(self, games=None):
+        """Pokreće sve partije i socket; završava kad sve partije odigraju `games` igara"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        trace.info("Match server: %d partija na %s", len(self.matches), self.socket_path)
+        try:
+            async with server:
+                await asyncio.gather(*(match.run(games) for match in self.matches.values()))
+        finally:
+            # Prekid veza završava _handle_client svakog klijenta (EOF) - abort
+            # jer close() čeka da spori klijent pročita buffer
+            for writer in list(self._clients):
+                writer.transport.abort()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader, writer):
+        spectator = None
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                except (ValueError, AttributeError):
+                    writer.write(_encode({'type': 'error', 'error': 'bad request'}))
+                    continue
+
+                if op == 'list':
+                    matches = [match.summary() for match in self.matches.values()]
+                    writer.write(_encode({'type': 'matches', 'matches': matches}))
+                elif op == 'watch' and request.get('match') in self.matches:
+                    if spectator is not None:
+                        spectator.match.spectators.discard(spectator)
+                        spectator.close()
+                    match = self.matches[request['match']]
+                    spectator = Spectator(match, writer, self.queue_size)
+                    match.spectators.add(spectator)
+                else:
+                    writer.write(_encode({'type': 'error', 'error': f'unknown request: {line.decode().strip()}'}))
+        except ConnectionError:
+            pass
+        finally:
+            if spectator is not None:
+                spectator.match.spectators.discard(spectator)
+                spectator.close()
+            self._clients.discard(writer)
+            writer.close()
+
+
+def _agent_factory(name, service):
+    """(factory, broj dretvi executora) za odabrani backend"""
+    if name == 'greedy':
+        from monte_carlo_agent import GreedyAgent
+        return GreedyAgent, None
+    from prolog_comm import PrologAgent
+    if service:
+        # Svaka partija ima svoju vezu prema agent service-u
+        return (lambda: PrologAgent(service=service)), None
+    # Jedan lokalni SWI engine - sve odluke idu kroz istu dretvu
+    return PrologAgent, 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asyncio server za istovremene partije s gledateljima")
+    parser.add_argument('--matches', type=int, default=4)
+    parser.add_argument('--agent', choices=['greedy', 'prolog'], default='prolog')
+    parser.add_argument('--service', metavar='PATH',
+                        help="Prolog odluke preko agent_service-a umjesto lokalnog enginea")
+    parser.add_argument('--workers', type=int, help="Dretve executora za odluke agenata")
+    parser.add_argument('--step-delay', type=float, default=0.5,
+                        help="Sekunde između koraka partije (0 = puna brzina)")
+    parser.add_argument('--games', type=int, help="Završi nakon N igara po partiji")
+    parser.add_argument('--socket', default=MATCH_SERVER_SOCKET, metavar='PATH')
+    args = parser.parse_args(argv)
+
+    trace.set_level('warning')
+    trace.add_sink(ConsoleSink())
+    factory, threads = _agent_factory(args.agent, args.service)
+    executor = ThreadPoolExecutor(max_workers=threads or args.workers)
+    if threads == 1:
+        # pyswip engine se stvara u dretvi u kojoj će raditi
+        agent = executor.submit(factory).result()
+        factory = lambda: agent
+
+    server = MatchServer(factory, executor, args.matches, args.step_delay, args.socket)
+    print(f"Match server: {args.matches} partija na {args.socket} (Ctrl+C za kraj)")
+    try:
+        asyncio.run(server.serve(args.games))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False)
+        trace.close()
+    for match in server.matches.values():
+        print(f"  match {match.id}: {match.results}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,514 @@
+# ============================================================================
+# DATOTEKA: monte_carlo_agent.py
+# Uloga: Monte Carlo player agent - alternativa PrologAgent-u
+# ============================================================================
+#
+# Svaka kandidat akcija se procjenjuje brzim playout-ima nad game.state
+# snapshot-ima: player igra scripted (greedy prioriteti kao agent.pl, uz
+# nasumične poteze s vjerojatnošću epsilon) ili potpuno nasumično, a
+# neprijatelji igraju kao RangeEnemy/MeleeEnemy (isti BFS i redoslijed kao
+# initiative queue). Playout-i se dijele na process pool i staju kad istekne
+# vremenski budžet odluke. Bira se akcija s najvećim procijenjenim win rate-om.
+#
+# Nagrada playout-a: 1 pobjeda, 0 poraz, 0.5 ako partija nije gotova
+# nakon MC_ROLLOUT_TURNS turn-ova.
+#
+# Statistike playout-a se pamte u TranspositionTable po Zobrist hash-u stanja
+# nakon kandidat akcije (i broju preostalih akcija), pa se pozicija koja se
+# ponovi (npr. player se vrati na isti tile) ne procjenjuje ispočetka.
+
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from config.constants import (
+    TERRAIN_GRASS, TERRAIN_WATER, PLAYER_ACTIONS,
+    AGENT_TIME_BUDGET, AGENT_WEIGHTS, MC_ROLLOUT_TURNS, MC_EPSILON
+)
+from entities.store import KIND_PLAYER, KIND_RANGE, KIND_MELEE
+from game import state as game_state
+from game.influence import influence_for_state
+from game.walk import walk_distances_for_state
+from game.zobrist import TranspositionTable, apply_hashed, actions_key, hash_state
+from diagnostics.metrics import metrics
+from diagnostics.trace import trace
+
+KIND_BY_NAME = {'range': KIND_RANGE, 'melee': KIND_MELEE}
+
+# Budžeti akcija neprijatelja (RangeEnemy/MeleeEnemy.actions_per_turn)
+ENEMY_ACTIONS = {KIND_RANGE: 1, KIND_MELEE: 2}
+
+NEIGHBOURS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+NEIGHBOURS_8 = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+Z_95 = 1.96
+
+# Slotovi transposition table-a (statistike po kandidat poziciji)
+MC_TABLE_SIZE = 1 << 16
+
+
+def state_from_dict(game_state_dict):
+    """game.state snapshot iz GameLoop._prepare_game_state dict-a"""
+    player = game_state_dict['player']
+    units = [(KIND_PLAYER, player['x'], player['y'], player['hp'])]
+    for enemy in game_state_dict['enemies']:
+        units.append((KIND_BY_NAME[enemy['type']], enemy['x'], enemy['y'], enemy['hp']))
+    return game_state.make_state(game_state_dict['terrain'], units)
+
+
+def _chebyshev(ax, ay, bx, by):
+    return max(abs(ax - bx), abs(ay - by))
+
+
+def _move_distance(walk, ex, ey, x, y):
+    """Hodajuća udaljenost od neprijatelja do tile-a, grid distance ako je nema"""
+    if walk is not None:
+        distance = walk.distance(ex, ey, x, y)
+        if distance is not None:
+            return distance
+    return _chebyshev(ex, ey, x, y)
+
+
+def candidate_actions(state, weights=AGENT_WEIGHTS):
+    """
+    Akcije playera s greedy prioritetima iz agent.pl (težine kao AGENT_WEIGHTS)
+
+    Returns:
+        Lista (prioritet, akcija) sortirana od najboljeg prioriteta
+    """
+    terrain, width, height, units = state
+    _kind, px, py, _hp = units[game_state.PLAYER_INDEX]
+    enemies = [u for u in units[1:] if u[3] > 0]
+    occupied = {(u[1], u[2]) for u in units if u[3] > 0}
+    distances = [_chebyshev(px, py, e[1], e[2]) for e in enemies]
+    scored = []
+
+    # Redoslijed generiranja = redoslijed klauzula u agent.pl (range, melee, push, move)
+    for (_ekind, ex, ey, ehp), distance in zip(enemies, distances):
+        if 1 <= distance <= 2 and game_state.has_line_of_sight(state, px, py, ex, ey):
+            priority = (weights['range_base'] - distance * weights['range_distance']
+                        - ehp * weights['range_hp'])
+            scored.append((priority, ('range_attack', ex, ey, 1)))
+
+    for (_ekind, ex, ey, ehp), distance in zip(enemies, distances):
+        if distance == 1:
+            scored.append((weights['melee_base'] - ehp * weights['melee_hp'],
+                           ('melee_attack', ex, ey, 2)))
+
+    for (_ekind, ex, ey, _ehp), distance in zip(enemies, distances):
+        if distance != 1:
+            continue
+        dx, dy = ex - px, ey - py
+        nx, ny = ex + dx, ey + dy
+        if 0 <= nx < width and 0 <= ny < height:
+            cell = terrain[ny * width + nx]
+            if cell == TERRAIN_WATER:
+                scored.append((weights['push_water'], ('melee_push', ex, ey, dx, dy)))
+            elif cell == TERRAIN_GRASS and (nx, ny) not in occupied:
+                scored.append((weights['push_grass'], ('melee_push', ex, ey, dx, dy)))
+
+    walk = walk_distances_for_state(state, diagonal=True) if enemies else None
+    for dx, dy in NEIGHBOURS_8:
+        nx, ny = px + dx, py + dy
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
+        if terrain[ny * width + nx] != TERRAIN_GRASS or (nx, ny) in occupied:
+            continue
+        if enemies:
+            nearest = min(_move_distance(walk, e[1], e[2], nx, ny) for e in enemies)
+            priority = weights['move_base'] - nearest * weights['move_distance']
+        else:
+            priority = 30
+        scored.append((priority, ('move', nx, ny)))
+
+    # Stabilno sortiranje - jednaki prioriteti ostaju u redoslijedu generiranja
+    scored.sort(key=lambda item: -item[0])
+    return scored
+
+
+def _bfs_first_step(state, sx, sy, tx, ty, mover):
+    """find_path_bfs nad snapshot-om - prvi korak prema (tx, ty) ili None"""
+    if sx == tx and sy == ty:
+        return None
+    walk = walk_distances_for_state(state)
+    if walk is not None and walk.distance(sx, sy, tx, ty) is None:
+        return None
+    terrain, width, height, units = state
+    occupied = {(u[1], u[2]) for i, u in enumerate(units) if u[3] > 0 and i != mover}
+
+    queue = deque([(sx, sy, None)])
+    visited = {(sx, sy)}
+    while queue:
+        x, y, first = queue.popleft()
+        for dx, dy in NEIGHBOURS_4:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            if (nx, ny) in visited:
+                continue
+            if terrain[ny * width + nx] != TERRAIN_GRASS:
+                continue
+            if (nx, ny) in occupied and (nx, ny) != (tx, ty):
+                continue
+            step = first if first is not None else (nx, ny)
+            if nx == tx and ny == ty:
+                return step
+            queue.append((nx, ny, step))
+            visited.add((nx, ny))
+    return None
+
+
+def enemy_action(state, index):
+    """Akcija neprijatelja `index` - ista logika kao decide_action u entities/enemy.py"""
+    units = state[game_state.UNITS]
+    kind, ex, ey, _hp = units[index]
+    _pkind, px, py, _php = units[game_state.PLAYER_INDEX]
+    distance = _chebyshev(ex, ey, px, py)
+
+    if kind == KIND_MELEE:
+        if distance == 1:
+            return ('melee_attack', px, py, 2)
+    else:
+        if distance <= 2 and game_state.has_line_of_sight(state, ex, ey, px, py):
+            return ('range_attack', px, py, 1)
+        # Kiting prema firing tile-u (RangeEnemy)
+        influence = influence_for_state(state, px, py)
+        if influence.reachable(ex, ey):
+            occupied = {(u[1], u[2]) for u in units if u[3] > 0}
+            step = influence.step(ex, ey, occupied)
+            return ('move', step[0], step[1]) if step is not None else None
+
+    step = _bfs_first_step(state, ex, ey, px, py, index)
+    if step is not None:
+        return ('move', step[0], step[1])
+    return None
+
+
+def enemy_turn(state):
+    """
+    Cijeli enemy turn redoslijedom InitiativeQueue-a: po jedna akcija
+    svima, pa druga akcija melee neprijateljima. Staje kad player umre.
+    """
+    units = state[game_state.UNITS]
+    order = [i for i in range(1, len(units)) if units[i][3] > 0]
+    for used in range(1, max(ENEMY_ACTIONS.values())):
+        order += [i for i in range(1, len(units))
+                  if units[i][3] > 0 and ENEMY_ACTIONS[units[i][0]] > used]
+
+    for index in order:
+        if state[game_state.UNITS][game_state.PLAYER_INDEX][3] <= 0:
+            break
+        action = enemy_action(state, index)
+        if action is not None:
+            state = game_state.apply(state, index, action)
+    return state
+
+
+def _player_policy(state, rng, policy, epsilon):
+    """Akcija playera u playout-u (None ako nema mogućih akcija)"""
+    candidates = candidate_actions(state)
+    if not candidates:
+        return None
+    if policy == 'random' or rng.random() < epsilon:
+        return rng.choice(candidates)[1]
+    return candidates[0][1]
+
+
+def rollout(state, actions_left, rng, policy='scripted', epsilon=MC_EPSILON,
+            max_turns=MC_ROLLOUT_TURNS, deadline=None):
+    """
+    Odigra partiju od stanja u kojem player ima još `actions_left` akcija
+
+    Args:
+        deadline: perf_counter() rok - provjerava se prije svakog turn-a
+    Returns:
+        Nagrada 1.0 (pobjeda), 0.0 (poraz), 0.5 (nije gotovo) ili None
+        (rok je istekao usred playout-a - rezultat se odbacuje)
+    """
+    for _turn in range(max_turns):
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        for _action in range(actions_left):
+            if game_state.winner(state):
+                break
+            action = _player_policy(state, rng, policy, epsilon)
+            if action is None:
+                break
+            state = game_state.apply(state, game_state.PLAYER_INDEX, action)
+
+        if game_state.winner(state) is None:
+            state = enemy_turn(state)
+
+        result = game_state.winner(state)
+        if result == 'player':
+            return 1.0
+        if result == 'enemies':
+            return 0.0
+        actions_left = PLAYER_ACTIONS
+    return 0.5
+
+
+def after_candidate(state, action, actions_left):
+    """Stanje nakon kandidat akcije + broj akcija koje playeru ostaju u turn-u"""
+    state = game_state.apply(state, game_state.PLAYER_INDEX, action)
+    actions_left -= 1
+    if actions_left <= 0 and game_state.winner(state) is None:
+        state = enemy_turn(state)
+        actions_left = PLAYER_ACTIONS
+    return state, actions_left
+
+
+def rollout_batch(state, actions_left, actions, budget, seed, policy='scripted',
+                  epsilon=MC_EPSILON, max_turns=MC_ROLLOUT_TURNS):
+    """
+    Worker - playout-i round-robin po kandidatima dok ne istekne budžet
+
+    Rok se provjerava prije svakog playout-a i unutar njega (po turn-u), pa
+    na velikim mapama, gdje je jedan playout dulji od budžeta, odluka ne
+    čeka cijeli krug. Prekinut krug ostavlja kandidatima s početka kruga
+    najviše jedan playout više; krug počinje od nasumičnog kandidata da
+    taj višak ne ide uvijek istima kroz workere. Win rate r/n ostaje
+    nepristran jer rok ne ovisi o ishodima.
+
+    Returns:
+        (plays, rewards) - liste po kandidatu
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + budget
+    starts = [after_candidate(state, action, actions_left) for action in actions]
+    plays = [0] * len(actions)
+    rewards = [0.0] * len(actions)
+    first = rng.randrange(len(actions))
+    order = list(range(first, len(actions))) + list(range(first))
+
+    while True:
+        for i in order:
+            if time.perf_counter() >= deadline:
+                return plays, rewards
+            start, left = starts[i]
+            result = game_state.winner(start)
+            if result is not None:
+                reward = 1.0 if result == 'player' else 0.0
+            else:
+                reward = rollout(start, left, rng, policy, epsilon, max_turns, deadline)
+                if reward is None:
+                    return plays, rewards
+            plays[i] += 1
+            rewards[i] += reward
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Wilsonov interval pouzdanosti za udio uspjeha"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def _prob_better(best, other):
+    """Normalna aproksimacija P(win rate najbolje > win rate druge akcije)"""
+    (p1, n1), (p2, n2) = best, other
+    variance = p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2
+    if variance == 0:
+        return 1.0 if p1 > p2 else 0.5
+    return 0.5 * (1 + math.erf((p1 - p2) / math.sqrt(2 * variance)))
+
+
+def action_to_dict(action, game_state_dict):
+    """Kompaktni tuple -> dict akcija u formatu PrologAgent._parse_action"""
+    action_type = action[0]
+    if action_type == 'move':
+        return {'type': 'move', 'target': (action[1], action[2])}
+
+    target = {'x': action[1], 'y': action[2]}
+    for enemy in game_state_dict['enemies']:
+        if enemy['x'] == action[1] and enemy['y'] == action[2]:
+            target = enemy
+            break
+    if action_type == 'melee_push':
+        return {'type': 'melee_push', 'target': target, 'direction': (action[3], action[4])}
+    return {'type': action_type, 'target': target, 'damage': action[3]}
+
+
+class GreedyAgent:
+    """
+    Scripted player iz playout-a kao samostalni agent - greedy prioriteti
+    iz agent.pl bez Prologa (referenca za batch engine i benchmarkove)
+    """
+    def __init__(self, weights=None):
+        self.weights = dict(AGENT_WEIGHTS, **(weights or {}))
+
+    def get_action(self, game_state_dict):
+        candidates = candidate_actions(state_from_dict(game_state_dict), self.weights)
+        if not candidates:
+            return None
+        return action_to_dict(candidates[0][1], game_state_dict)
+
+
+class MonteCarloAgent:
+    """
+    Player agent s istim sučeljem kao PrologAgent (get_action(game_state))
+
+    Args:
+        time_budget: sekunde po odluci
+        workers: broj procesa (0 = playout-i u ovom procesu)
+        policy: 'scripted' ili 'random' player u playout-ima
+        seed: seed za playout-e (ne dira globalni random igre)
+        table_size: slotovi transposition table-a (0 = bez tablice)
+    """
+    def __init__(self, time_budget=AGENT_TIME_BUDGET, workers=None, policy='scripted',
+                 epsilon=MC_EPSILON, max_turns=MC_ROLLOUT_TURNS, seed=None,
+                 table_size=MC_TABLE_SIZE):
+        self.time_budget = time_budget
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.policy = policy
+        self.epsilon = epsilon
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+        self.pool = None
+        # Zamjena po dubini = broju playout-a: bolje uzorkovani unos ostaje
+        self.table = TranspositionTable(table_size, policy='depth') if table_size else None
+
+        # Statistika zadnje odluke (rollouts, rollouts_per_sec, win_rate, confidence...)
+        self.last_decision = None
+        self.total_rollouts = 0
+        self.total_seconds = 0.0
+
+    def _get_pool(self):
+        # Pool se stvara jednom i koristi za sve odluke (start procesa je skup)
+        if self.pool is None and self.workers > 0:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def close(self):
+        """Gasi process pool"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    @property
+    def rollouts_per_sec(self):
+        """Prosječna brzina kroz sve odluke"""
+        if not self.total_seconds:
+            return 0.0
+        return self.total_rollouts / self.total_seconds
+
+    def get_action(self, game_state_dict):
+        """
+        Traži najbolju akciju playout-ima
+
+        Args:
+            game_state_dict: Dictionary s trenutnim stanjem igre
+
+        Returns:
+            Dictionary s akcijom ili None
+        """
+        start = time.perf_counter()
+        state = state_from_dict(game_state_dict)
+        candidates = candidate_actions(state)
+        if not candidates:
+            return None
+        actions = [action for _priority, action in candidates]
+
+        if len(actions) == 1:
+            # Nema izbora - bez playout-a i bez procjene
+            self.last_decision = {
+                'action': actions[0], 'win_rate': None, 'interval': None, 'confidence': 1.0,
+                'rollouts': 0, 'rollouts_per_sec': 0.0, 'candidates': 1, 'reused': 0,
+            }
+            return action_to_dict(actions[0], game_state_dict)
+
+        actions_left = game_state_dict['actions_left']
+        plays, rewards = self._run_rollouts(state, actions_left, actions)
+        reused = self._merge_table(state, game_state_dict.get('hash'), actions_left,
+                                   actions, plays, rewards)
+
+        # Najveći win rate, kod izjednačenja bolji greedy prioritet
+        rates = [r / n if n else 0.0 for r, n in zip(rewards, plays)]
+        ranking = sorted(range(len(actions)), key=lambda i: -rates[i])
+        best = ranking[0]
+
+        elapsed = time.perf_counter() - start
+        total = sum(plays) - reused
+        self.total_rollouts += total
+        self.total_seconds += elapsed
+
+        if len(ranking) > 1 and plays[ranking[1]]:
+            second = ranking[1]
+            confidence = _prob_better((rates[best], plays[best]), (rates[second], plays[second]))
+        else:
+            confidence = 1.0
+
+        self.last_decision = {
+            'action': actions[best],
+            'win_rate': rates[best],
+            'interval': wilson_interval(rewards[best], plays[best]) if plays[best] else None,
+            'confidence': confidence,
+            'rollouts': total,
+            'rollouts_per_sec': total / elapsed if elapsed else 0.0,
+            'candidates': len(actions),
+            'reused': reused,
+        }
+        metrics.count('mc.rollouts', total)
+        metrics.observe('mc.rollouts_per_sec', self.last_decision['rollouts_per_sec'])
+        trace.debug("MC: %s win=%.2f conf=%.2f (%d rollouts, %.0f/s)",
+                    actions[best], rates[best], confidence, total,
+                    self.last_decision['rollouts_per_sec'])
+
+        return action_to_dict(actions[best], game_state_dict)
+
+    def _merge_table(self, state, value, actions_left, actions, plays, rewards):
+        """
+        Dodaje statistike iz tablice novim playout-ima (na mjestu) i sprema zbroj
+
+        Args:
+            value: Zobrist hash stanja (GameLoop ga šalje u game_state['hash'])
+        Returns:
+            Broj playout-a preuzetih iz tablice
+        """
+        if self.table is None:
+            return 0
+        if value is None:
+            value = hash_state(state)
+        reused = 0
+        for i, action in enumerate(actions):
+            _child, child_value = apply_hashed(state, value, game_state.PLAYER_INDEX, action)
+            key = child_value ^ actions_key(actions_left - 1)
+            stored = self.table.get(key)
+            if stored is not None:
+                reused += stored[0]
+                plays[i] += stored[0]
+                rewards[i] += stored[1]
+            self.table.put(key, (plays[i], rewards[i]), depth=plays[i])
+        metrics.count('mc.table_reused', reused)
+        return reused
+
+    def _run_rollouts(self, state, actions_left, actions):
+        """Dijeli playout-e po workerima i zbraja rezultate po kandidatu"""
+        args = (state, actions_left, actions, self.time_budget)
+        options = (self.policy, self.epsilon, self.max_turns)
+        pool = self._get_pool()
+
+        if pool is None:
+            return rollout_batch(*args, self.rng.getrandbits(64), *options)
+
+        futures = [
+            pool.submit(rollout_batch, *args, self.rng.getrandbits(64), *options)
+            for _ in range(self.workers)
+        ]
+        plays = [0] * len(actions)
+        rewards = [0.0] * len(actions)
+        for future in futures:
+            worker_plays, worker_rewards = future.result()
+            for i in range(len(actions)):
+                plays[i] += worker_plays[i]
+                rewards[i] += worker_rewards[i]
+        return plays, rewards
@@ -2,83 +2,184 @@
 % POJEDNOSTAVLJENI PROLOG AI AGENT za Into The Breach
 % ============================================================================
 
-% Glavni predikat - nalazi najbolju akciju
+:- use_module(library(lists)).
+:- use_module(library(option)).
+:- use_module(library(apply)).
+
+% Memoizacija LOS-a - isti upiti se ponavljaju pri gradnji bitmapa.
+% Tablice se brišu na početku svakog best_action poziva. possible_action/8
+% se namjerno ne tablira: tabling može promijeniti redoslijed odgovora, a
+% redoslijed klauzula je tie-break kod jednakih prioriteta (GreedyAgent i
+% game/batch.py biraju istim redoslijedom).
+:- table has_line_of_sight/5.
+
+% Bitmape po tile-u (game/tiles.py) - bit J je tile J = Y * GridSize + X.
+% Čuva se više skupova tablica istovremeno, svaki pod svojim Id-om, pa
+% partije koje se izmjenjuju (match server) ne šalju tablice iznova:
+%   tile_set(Id, Terrain)         - teren za koji vrijedi skup Id
+%   los_mask(Id, I, M)            - tile-ovi vidljivi s I (Bresenham bez planina)
+%   fire_mask(Id, I, M)           - range napad s I (grid distance 1-2 + LOS)
+%   step_mask(Id, I, M)           - kretanje s I (8 susjeda, trava)
+%   adjacent_mask(Id, I, M)       - melee napad s I (grid distance 1)
+%   terrain_mask(Id, T, M)        - svi tile-ovi terena T (grass / water)
+% Python ih šalje load_tile_tables/5 (Id bira PrologAgent i briše stare
+% skupove s unload_tile_tables/1); ako skupa za teren nema,
+% ensure_tile_tables/2 ga izgradi ovdje pod Id-om `local`. Skup trenutnog
+% upita je u globalnoj varijabli tile_set - predikati s jednim argumentom
+% manje (fire_mask(I, M)...) čitaju iz njega.
+:- dynamic tile_set/2.
+:- dynamic los_mask/3.
+:- dynamic fire_mask/3.
+:- dynamic step_mask/3.
+:- dynamic adjacent_mask/3.
+:- dynamic terrain_mask/3.
+
+% Hodajuće udaljenosti (game/walk.py): walk_row(Id, Smjerovi, I, d(D0, D1, ...))
+% je redak tablice za tile I, 8 ili 4 smjera, -1 = nema puta. Nema ih za
+% mape prevelike za tablicu - tada se koristi grid distance.
+:- dynamic walk_row/4.
+
+los_mask(I, M) :- nb_getval(tile_set, Id), los_mask(Id, I, M).
+fire_mask(I, M) :- nb_getval(tile_set, Id), fire_mask(Id, I, M).
+step_mask(I, M) :- nb_getval(tile_set, Id), step_mask(Id, I, M).
+adjacent_mask(I, M) :- nb_getval(tile_set, Id), adjacent_mask(Id, I, M).
+terrain_mask(T, M) :- nb_getval(tile_set, Id), terrain_mask(Id, T, M).
+walk_row(Directions, I, Row) :- nb_getval(tile_set, Id), walk_row(Id, Directions, I, Row).
+
+% Težine prioriteta (mijenjaju se opcijom weights(w(...)) u best_action/3):
+%   w(RangeBase, RangeDist, RangeHP,   range:  RangeBase - D*RangeDist - EHP*RangeHP
+%     MeleeBase, MeleeHP,              melee:  MeleeBase - EHP*MeleeHP
+%     MoveBase, MoveDist,              move:   MoveBase - MinDist*MoveDist
+%     PushWater, PushGrass)            push:   PushWater u vodu, PushGrass na travu
+default_weights(w(90, 5, 3, 95, 3, 50, 5, 100, 20)).
+
+% Glavni predikat (greedy, bez pretrage) - nalazi najbolju akciju
 best_action(GameState, Action) :-
+    abolish_all_tables,
+    GameState = game_state(_Player, _Enemies, Terrain, _ActionsLeft, GridSize),
+    ensure_tile_tables(Terrain, GridSize),
+    default_weights(Weights),
+    greedy_action(GameState, Weights, Action).
+
+% Greedy izbor - najviši prioritet od svih mogućih akcija
+greedy_action(GameState, Weights, Action) :-
     GameState = game_state(Player, Enemies, Terrain, _ActionsLeft, GridSize),
     
     % Generiraj sve moguće akcije
     findall(
-        scored_action(Priority, Type, Details),
-        possible_action(Player, Enemies, Terrain, GridSize, Type, Priority, Details),
+        Priority-(Type-Details),
+        possible_action(Player, Enemies, Terrain, GridSize, Weights, Type, Priority, Details),
         Actions
     ),
     
-    % Sortiraj po prioritetu (viši je bolji)
-    sort(1, @>=, Actions, SortedActions),
+    % Sortiraj po prioritetu (viši je bolji), jednaki po redoslijedu generiranja
+    order_keys(Actions, 0, Keyed),
+    sort(1, @>=, Keyed, SortedActions),
     
     % Uzmi najbolju akciju
-    (SortedActions = [scored_action(_, BestType, BestDetails) | _] ->
+    (SortedActions = [_-(BestType-BestDetails) | _] ->
         format_action(BestType, BestDetails, Action)
     ;
         Action = no_action
     ).
 
+% Redni broj generiranja kao zadnji dio ključa: Key-V -> (Key-Order)-V uz
+% Order = -N, pa kod jednakog Key prvi generirani ide prvi u sort(1, @>=, ...)
+order_keys([], _N, []).
+order_keys([Key-Value | Rest], N, [(Key-Order)-Value | Ordered]) :-
+    Order is -N,
+    Next is N + 1,
+    order_keys(Rest, Next, Ordered).
+
 % ============================================================================
 % GENERIRANJE MOGUĆIH AKCIJA - POJEDNOSTAVLJENO
 % ============================================================================
 
 % Range attack - NAJVIŠI prioritet
-possible_action(Player, Enemies, Terrain, _GridSize, range_attack, Priority, Details) :-
+possible_action(Player, Enemies, _Terrain, GridSize, Weights, range_attack, Priority, Details) :-
     Player = player(PX, PY, _PHP),
+    tile_index(PX, PY, GridSize, PI),
+    fire_mask(PI, Fire),
     member(Enemy, Enemies),
     Enemy = enemy(_Type, EX, EY, EHP),
     EHP > 0,
     
-    % Check range (distance 1-2, grid distance)
-    grid_distance(PX, PY, EX, EY, Distance),
-    Distance >= 1,
-    Distance =< 2,
-    
-    % Check line of sight
-    has_line_of_sight(PX, PY, EX, EY, Terrain),
+    % Range (distance 1-2) i LOS - jedan bit test
+    on_mask(Fire, EX, EY, GridSize),
     
     % Viši prioritet za bliže neprijatelje
-    Priority is 90 - Distance * 5 - EHP * 3,
+    grid_distance(PX, PY, EX, EY, Distance),
+    Weights = w(RangeBase, RangeDist, RangeHP, _, _, _, _, _, _),
+    Priority is RangeBase - Distance * RangeDist - EHP * RangeHP,
     
     Details = attack(EX, EY, 1).
 
 % Melee attack - VISOK prioritet kada je enemy adjacent
-possible_action(Player, Enemies, _Terrain, _GridSize, melee_attack, Priority, Details) :-
+possible_action(Player, Enemies, _Terrain, GridSize, Weights, melee_attack, Priority, Details) :-
     Player = player(PX, PY, _PHP),
+    tile_index(PX, PY, GridSize, PI),
+    adjacent_mask(PI, Adjacent),
     member(Enemy, Enemies),
     Enemy = enemy(_Type, EX, EY, EHP),
     EHP > 0,
     
     % Enemy must be adjacent (grid distance 1 - uključuje dijagonale)
-    grid_distance(PX, PY, EX, EY, 1),
+    on_mask(Adjacent, EX, EY, GridSize),
     
     % VISOK prioritet - melee radi više damage (2 vs 1)
-    Priority is 95 - EHP * 3,
+    Weights = w(_, _, _, MeleeBase, MeleeHP, _, _, _, _),
+    Priority is MeleeBase - EHP * MeleeHP,
     
     Details = attack(EX, EY, 2).
 
+% Melee push - guranje u vodu ubija (najviši prioritet), inače samo repozicija
+possible_action(Player, Enemies, _Terrain, GridSize, Weights, melee_push, Priority, Details) :-
+    Player = player(PX, PY, _PHP),
+    tile_index(PX, PY, GridSize, PI),
+    adjacent_mask(PI, Adjacent),
+    member(Enemy, Enemies),
+    Enemy = enemy(_Type, EX, EY, EHP),
+    EHP > 0,
+    on_mask(Adjacent, EX, EY, GridSize),
+    
+    % Gura se u smjeru od playera prema neprijatelju
+    DX is EX - PX,
+    DY is EY - PY,
+    NewX is EX + DX,
+    NewY is EY + DY,
+    in_bounds(NewX, NewY, GridSize),
+    
+    Weights = w(_, _, _, _, _, _, _, PushWater, PushGrass),
+    terrain_mask(water, Water),
+    terrain_mask(grass, Grass),
+    (on_mask(Water, NewX, NewY, GridSize) ->
+        Priority = PushWater  % Voda - instant kill
+    ;
+        on_mask(Grass, NewX, NewY, GridSize),  % Ne u planinu
+        \+ position_occupied(NewX, NewY, Enemies),
+        Priority = PushGrass
+    ),
+    
+    Details = push(EX, EY, DX, DY).
+
 % Movement - uvijek idi prema najbližem neprijatelju
-possible_action(Player, Enemies, Terrain, GridSize, move, Priority, Details) :-
+possible_action(Player, Enemies, _Terrain, GridSize, Weights, move, Priority, Details) :-
     Player = player(PX, PY, _PHP),
+    tile_index(PX, PY, GridSize, PI),
+    step_mask(PI, Steps),
     
     % Generate possible positions (8-directional)
     member((DX, DY), [(0,1), (0,-1), (1,0), (-1,0), (1,1), (1,-1), (-1,1), (-1,-1)]),
     NewX is PX + DX,
     NewY is PY + DY,
     
-    % Check validity
+    % Check validity - step_mask sadrži samo travu unutar mape
     in_bounds(NewX, NewY, GridSize),
-    get_terrain_at(Terrain, NewX, NewY, TerrainType),
-    TerrainType = 0,  % Grass
+    on_mask(Steps, NewX, NewY, GridSize),
     \+ position_occupied(NewX, NewY, Enemies),
     
     % Prioritet - što bliže neprijatelju, to bolje
-    calculate_move_priority(Enemies, NewX, NewY, Priority),
+    calculate_move_priority(Enemies, NewX, NewY, GridSize, Weights, Priority),
     
     Details = move_to(NewX, NewY).
 
@@ -97,6 +198,13 @@ in_bounds(X, Y, GridSize) :-
     X >= 0, X < GridSize,
     Y >= 0, Y < GridSize.
 
+% Indeks tile-a i bit test u bitmapi (X, Y moraju biti unutar mape)
+tile_index(X, Y, GridSize, Index) :-
+    Index is Y * GridSize + X.
+
+on_mask(Mask, X, Y, GridSize) :-
+    Mask /\ (1 << (Y * GridSize + X)) =\= 0.
+
 % Get terrain type at position
 get_terrain_at(Terrain, X, Y, Type) :-
     nth0(Y, Terrain, Row),
@@ -113,12 +221,6 @@ has_line_of_sight(X1, Y1, X2, Y2, Terrain) :-
 
 check_line(X, Y, X, Y, _DX, _DY, _SX, _SY, _Err, _Terrain) :- !.
 check_line(X1, Y1, X2, Y2, DX, DY, SX, SY, Err, Terrain) :-
-    % Skip start and end positions
-    (\+ (X1 = X2, Y1 = Y2) ->
-        (get_terrain_at(Terrain, X1, Y1, Type),
-         Type \= 1)  % Not mountain
-    ; true),
-    
     % Calculate next position
     E2 is 2 * Err,
     (E2 > -DY ->
@@ -136,6 +238,14 @@ check_line(X1, Y1, X2, Y2, DX, DY, SX, SY, Err, Terrain) :-
         NewY = Y1
     ),
     
+    % Skip start and end positions (kao game/tiles.py) - samo tile-ovi između
+    ((NewX =:= X2, NewY =:= Y2) ->
+        true
+    ;
+        get_terrain_at(Terrain, NewX, NewY, Type),
+        Type \= 1  % Not mountain
+    ),
+    
     check_line(NewX, NewY, X2, Y2, DX, DY, SX, SY, NewErr, Terrain).
 
 % Check if position is occupied by enemy
@@ -143,15 +253,15 @@ position_occupied(X, Y, Enemies) :-
     member(enemy(_Type, X, Y, HP), Enemies),
     HP > 0.
 
-% Calculate movement priority - jednostavno, što bliže neprijatelju to bolje
-calculate_move_priority(Enemies, NewX, NewY, Priority) :-
+% Calculate movement priority - što bliže neprijatelju (hodajući) to bolje
+calculate_move_priority(Enemies, NewX, NewY, GridSize, Weights, Priority) :-
     % Nađi najbližeg neprijatelja
     findall(
         Dist,
         (
             member(enemy(_Type, EX, EY, EHP), Enemies),
             EHP > 0,
-            grid_distance(NewX, NewY, EX, EY, Dist)
+            move_distance(EX, EY, NewX, NewY, GridSize, Dist)
         ),
         Distances
     ),
@@ -159,16 +269,144 @@ calculate_move_priority(Enemies, NewX, NewY, Priority) :-
     (Distances \= [] ->
         min_list(Distances, MinDist),
         % Što bliže, to viši prioritet (ali manji od attack-a)
-        Priority is 50 - MinDist * 5
+        Weights = w(_, _, _, _, _, MoveBase, MoveDist, _, _),
+        Priority is MoveBase - MinDist * MoveDist
     ;
         Priority = 30
     ).
 
+% Hodajuća udaljenost od (X1, Y1) do (X2, Y2) iz tablice - jedan arg/3
+walk_distance(Directions, X1, Y1, X2, Y2, GridSize, Distance) :-
+    tile_index(X1, Y1, GridSize, I),
+    walk_row(Directions, I, Row),
+    J is Y2 * GridSize + X2 + 1,
+    arg(J, Row, Distance),
+    Distance >= 0.
+
+% Udaljenost za kretanje playera (8 smjerova), grid distance bez tablice
+move_distance(X1, Y1, X2, Y2, GridSize, Distance) :-
+    (walk_distance(8, X1, Y1, X2, Y2, GridSize, Walk) ->
+        Distance = Walk
+    ;
+        grid_distance(X1, Y1, X2, Y2, Distance)
+    ).
+
 % Sign function
 sign(X, 1) :- X > 0, !.
 sign(X, -1) :- X < 0, !.
 sign(0, 0).
 
+% ============================================================================
+% BITMAPE PO TILE-U
+% ============================================================================
+
+% Python (PrologAgent) šalje tablice iz game/tiles.py:
+%   load_tile_tables(Id, Terrain, [t(I, Los, Fire, Steps, Adjacent), ...], Grass, Water)
+load_tile_tables(Id, Terrain, Tiles, Grass, Water) :-
+    unload_tile_tables(Id),
+    forall(member(t(I, Los, Fire, Steps, Adjacent), Tiles),
+           ( assertz(los_mask(Id, I, Los)),
+             assertz(fire_mask(Id, I, Fire)),
+             assertz(step_mask(Id, I, Steps)),
+             assertz(adjacent_mask(Id, I, Adjacent)) )),
+    assertz(terrain_mask(Id, grass, Grass)),
+    assertz(terrain_mask(Id, water, Water)),
+    assertz(tile_set(Id, Terrain)).
+
+% Python šalje retke obje tablice nakon load_tile_tables/5 ([] = bez tablice)
+load_walk_tables(Id, Rows8, Rows4) :-
+    retractall(walk_row(Id, _, _, _)),
+    forall(nth0(I, Rows8, Row), assertz(walk_row(Id, 8, I, Row))),
+    forall(nth0(I, Rows4, Row), assertz(walk_row(Id, 4, I, Row))).
+
+% Briše skup tablica Id (PrologAgent ograničava broj skupova)
+unload_tile_tables(Id) :-
+    retractall(tile_set(Id, _)),
+    retractall(los_mask(Id, _, _)),
+    retractall(fire_mask(Id, _, _)),
+    retractall(step_mask(Id, _, _)),
+    retractall(adjacent_mask(Id, _, _)),
+    retractall(terrain_mask(Id, _, _)),
+    retractall(walk_row(Id, _, _, _)).
+
+% Odabire skup tablica za ovaj teren - ako ga nema, gradi se u Prologu
+% (sporije, npr. kad se agent.pl koristi bez Pythona)
+ensure_tile_tables(Terrain, _GridSize) :-
+    tile_set(Id, Loaded),
+    Loaded == Terrain, !,
+    nb_setval(tile_set, Id).
+ensure_tile_tables(Terrain, GridSize) :-
+    build_tile_tables(Terrain, GridSize).
+
+% Gradi skup `local` istim pravilima kao game/tiles.py (bez hodajućih
+% udaljenosti) i odabire ga
+build_tile_tables(Terrain, GridSize) :-
+    Last is GridSize * GridSize - 1,
+    findall(
+        t(I, Los, Fire, Steps, Adjacent),
+        (
+            between(0, Last, I),
+            relation_mask(los, Terrain, GridSize, I, Los),
+            relation_mask(fire, Terrain, GridSize, I, Fire),
+            relation_mask(steps, Terrain, GridSize, I, Steps),
+            relation_mask(adjacent, Terrain, GridSize, I, Adjacent)
+        ),
+        Tiles
+    ),
+    terrain_cells_mask(Terrain, GridSize, 0, Grass),
+    terrain_cells_mask(Terrain, GridSize, 2, Water),
+    load_tile_tables(local, Terrain, Tiles, Grass, Water),
+    nb_setval(tile_set, local).
+
+% Ista pravila kao game/tiles.py
+tile_relation(los, Terrain, X, Y, JX, JY) :-
+    has_line_of_sight(X, Y, JX, JY, Terrain).
+tile_relation(fire, Terrain, X, Y, JX, JY) :-
+    grid_distance(X, Y, JX, JY, Distance),
+    Distance >= 1,
+    Distance =< 2,
+    has_line_of_sight(X, Y, JX, JY, Terrain).
+tile_relation(steps, Terrain, X, Y, JX, JY) :-
+    grid_distance(X, Y, JX, JY, 1),
+    get_terrain_at(Terrain, JX, JY, 0).
+tile_relation(adjacent, _Terrain, X, Y, JX, JY) :-
+    grid_distance(X, Y, JX, JY, 1).
+
+% Bitmapa tile-ova J u relaciji s tile-om I
+relation_mask(Relation, Terrain, GridSize, I, Mask) :-
+    X is I mod GridSize,
+    Y is I // GridSize,
+    Last is GridSize * GridSize - 1,
+    findall(
+        J,
+        (
+            between(0, Last, J),
+            JX is J mod GridSize,
+            JY is J // GridSize,
+            tile_relation(Relation, Terrain, X, Y, JX, JY)
+        ),
+        Cells
+    ),
+    foldl(set_bit, Cells, 0, Mask).
+
+% Bitmapa svih tile-ova zadanog terena
+terrain_cells_mask(Terrain, GridSize, Type, Mask) :-
+    Last is GridSize * GridSize - 1,
+    findall(
+        J,
+        (
+            between(0, Last, J),
+            JX is J mod GridSize,
+            JY is J // GridSize,
+            get_terrain_at(Terrain, JX, JY, Type)
+        ),
+        Cells
+    ),
+    foldl(set_bit, Cells, 0, Mask).
+
+set_bit(Bit, Mask0, Mask) :-
+    Mask is Mask0 \/ (1 << Bit).
+
 % ============================================================================
 % FORMATIRANJE AKCIJE ZA PYTHON
 % ============================================================================
@@ -176,3 +414,413 @@ sign(0, 0).
 format_action(move, move_to(X, Y), move(X, Y)).
 format_action(melee_attack, attack(X, Y, Dmg), melee_attack(X, Y, Dmg)).
 format_action(range_attack, attack(X, Y, Dmg), range_attack(X, Y, Dmg)).
+format_action(melee_push, push(X, Y, DX, DY), melee_push(X, Y, DX, DY)).
+
+% ============================================================================
+% LOOKAHEAD PRETRAGA S VREMENSKIM BUDŽETOM
+% ============================================================================
+%
+% best_action(GameState, Options, Action)
+%   Options: [budget(Sekunde), max_depth(D), weights(w(...))]
+%   max_depth je zadano 0 (samo greedy), kao AGENT_MAX_DEPTH
+%
+% Iterative deepening po broju player akcija. Nakon što player potroši
+% akcije u turn-u simulira se odgovor neprijatelja (range 1 akcija, melee 2,
+% redoslijed kao initiative queue u Pythonu). Greedy akcija je uvijek
+% spremna kao rezultat dubine 0; svaka završena dubina je zamjenjuje.
+% Kad istekne rok, pretraga baca search_timeout i vraća se zadnji
+% potpuni rezultat - agent nikad ne prekorači budžet za više od jednog čvora.
+
+player_actions_per_turn(2).
+
+best_action(GameState, Options, Action) :-
+    option(budget(Budget), Options, 0.2),
+    option(max_depth(MaxDepth), Options, 0),
+    default_weights(DefaultWeights),
+    option(weights(Weights), Options, DefaultWeights),
+    get_time(Now),
+    Deadline is Now + Budget,
+    abolish_all_tables,
+    GameState = game_state(_Player, _Enemies, Terrain, _ActionsLeft, GridSize),
+    ensure_tile_tables(Terrain, GridSize),
+    
+    greedy_action(GameState, Weights, GreedyAction),
+    nb_setval(search_best, GreedyAction),
+    
+    Ctx = ctx(Terrain, GridSize, Weights, Deadline),
+    catch(deepen(GameState, Ctx, 1, MaxDepth), search_timeout, true),
+    nb_getval(search_best, Action).
+
+deepen(_GameState, _Ctx, Depth, MaxDepth) :-
+    Depth > MaxDepth, !.
+deepen(GameState, Ctx, Depth, MaxDepth) :-
+    (root_search(GameState, Depth, Ctx, Action) ->
+        nb_setval(search_best, Action)
+    ;
+        true
+    ),
+    NextDepth is Depth + 1,
+    deepen(GameState, Ctx, NextDepth, MaxDepth).
+
+% Pretraga korijena - najbolja vrijednost, pa greedy prioritet, pa redoslijed
+root_search(GameState, Depth, Ctx, Action) :-
+    GameState = game_state(Player, Enemies, Terrain, ActionsLeft, GridSize),
+    Ctx = ctx(Terrain, GridSize, Weights, _Deadline),
+    State = s(Player, Enemies),
+    findall(
+        k(Value, Priority)-(Type-Details),
+        (
+            possible_action(Player, Enemies, Terrain, GridSize, Weights, Type, Priority, Details),
+            apply_player_action(Type, Details, State, GridSize, Next),
+            after_player_action(Next, ActionsLeft, Depth, Ctx, Value)
+        ),
+        Scored
+    ),
+    order_keys(Scored, 0, Keyed),
+    sort(1, @>=, Keyed, [_-(BestType-BestDetails) | _]),
+    format_action(BestType, BestDetails, Action).
+
+% Vrijednost stanja za playera (max po akcijama, neprijatelji su deterministički)
+search_value(State, _ActionsLeft, _Depth, _Ctx, Value) :-
+    terminal_state(State), !,
+    evaluate_state(State, Value).
+search_value(State, _ActionsLeft, 0, _Ctx, Value) :- !,
+    evaluate_state(State, Value).
+search_value(State, ActionsLeft, Depth, Ctx, Value) :-
+    check_deadline(Ctx),
+    Ctx = ctx(Terrain, GridSize, Weights, _Deadline),
+    State = s(Player, Enemies),
+    findall(
+        ChildValue,
+        (
+            possible_action(Player, Enemies, Terrain, GridSize, Weights, Type, _Priority, Details),
+            apply_player_action(Type, Details, State, GridSize, Next),
+            after_player_action(Next, ActionsLeft, Depth, Ctx, ChildValue)
+        ),
+        Values
+    ),
+    (Values = [] ->
+        evaluate_state(State, Value)
+    ;
+        max_list(Values, Value)
+    ).
+
+% Nakon player akcije - ako je turn gotov, neprijatelji odgovaraju
+after_player_action(State, ActionsLeft, Depth, Ctx, Value) :-
+    Left is ActionsLeft - 1,
+    NextDepth is Depth - 1,
+    (Left =< 0 ->
+        Ctx = ctx(Terrain, GridSize, _Weights, _Deadline),
+        enemy_phase(State, Terrain, GridSize, AfterEnemies),
+        player_actions_per_turn(Actions),
+        search_value(AfterEnemies, Actions, NextDepth, Ctx, Value)
+    ;
+        search_value(State, Left, NextDepth, Ctx, Value)
+    ).
+
+check_deadline(ctx(_Terrain, _GridSize, _Weights, Deadline)) :-
+    get_time(Now),
+    (Now > Deadline -> throw(search_timeout) ; true).
+
+terminal_state(s(player(_X, _Y, HP), _Enemies)) :- HP =< 0, !.
+terminal_state(s(_Player, [])).
+
+% Evaluacija iz perspektive playera
+evaluate_state(s(player(_X, _Y, HP), _Enemies), -10000) :- HP =< 0, !.
+evaluate_state(s(player(_X, _Y, HP), []), Score) :- !,
+    Score is 10000 + HP * 100.
+evaluate_state(s(player(PX, PY, HP), Enemies), Score) :-
+    length(Enemies, Alive),
+    foldl(sum_enemy_hp, Enemies, 0, EnemyHP),
+    findall(D, (member(enemy(_T, EX, EY, _H), Enemies), grid_distance(PX, PY, EX, EY, D)), Ds),
+    min_list(Ds, MinDist),
+    Score is HP * 100 - EnemyHP * 40 - Alive * 60 - MinDist * 3.
+
+sum_enemy_hp(enemy(_Type, _X, _Y, HP), Acc, Sum) :- Sum is Acc + HP.
+
+% ----------------------------------------------------------------------------
+% Simulacija player akcija (ista pravila kao GameLoop._execute_action)
+% ----------------------------------------------------------------------------
+
+apply_player_action(move, move_to(X, Y), s(player(_PX, _PY, HP), Enemies), _GridSize,
+                    s(player(X, Y, HP), Enemies)).
+apply_player_action(melee_attack, attack(X, Y, Damage), s(Player, Enemies), _GridSize,
+                    s(Player, Remaining)) :-
+    damage_enemy(Enemies, X, Y, Damage, Remaining).
+apply_player_action(range_attack, attack(X, Y, Damage), s(Player, Enemies), _GridSize,
+                    s(Player, Remaining)) :-
+    damage_enemy(Enemies, X, Y, Damage, Remaining).
+apply_player_action(melee_push, push(X, Y, DX, DY), s(Player, Enemies), GridSize,
+                    s(Player, Remaining)) :-
+    NewX is X + DX,
+    NewY is Y + DY,
+    terrain_mask(water, Water),
+    (on_mask(Water, NewX, NewY, GridSize) -> TerrainType = 2 ; TerrainType = 0),
+    push_enemy(Enemies, X, Y, NewX, NewY, TerrainType, Remaining).
+
+% Mrtvi neprijatelji se izbacuju iz liste (kao _prepare_game_state)
+damage_enemy([], _X, _Y, _Damage, []).
+damage_enemy([enemy(Type, X, Y, HP) | Rest], X, Y, Damage, Remaining) :- !,
+    NewHP is max(0, HP - Damage),
+    (NewHP > 0 ->
+        Remaining = [enemy(Type, X, Y, NewHP) | Rest]
+    ;
+        Remaining = Rest
+    ).
+damage_enemy([Enemy | Rest], X, Y, Damage, [Enemy | Remaining]) :-
+    damage_enemy(Rest, X, Y, Damage, Remaining).
+
+push_enemy([], _X, _Y, _NewX, _NewY, _TerrainType, []).
+push_enemy([enemy(Type, X, Y, HP) | Rest], X, Y, NewX, NewY, TerrainType, Remaining) :- !,
+    (TerrainType =:= 2 ->
+        Remaining = Rest  % Utopio se
+    ;
+        Remaining = [enemy(Type, NewX, NewY, HP) | Rest]
+    ).
+push_enemy([Enemy | Rest], X, Y, NewX, NewY, TerrainType, [Enemy | Remaining]) :-
+    push_enemy(Rest, X, Y, NewX, NewY, TerrainType, Remaining).
+
+% ----------------------------------------------------------------------------
+% Simulacija neprijatelja (monte_carlo_agent.enemy_action / enemy_turn)
+% ----------------------------------------------------------------------------
+
+% Akcija neprijatelja Index (1 = prvi u listi) u stanju GameState - ulaz za
+% provjeru s Pythonom (benchmarks.parity): melee_attack(X, Y, D),
+% range_attack(X, Y, D), move(X, Y) ili no_action
+enemy_action(GameState, Index, Action) :-
+    abolish_all_tables,
+    GameState = game_state(Player, Enemies, Terrain, _ActionsLeft, GridSize),
+    ensure_tile_tables(Terrain, GridSize),
+    enemy_context(Player, Enemies, GridSize, Ctx),
+    enemy_decision(Index, s(Player, Enemies), Ctx, Action).
+
+% Cijeli enemy turn nad GameState (isto kao enemy_phase u pretrazi)
+enemy_turn(GameState, Player, Enemies) :-
+    abolish_all_tables,
+    GameState = game_state(Player0, Enemies0, Terrain, _ActionsLeft, GridSize),
+    ensure_tile_tables(Terrain, GridSize),
+    enemy_phase(s(Player0, Enemies0), Terrain, GridSize, s(Player, Enemies)).
+
+% Svi neprijatelji jednom redom, pa melee drugi put (initiative queue)
+enemy_phase(s(Player, []), _Terrain, _GridSize, s(Player, [])) :- !.
+enemy_phase(State, _Terrain, GridSize, Final) :-
+    State = s(Player, Enemies),
+    length(Enemies, Count),
+    numlist(1, Count, FirstPass),
+    findall(I, nth1(I, Enemies, enemy(melee, _X, _Y, _HP)), SecondPass),
+    append(FirstPass, SecondPass, Order),
+    enemy_context(Player, Enemies, GridSize, Ctx),
+    foldl(enemy_step(Ctx), Order, State, Final).
+
+% Maske za BFS i kiting slojevi - player se u enemy turn-u ne miče pa se
+% računaju jednom po fazi (slojevi samo ako ima range neprijatelja)
+enemy_context(player(PX, PY, _PHP), Enemies, GridSize, enemy_ctx(GridSize, Grid, Layers)) :-
+    grid_masks(GridSize, Grid),
+    (memberchk(enemy(range, _X, _Y, _HP), Enemies) ->
+        kiting_layers(PX, PY, GridSize, Grid, Layers)
+    ;
+        Layers = []
+    ).
+
+enemy_step(_Ctx, _Index, State, State) :-
+    State = s(player(_PX, _PY, PHP), _Enemies),
+    PHP =< 0, !.
+enemy_step(Ctx, Index, State, Next) :-
+    enemy_decision(Index, State, Ctx, Action),
+    apply_enemy_action(Action, Index, State, Next).
+
+enemy_decision(Index, State, Ctx, Action) :-
+    State = s(player(PX, PY, _PHP), Enemies),
+    Ctx = enemy_ctx(GridSize, _Grid, _Layers),
+    nth1(Index, Enemies, enemy(Type, EX, EY, _EHP)),
+    grid_distance(EX, EY, PX, PY, Distance),
+    (enemy_attack(Type, EX, EY, PX, PY, Distance, GridSize, Attack) ->
+        Action = Attack
+    ; enemy_move(Type, Index, EX, EY, State, Ctx, NX, NY) ->
+        Action = move(NX, NY)
+    ;
+        Action = no_action
+    ).
+
+% MeleeEnemy napada na grid distance 1, RangeEnemy do 2 uz LOS
+enemy_attack(melee, _EX, _EY, PX, PY, 1, _GridSize, melee_attack(PX, PY, 2)).
+enemy_attack(range, EX, EY, PX, PY, _Distance, GridSize, range_attack(PX, PY, 1)) :-
+    tile_index(EX, EY, GridSize, EI),
+    fire_mask(EI, Fire),
+    on_mask(Fire, PX, PY, GridSize).
+
+% RangeEnemy s dostižnim firing tile-om ide prema njemu (InfluenceMap.step):
+% prvi slobodni susjed redom DIRECTIONS_4 u sloju bliže cilju. Ako takvog
+% nema, stoji - bez BFS-a prema playeru, kao u Pythonu.
+enemy_move(range, _Index, EX, EY, State, Ctx, NX, NY) :-
+    Ctx = enemy_ctx(GridSize, _Grid, Layers),
+    nth0(K, Layers, Layer),
+    on_mask(Layer, EX, EY, GridSize), !,
+    K > 0,
+    Closer is K - 1,
+    nth0(Closer, Layers, Mask),
+    neighbour_4(EX, EY, GridSize, NX, NY),
+    on_mask(Mask, NX, NY, GridSize),
+    \+ tile_taken(NX, NY, State), !.
+% Inače prvi korak BFS-a prema playeru (find_path_bfs)
+enemy_move(_Type, Index, EX, EY, s(player(PX, PY, _PHP), Enemies), Ctx, NX, NY) :-
+    bfs_first_step(Index, EX, EY, PX, PY, Enemies, Ctx, NX, NY).
+
+% Kao game.state.apply - potez na zauzeti tile ne mijenja ništa
+apply_enemy_action(no_action, _Index, State, State).
+apply_enemy_action(melee_attack(_X, _Y, Damage), _Index, State, Next) :-
+    damage_player(State, Damage, Next).
+apply_enemy_action(range_attack(_X, _Y, Damage), _Index, State, Next) :-
+    damage_player(State, Damage, Next).
+apply_enemy_action(move(X, Y), Index, s(Player, Enemies), Next) :-
+    (tile_taken(X, Y, s(Player, Enemies)) ->
+        Next = s(Player, Enemies)
+    ;
+        nth1(Index, Enemies, enemy(Type, _EX, _EY, HP)),
+        replace_nth1(Index, Enemies, enemy(Type, X, Y, HP), Moved),
+        Next = s(Player, Moved)
+    ).
+
+damage_player(s(player(PX, PY, PHP), Enemies), Damage, s(player(PX, PY, NewHP), Enemies)) :-
+    NewHP is max(0, PHP - Damage).
+
+tile_taken(X, Y, s(player(X, Y, _PHP), _Enemies)) :- !.
+tile_taken(X, Y, s(_Player, Enemies)) :-
+    position_occupied(X, Y, Enemies).
+
+% 4 susjeda redom kao find_path_bfs: (0,1), (0,-1), (1,0), (-1,0)
+neighbour_4(X, Y, GridSize, NX, NY) :-
+    member(DX-DY, [0-1, 0-(-1), 1-0, (-1)-0]),
+    NX is X + DX,
+    NY is Y + DY,
+    in_bounds(NX, NY, GridSize).
+
+% find_path_bfs s jedinicama kao preprekama (osim cilja). Umjesto reda od
+% neprijatelja ide se slojevima od playera (bitmape, 4 smjera) dok sloj ne
+% dotakne slobodnog susjeda neprijatelja. BFS od neprijatelja obilazi sloj
+% grupiran po prvom koraku, redom DIRECTIONS_4, pa vraća prvi susjed (tim
+% redom) koji je najbliži playeru - to je prvi susjed u tom sloju.
+bfs_first_step(Index, EX, EY, PX, PY, Enemies, Ctx, NX, NY) :-
+    Ctx = enemy_ctx(GridSize, Grid, _Layers),
+    % Nema puta ni bez jedinica (tablica 4 smjera) - nema ga ni s njima
+    \+ walk_unreachable(4, EX, EY, PX, PY, GridSize),
+    terrain_mask(grass, Grass),
+    occupied_mask(Enemies, Index, GridSize, Others),
+    tile_index(PX, PY, GridSize, PI),
+    Target is 1 << PI,
+    Passable is Grass /\ \ (Others \/ Target),
+    Open is Passable \/ Target,
+    findall(
+        J,
+        (neighbour_4(EX, EY, GridSize, X, Y), on_mask(Open, X, Y, GridSize),
+         tile_index(X, Y, GridSize, J)),
+        Cells
+    ),
+    foldl(set_bit, Cells, 0, Starts),
+    Starts =\= 0,
+    bfs_meet(Target, Target, Passable, Starts, Grid, Layer),
+    neighbour_4(EX, EY, GridSize, NX, NY),
+    on_mask(Layer, NX, NY, GridSize), !.
+
+% Prvi BFS sloj od Frontier koji sadrži neki od Starts (ne uspijeva ako ga nema)
+bfs_meet(Frontier, _Visited, _Passable, Starts, _Grid, Frontier) :-
+    Frontier /\ Starts =\= 0, !.
+bfs_meet(Frontier, Visited, Passable, Starts, Grid, Layer) :-
+    neighbours_mask(Frontier, Grid, Around),
+    Next is Around /\ Passable /\ \ Visited,
+    Next =\= 0,
+    Seen is Visited \/ Next,
+    bfs_meet(Next, Seen, Passable, Starts, Grid, Layer).
+
+% Kiting (game/influence.py) nad bitmapama iz Pythona. InfluenceMap s
+% attack_range = preferred_distance = 2 i PLAYER_MELEE_RANGE 1 za cilj
+% uzima firing tile-ove (trava, P u fire_mask tile-a) na udaljenosti 2, a
+% ako ih nema one na udaljenosti 1. Layers = [Cilj, Sloj1, ...]: sloj K su
+% tile-ovi na hodajućoj udaljenosti K od cilja (4 smjera, kroz travu, ne
+% kroz playera) - field vrijednost K iz InfluenceMap-a.
+kiting_layers(PX, PY, GridSize, Grid, Layers) :-
+    terrain_mask(grass, Grass),
+    firing_ring(PX, PY, GridSize, Grass, 2, Far),
+    (Far =\= 0 ->
+        Goal = Far
+    ;
+        firing_ring(PX, PY, GridSize, Grass, 1, Goal)
+    ),
+    (Goal =:= 0 ->
+        Layers = []
+    ;
+        tile_index(PX, PY, GridSize, PI),
+        Passable is Grass /\ \ (1 << PI),
+        field_layers(Goal, Goal, Passable, Grid, Layers)
+    ).
+
+% Firing tile-ovi na grid distance Distance od playera
+firing_ring(PX, PY, GridSize, Grass, Distance, Mask) :-
+    Low is -Distance,
+    findall(
+        I,
+        (
+            between(Low, Distance, DX),
+            between(Low, Distance, DY),
+            max(abs(DX), abs(DY)) =:= Distance,
+            X is PX + DX,
+            Y is PY + DY,
+            in_bounds(X, Y, GridSize),
+            on_mask(Grass, X, Y, GridSize),
+            tile_index(X, Y, GridSize, I),
+            fire_mask(I, Fire),
+            on_mask(Fire, PX, PY, GridSize)
+        ),
+        Cells
+    ),
+    foldl(set_bit, Cells, 0, Mask).
+
+field_layers(Layer, Visited, Passable, Grid, [Layer | Layers]) :-
+    neighbours_mask(Layer, Grid, Around),
+    Next is Around /\ Passable /\ \ Visited,
+    (Next =:= 0 ->
+        Layers = []
+    ;
+        Seen is Visited \/ Next,
+        field_layers(Next, Seen, Passable, Grid, Layers)
+    ).
+
+% Bitmapa živih neprijatelja osim onog s indeksom Skip
+occupied_mask(Enemies, Skip, GridSize, Mask) :-
+    findall(
+        I,
+        (nth1(J, Enemies, enemy(_Type, X, Y, HP)), J =\= Skip, HP > 0,
+         tile_index(X, Y, GridSize, I)),
+        Cells
+    ),
+    foldl(set_bit, Cells, 0, Mask).
+
+% Pomak bitmape za jedan tile u 4 smjera: grid(GridSize, All, NotFirst, NotLast)
+% - NotFirst / NotLast brišu bitove koji bi pomakom prešli u susjedni redak
+grid_masks(GridSize, grid(GridSize, All, NotFirst, NotLast)) :-
+    All is (1 << (GridSize * GridSize)) - 1,
+    Last is GridSize - 1,
+    numlist(0, Last, Rows),
+    foldl(first_column_bit(GridSize), Rows, 0, FirstColumn),
+    NotFirst is All /\ \ FirstColumn,
+    NotLast is All /\ \ (FirstColumn << Last).
+
+first_column_bit(GridSize, Y, Mask0, Mask) :-
+    Mask is Mask0 \/ (1 << (Y * GridSize)).
+
+neighbours_mask(Mask, grid(GridSize, All, NotFirst, NotLast), Around) :-
+    Around is (((Mask << 1) /\ NotFirst) \/ ((Mask >> 1) /\ NotLast)
+               \/ (Mask << GridSize) \/ (Mask >> GridSize)) /\ All.
+
+% Tablica hodajućih udaljenosti postoji i kaže da puta nema
+walk_unreachable(Directions, X1, Y1, X2, Y2, GridSize) :-
+    tile_index(X1, Y1, GridSize, I),
+    walk_row(Directions, I, Row),
+    J is Y2 * GridSize + X2 + 1,
+    arg(J, Row, -1).
+
+replace_nth1(1, [_ | Rest], Element, [Element | Rest]) :- !.
+replace_nth1(Index, [Head | Rest], Element, [Head | Replaced]) :-
+    Index > 1,
+    Next is Index - 1,
+    replace_nth1(Next, Rest, Element, Replaced).
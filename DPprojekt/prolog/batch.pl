@@ -0,0 +1,121 @@
+% ============================================================================
+% BULK UPITI - binarni zapis stanja iz prolog_codec.py
+% ============================================================================
+%
+% solve_file(In, Out) čita niz zapisa iz binarne datoteke In, za svako
+% stanje traži best_action/3 i akciju piše u Out (ACTION_SIZE bajtova po
+% stanju). Format zapisa je opisan u prolog_codec.py. Teren se dekodira
+% samo kad ga zapis sadrži, inače se koristi isti term kao za prošlo
+% stanje - ensure_tile_tables/2 tada ne gradi tablice ponovno.
+
+:- ensure_loaded(agent).
+
+solve_file(InFile, OutFile) :-
+    setup_call_cleanup(
+        open(InFile, read, In, [type(binary)]),
+        setup_call_cleanup(
+            open(OutFile, write, Out, [type(binary)]),
+            solve_stream(In, Out),
+            close(Out)),
+        close(In)).
+
+solve_stream(In, Out) :-
+    solve_records(In, Out, none, []).
+
+% solve_records(+In, +Out, +Terrain, +Options) - Terrain i Options su iz
+% prethodnih zapisa
+solve_records(In, Out, Terrain, Options) :-
+    get_byte(In, Tag),
+    solve_record(Tag, In, Out, Terrain, Options).
+
+solve_record(-1, _In, _Out, _Terrain, _Options) :- !.
+solve_record(0'O, In, Out, Terrain, _Options) :- !,
+    read_options(In, Options),
+    solve_records(In, Out, Terrain, Options).
+solve_record(0'S, In, Out, Terrain0, Options) :- !,
+    read_state(In, Terrain0, GameState),
+    (best_action(GameState, Options, Action) -> true ; Action = no_action),
+    write_action(Out, Action),
+    GameState = game_state(_Player, _Enemies, Terrain, _ActionsLeft, _GridSize),
+    solve_records(In, Out, Terrain, Options).
+solve_record(Tag, _In, _Out, _Terrain, _Options) :-
+    throw(error(domain_error(record_tag, Tag), solve_file/2)).
+
+% ----------------------------------------------------------------------------
+% Čitanje zapisa
+% ----------------------------------------------------------------------------
+
+read_bytes(In, Count, Bytes) :-
+    length(Bytes, Count),
+    maplist(get_byte(In), Bytes).
+
+read_u16(In, Value) :-
+    read_bytes(In, 2, [Low, High]),
+    Value is Low + High * 256.
+
+read_options(In, [budget(Budget), max_depth(MaxDepth), weights(Weights)]) :-
+    read_u16(In, Millis),
+    Budget is Millis / 1000.0,
+    read_bytes(In, 2, [MaxDepth, Count]),
+    length(Values, Count),
+    maplist(read_u16(In), Values),
+    Weights =.. [w | Values].
+
+read_state(In, Terrain0, game_state(player(PX, PY, PHP), Enemies, Terrain, ActionsLeft, GridSize)) :-
+    read_bytes(In, 8, [Width, Height, ActionsLeft, GridSize, PX, PY, PHP, Count]),
+    length(Enemies, Count),
+    maplist(read_enemy(In), Enemies),
+    get_byte(In, Flag),
+    read_terrain(Flag, In, Width, Height, Terrain0, Terrain).
+
+read_enemy(In, enemy(Type, X, Y, HP)) :-
+    read_bytes(In, 4, [Kind, X, Y, HP]),
+    enemy_kind(Kind, Type).
+
+enemy_kind(0, range).
+enemy_kind(1, melee).
+
+read_terrain(0, _In, _Width, _Height, Terrain, Terrain).
+read_terrain(1, In, Width, Height, _Terrain0, Terrain) :-
+    Cells is Width * Height,
+    Count is (Cells + 3) // 4,
+    read_bytes(In, Count, Bytes),
+    unpack_cells(Bytes, Packed),
+    length(Flat, Cells),
+    append(Flat, _Padding, Packed),
+    rows_of(Width, Flat, Terrain).
+
+% 4 ćelije po bajtu, od najnižih bitova
+unpack_cells([], []).
+unpack_cells([Byte | Bytes], [C0, C1, C2, C3 | Cells]) :-
+    C0 is Byte /\ 3,
+    C1 is (Byte >> 2) /\ 3,
+    C2 is (Byte >> 4) /\ 3,
+    C3 is (Byte >> 6) /\ 3,
+    unpack_cells(Bytes, Cells).
+
+rows_of(_Width, [], []) :- !.
+rows_of(Width, Cells, [Row | Rows]) :-
+    length(Row, Width),
+    append(Row, Rest, Cells),
+    rows_of(Width, Rest, Rows).
+
+% ----------------------------------------------------------------------------
+% Pisanje akcija
+% ----------------------------------------------------------------------------
+
+write_action(Out, Action) :-
+    action_record(Action, Tag, Params),
+    put_byte(Out, Tag),
+    maplist(put_param(Out), Params).
+
+action_record(no_action, 0, [0, 0, 0, 0]).
+action_record(move(X, Y), 1, [X, Y, 0, 0]).
+action_record(melee_attack(X, Y, Damage), 2, [X, Y, Damage, 0]).
+action_record(melee_push(X, Y, DX, DY), 3, [X, Y, DX, DY]).
+action_record(range_attack(X, Y, Damage), 4, [X, Y, Damage, 0]).
+
+% Signed parametri (dx/dy = -1) se pišu kao bajt 255
+put_param(Out, Value) :-
+    Byte is Value /\ 255,
+    put_byte(Out, Byte).
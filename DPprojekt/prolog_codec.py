@@ -0,0 +1,102 @@
+# ============================================================================
+# DATOTEKA: prolog_codec.py
+# Uloga: Kompaktni binarni zapis game state-ova za bulk upite agent.pl-u
+# ============================================================================
+#
+# Umjesto Prolog teksta (_build_query) stanja se pišu kao niz bajtova koje
+# čita prolog/batch.pl (get_byte/2), a akcije se vraćaju istim putem.
+# Svi brojevi su bajtovi (0..255), osim gdje piše drukčije.
+#
+# Zapisi u ulaznom streamu:
+#   'O' budget_ms(u16 LE) max_depth  K  K x weight(u16 LE)
+#       - opcije za sva sljedeća stanja (kao options u best_action/3)
+#   'S' width height actions_left grid_size  px py php  N
+#       N x (kind x y hp)              kind: 0 range, 1 melee
+#       flag [teren]                   flag 0: teren kao u prošlom stanju
+#                                      flag 1: width*height ćelija, 2 bita
+#                                      po ćeliji, 4 ćelije po bajtu (od
+#                                      najnižih bitova)
+#
+# Izlazni stream: po jedan zapis od ACTION_SIZE bajtova za svako stanje,
+#   tag p0 p1 p2 p3     tag: 0 no_action, 1 move, 2 melee_attack,
+#                            3 melee_push, 4 range_attack
+#   parametri su redom kao u agent.pl terminu; p0, p1 (x, y) su unsigned,
+#   p2, p3 signed bajtovi (dx/dy = -1).
+
+import struct
+
+from config.constants import AGENT_WEIGHTS
+from game.terrain import flat_terrain
+
+STATE_TAG = ord('S')
+OPTIONS_TAG = ord('O')
+
+ENEMY_CODES = {'range': 0, 'melee': 1}
+
+ACTION_NAMES = {1: 'move', 2: 'melee_attack', 3: 'melee_push', 4: 'range_attack'}
+ACTION_SIZE = 5
+
+_PARAM_COUNTS = {'move': 2, 'melee_attack': 3, 'melee_push': 4, 'range_attack': 3}
+
+
+def pack_terrain(terrain):
+    """2D grid (ili GameMap.rows) -> bytes, 4 ćelije (2 bita) po bajtu"""
+    cells = list(flat_terrain(terrain))
+    cells += [0] * (-len(cells) % 4)
+    return bytes(
+        cells[i] | cells[i + 1] << 2 | cells[i + 2] << 4 | cells[i + 3] << 6
+        for i in range(0, len(cells), 4)
+    )
+
+
+class StateEncoder:
+    """
+    Gradi ulazni stream za batch.pl. Teren se piše samo kad se promijeni
+    u odnosu na prethodno stanje, pa niz stanja iste partije košta samo
+    jedinice.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self._terrain = None
+
+    def options(self, time_budget, max_depth, weights):
+        values = [weights[name] for name in AGENT_WEIGHTS]
+        self.buffer += struct.pack(
+            f'<BHBB{len(values)}H', OPTIONS_TAG, round(time_budget * 1000),
+            max_depth, len(values), *values
+        )
+
+    def state(self, game_state):
+        player = game_state['player']
+        enemies = game_state['enemies']
+        terrain = game_state['terrain']
+        height, width = len(terrain), len(terrain[0])
+
+        record = [STATE_TAG, width, height, game_state['actions_left'], game_state['grid_size'],
+                  player['x'], player['y'], player['hp'], len(enemies)]
+        for e in enemies:
+            record += (ENEMY_CODES[e['type']], e['x'], e['y'], e['hp'])
+        try:
+            self.buffer += bytes(record)
+        except ValueError:
+            raise ValueError("Stanje ne stane u binarni zapis (vrijednosti moraju biti 0..255)")
+
+        if terrain is self._terrain or terrain == self._terrain:
+            self.buffer.append(0)
+        else:
+            self.buffer.append(1)
+            self.buffer += pack_terrain(terrain)
+            self._terrain = terrain
+
+    def getvalue(self):
+        return bytes(self.buffer)
+
+
+def decode_actions(data):
+    """Izlazni stream batch.pl-a -> lista (ime, parametri) ili None za no_action"""
+    actions = []
+    for offset in range(0, len(data), ACTION_SIZE):
+        tag, *params = struct.unpack_from('<3B2b', data, offset)
+        name = ACTION_NAMES.get(tag)
+        actions.append((name, params[:_PARAM_COUNTS[name]]) if name else None)
+    return actions
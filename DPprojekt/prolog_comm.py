@@ -1,17 +1,66 @@
-from pyswip import Prolog
+import itertools
 import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+from config.constants import AGENT_TIME_BUDGET, AGENT_MAX_DEPTH, AGENT_WEIGHTS
+from diagnostics.metrics import metrics
+from diagnostics.trace import trace
+from game.terrain import flat_terrain
+from game.tiles import tile_tables, MAX_TILE_CELLS
+from game.walk import walk_distances
+from prolog_codec import StateEncoder, decode_actions
+
+# Najviše ovoliko skupova tablica (jedan po terenu) drži agent.pl odjednom
+PROLOG_TABLE_SETS = 8
 
 class PrologAgent:
-    def __init__(self):
+    # Teren (bytes) -> Id skupa tablica u agent.pl, od najdavnije korištenog.
+    # Zajedničko svim instancama - pyswip ima jedan SWI engine po procesu.
+    _table_sets = OrderedDict()
+    _table_ids = itertools.count(1)
+    
+    def __init__(self, count_inferences=False, time_budget=AGENT_TIME_BUDGET,
+                 max_depth=AGENT_MAX_DEPTH, weights=None, service=None):
+        # Profiliranje - broj SWI inferences (statistics/2) po upitu
+        self.count_inferences = count_inferences
+        self.inference_counts = []
+        
+        # Lookahead - budžet u sekundama i max dubina (0 = samo greedy)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        
+        # Težine prioriteta - zadane se nadopune onima iz `weights`
+        self.weights = dict(AGENT_WEIGHTS, **(weights or {}))
+        
+        # Zadnji teren i njegov ključ u _table_sets (isti objekt - bez ponovnog ključa)
+        self._last_terrain = None
+        
+        # prolog/batch.pl (bulk upiti) se učitava na prvi get_actions_bulk
+        self._batch_loaded = False
+        
+        # Client mode - akcije računa agent_service (pool enginea na Unix
+        # socketu `service`), lokalni engine se ne pokreće
+        self.client = None
+        if service is not None:
+            from agent_service import ServiceClient
+            self.client = ServiceClient(service)
+            self.prolog = None
+            trace.info("✓ Prolog agent service na %s", service)
+            return
+        
+        # pyswip se učitava tek ovdje - bez SWI-Prologa ostatak enginea
+        # (npr. benchmarkovi) se i dalje može importati
+        from pyswip import Prolog
         self.prolog = Prolog()
         
         # Učitaj Prolog agent
         prolog_file = os.path.join('prolog', 'agent.pl')
         try:
             self.prolog.consult(prolog_file)
-            print(f"✓ Prolog agent loaded from {prolog_file}")
+            trace.info("✓ Prolog agent loaded from %s", prolog_file)
         except Exception as e:
-            print(f"✗ Error loading Prolog: {e}")
+            trace.error("✗ Error loading Prolog: %s", e)
             raise
     
     def get_action(self, game_state):
@@ -24,35 +73,191 @@ class PrologAgent:
         Returns:
             Dictionary s akcijom ili None
         """
+        if self.client is not None:
+            return self._get_action_remote(game_state)
+        
+        # Bitmape po tile-u - šalju se samo kad se mapa promijeni. Izvan
+        # try-a: nepodržana mapa je greška, a ne propušten potez.
+        with metrics.timer('prolog.tables'):
+            self._sync_tile_tables(game_state['terrain'])
+        
         try:
             # Formatiraj game state za Prolog
-            prolog_query = self._build_query(game_state)
+            with metrics.timer('prolog.build'):
+                prolog_query = self._build_query(game_state)
             
             # Debug print
             # print(f"Prolog query: {prolog_query[:200]}...")  # Print first 200 chars
             
+            if self.count_inferences:
+                prolog_query = (
+                    f"statistics(inferences,I0),{prolog_query},statistics(inferences,I1)"
+                )
+            
             # Query Prolog za najbolju akciju
-            results = list(self.prolog.query(prolog_query, maxresult=1))
+            with metrics.timer('prolog.query'):
+                results = list(self.prolog.query(prolog_query, maxresult=1))
+            
+            if results and self.count_inferences:
+                inferences = results[0]['I1'] - results[0]['I0']
+                self.inference_counts.append(inferences)
+                metrics.observe('prolog.inferences', inferences)
             
             if results and len(results) > 0:
                 action_term = results[0]['Action']
                 # print(f"Prolog returned: {action_term}")
-                parsed_action = self._parse_action(action_term, game_state)
+                with metrics.timer('prolog.parse'):
+                    parsed_action = self._parse_action(action_term, game_state)
                 if parsed_action:
-                    print(f"  Prolog chose: {parsed_action['type']}")
+                    trace.info("  Prolog chose: %s", parsed_action['type'])
                 return parsed_action
             else:
-                print(f"Prolog query returned empty results")
+                trace.warning("Prolog query returned empty results")
                 return None
             
         except Exception as e:
-            print(f"Prolog error: {e}")
             import traceback
-            traceback.print_exc()
+            trace.error("Prolog error: %s\n%s", e, traceback.format_exc())
+            return None
+    
+    def get_actions_bulk(self, game_states):
+        """
+        Akcije za listu stanja - stanja idu agent.pl-u u binarnom zapisu
+        (prolog_codec.py) kroz datoteku, jedan upit po nizu stanja s istom
+        mapom, umjesto teksta i parsiranja po stanju. Isto što i get_action
+        po stanju provjerava benchmarks.parity --checks bulk.
+        
+        Returns:
+            Lista akcija (dict ili None) istim redom kao game_states
+        """
+        if self.client is not None:
+            # Service nema bulk put - zahtjevi se pipeline-aju na pool
+            try:
+                return self.client.get_actions(game_states, self._service_options())
+            except Exception as e:
+                trace.error("Agent service error: %s", e)
+                return [None] * len(game_states)
+        
+        if not self._batch_loaded:
+            self.prolog.consult(os.path.join('prolog', 'batch.pl'))
+            self._batch_loaded = True
+        
+        actions = []
+        with tempfile.TemporaryDirectory() as tmp:
+            in_path = os.path.join(tmp, 'states.bin')
+            out_path = os.path.join(tmp, 'actions.bin')
+            for _terrain, group in itertools.groupby(game_states, key=lambda s: s['terrain']):
+                group = list(group)
+                # Tablice iz Pythona za mapu ove grupe, kao u get_action
+                with metrics.timer('prolog.tables'):
+                    self._sync_tile_tables(group[0]['terrain'])
+                
+                with metrics.timer('prolog.bulk_encode'):
+                    encoder = StateEncoder()
+                    encoder.options(self.time_budget, self.max_depth, self.weights)
+                    for state in group:
+                        encoder.state(state)
+                    with open(in_path, 'wb') as f:
+                        f.write(encoder.getvalue())
+                
+                with metrics.timer('prolog.bulk_query'):
+                    list(self.prolog.query(f"solve_file('{in_path}','{out_path}')"))
+                
+                with open(out_path, 'rb') as f:
+                    records = decode_actions(f.read())
+                for state, record in zip(group, records):
+                    actions.append(
+                        self._action_from_params(record[0], record[1], state) if record else None
+                    )
+                metrics.count('prolog.bulk_states', len(group))
+        return actions
+    
+    def _service_options(self):
+        return {
+            'budget': self.time_budget,
+            'max_depth': self.max_depth,
+            'weights': self.weights,
+        }
+    
+    def _get_action_remote(self, game_state):
+        """get_action preko agent_service-a - iste opcije kao lokalni upit"""
+        try:
+            with metrics.timer('prolog.service'):
+                action = self.client.get_action(game_state, self._service_options())
+        except Exception as e:
+            trace.error("Agent service error: %s", e)
             return None
+        if action:
+            trace.info("  Prolog chose: %s", action['type'])
+        return action
+    
+    def close(self):
+        """Zatvara vezu prema agent_service-u (lokalni engine nema što zatvoriti)"""
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+    
+    @staticmethod
+    def check_map(width, height):
+        """ValueError ako agent.pl ne može igrati mapu width x height"""
+        # agent.pl indeksira tile-ove s jednim GridSize i bitmapama po tile-u
+        if width != height or width * height > MAX_TILE_CELLS:
+            raise ValueError(f"Prolog agent podržava kvadratne mape do {MAX_TILE_CELLS} "
+                             f"tile-ova, ne {width}x{height}")
+    
+    def _sync_tile_tables(self, terrain):
+        """Učitava bitmape i hodajuće udaljenosti za teren u agent.pl (ako već nisu)"""
+        last = self._last_terrain
+        if last is not None and last[0] is terrain:
+            key = last[1]
+        else:
+            key = flat_terrain(terrain)
+            self._last_terrain = (terrain, key)
+        
+        table_sets = PrologAgent._table_sets
+        if key in table_sets:
+            # agent.pl bira skup po terenu upita (ensure_tile_tables/2)
+            table_sets.move_to_end(key)
+            return
+        
+        width, height = len(terrain[0]), len(terrain)
+        self.check_map(width, height)
+        tables = tile_tables(np.frombuffer(key, dtype=np.uint8).reshape(height, width))
+        walk_rows = []
+        for diagonal in (True, False):
+            distances = walk_distances(key, width, height, diagonal)
+            walk_rows.append(distances.prolog_rows() if distances is not None else "[]")
+        
+        table_id = next(PrologAgent._table_ids)
+        query = (
+            f"load_tile_tables({table_id},{self._format_terrain(terrain)},"
+            f"{tables.prolog_arguments()}),"
+            f"load_walk_tables({table_id},{walk_rows[0]},{walk_rows[1]})"
+        )
+        list(self.prolog.query(query))
+        table_sets[key] = table_id
+        metrics.count('prolog.table_loads')
+        
+        if len(table_sets) > PROLOG_TABLE_SETS:
+            _key, oldest = table_sets.popitem(last=False)
+            list(self.prolog.query(f"unload_tile_tables({oldest})"))
+    
+    def _format_terrain(self, terrain):
+        """Format terrain: [[0,1,0,...], [2,0,1,...], ...]"""
+        terrain_rows = []
+        for row in terrain:
+            row_str = "[" + ",".join(str(cell) for cell in row) + "]"
+            terrain_rows.append(row_str)
+        return "[" + ",".join(terrain_rows) + "]"
     
     def _build_query(self, state):
         """Gradi Prolog query string"""
+        weights_str = "w(" + ",".join(str(self.weights[name]) for name in AGENT_WEIGHTS) + ")"
+        options_str = f"[budget({self.time_budget}),max_depth({self.max_depth}),weights({weights_str})]"
+        return f"best_action({self._format_state(state)},{options_str},Action)"
+    
+    def _format_state(self, state):
+        """game_state(Player, Enemies, Terrain, ActionsLeft, GridSize) term"""
         player = state['player']
         enemies = state['enemies']
         terrain = state['terrain']
@@ -70,36 +275,39 @@ class PrologAgent:
         enemies_str = "[" + ",".join(enemy_strs) + "]"
         
         # Format terrain: [[0,1,0,...], [2,0,1,...], ...]
-        terrain_rows = []
-        for row in terrain:
-            row_str = "[" + ",".join(str(cell) for cell in row) + "]"
-            terrain_rows.append(row_str)
-        terrain_str = "[" + ",".join(terrain_rows) + "]"
-        
-        # Build full query
-        game_state_str = f"game_state({player_str},{enemies_str},{terrain_str},{actions_left},{grid_size})"
-        query = f"best_action({game_state_str}, Action)"
+        terrain_str = self._format_terrain(terrain)
         
-        return query
+        return f"game_state({player_str},{enemies_str},{terrain_str},{actions_left},{grid_size})"
     
     def _parse_action(self, action_term, game_state):
         """Parsira Prolog akciju u Python dictionary"""
         # action_term je string u formatu: move(3,4) ili melee_attack(2,3,2) itd.
         action_str = str(action_term)
         
-        # Parse action type i parametri
-        if 'move(' in action_str:
+        if 'no_action' in action_str:
+            return None
+        
+        if '(' in action_str:
+            name = action_str[:action_str.index('(')].strip()
+            action = self._action_from_params(name, self._extract_params(action_str), game_state)
+            if action:
+                return action
+        
+        trace.warning("Could not parse action: %s", action_str)
+        return None
+    
+    def _action_from_params(self, name, params, game_state):
+        """Ime i parametri Prolog akcije -> dict akcija (None ako nije valjana)"""
+        if name == 'move':
             # Format: move(X, Y)
-            params = self._extract_params(action_str)
             if len(params) >= 2:
                 return {
                     'type': 'move',
                     'target': (int(params[0]), int(params[1]))
                 }
         
-        elif 'melee_attack(' in action_str:
+        elif name == 'melee_attack':
             # Format: melee_attack(EnemyX, EnemyY, Damage)
-            params = self._extract_params(action_str)
             if len(params) >= 3:
                 target_enemy = self._find_enemy_at(
                     int(params[0]), int(params[1]), game_state
@@ -111,9 +319,8 @@ class PrologAgent:
                         'damage': int(params[2])
                     }
         
-        elif 'melee_push(' in action_str:
+        elif name == 'melee_push':
             # Format: melee_push(EnemyX, EnemyY, DX, DY)
-            params = self._extract_params(action_str)
             if len(params) >= 4:
                 target_enemy = self._find_enemy_at(
                     int(params[0]), int(params[1]), game_state
@@ -125,9 +332,8 @@ class PrologAgent:
                         'direction': (int(params[2]), int(params[3]))
                     }
         
-        elif 'range_attack(' in action_str:
+        elif name == 'range_attack':
             # Format: range_attack(EnemyX, EnemyY, Damage)
-            params = self._extract_params(action_str)
             if len(params) >= 3:
                 target_enemy = self._find_enemy_at(
                     int(params[0]), int(params[1]), game_state
@@ -139,10 +345,6 @@ class PrologAgent:
                         'damage': int(params[2])
                     }
         
-        elif 'no_action' in action_str:
-            return None
-        
-        print(f"Could not parse action: {action_str}")
         return None
     
     def _extract_params(self, action_str):
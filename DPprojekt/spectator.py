@@ -0,0 +1,197 @@
+# ============================================================================
+# DATOTEKA: spectator.py
+# Uloga: Pygame gledatelj za partije na match serveru
+# ============================================================================
+#
+# Spaja se na match_server.py, traži snapshot jedne partije i primjenjuje
+# delte na lokalne GameMap/EntityStore/TurnManager objekte, pa crta istim
+# Renderer-om kao interaktivna igra. Socket se čita u pozadinskoj dretvi,
+# a pygame petlja svaki frame primijeni sve pristigle poruke.
+#
+# Pokretanje (iz DPprojekt/ foldera):
+#   python3 -m spectator --list
+#   python3 -m spectator --match 3
+
+import argparse
+import json
+import queue
+import socket
+import threading
+
+import pygame
+
+from config.constants import *
+from entities.store import EntityStore, KIND_PLAYER, KIND_RANGE
+from entities.player import Player
+from entities.enemy import RangeEnemy, MeleeEnemy
+from game.map import GameMap
+from game.turn_manager import TurnManager
+from ui.renderer import Renderer
+
+
+class MatchView:
+    """Lokalna kopija jedne partije izgrađena iz snapshot-a i delti"""
+    def __init__(self):
+        self.game_map = None
+        self.player = None
+        self.enemies = []
+        self.units = []
+        self.turn_manager = TurnManager()
+        self.game_over = False
+        self.winner = None
+        self.seq = -1
+        self.game = None
+
+    def apply(self, message):
+        """Primjenjuje poruku servera - vraća True ako se stanje promijenilo"""
+        if message['type'] == 'snapshot':
+            self._load_snapshot(message)
+            return True
+        if message['type'] != 'delta' or message['seq'] <= self.seq:
+            # Delta koju snapshot već sadrži (nakon resync-a)
+            return False
+        self.seq = message['seq']
+        for index, x, y, hp in message['units']:
+            unit = self.units[index]
+            unit.x, unit.y, unit.hp = x, y, hp
+        self._apply_info(message)
+        return True
+
+    def _load_snapshot(self, message):
+        self.game = message['game']
+        self.seq = message['seq']
+        self.game_map = GameMap.from_grid(message['terrain'])
+        store = EntityStore()
+        self.units = []
+        for kind, x, y, hp in message['units']:
+            if kind == KIND_PLAYER:
+                unit = Player(x, y, store)
+            elif kind == KIND_RANGE:
+                unit = RangeEnemy(x, y, store)
+            else:
+                unit = MeleeEnemy(x, y, store)
+            unit.hp = hp
+            self.units.append(unit)
+        self.player = self.units[0]
+        self.enemies = self.units[1:]
+        self._apply_info(message)
+
+    def _apply_info(self, message):
+        manager = self.turn_manager
+        manager.turn_number = message.get('turn', manager.turn_number)
+        manager.current_turn = message.get('current', manager.current_turn)
+        manager.actions_left = message.get('actions_left', manager.actions_left)
+        self.game_over = message.get('game_over', self.game_over)
+        self.winner = message.get('winner', self.winner)
+
+
+class ServerConnection:
+    """Veza prema match serveru - poruke se čitaju u pozadinskoj dretvi"""
+    def __init__(self, socket_path=MATCH_SERVER_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self._rfile = self.sock.makefile('rb')
+        self.messages = queue.Queue()
+        self.closed = False
+
+    def send(self, request):
+        self.sock.sendall((json.dumps(request) + "\n").encode())
+
+    def request(self, request):
+        """Jedan zahtjev i odgovor (prije pokretanja čitanja u pozadini)"""
+        self.send(request)
+        return json.loads(self._rfile.readline())
+
+    def start_reading(self):
+        threading.Thread(target=self._read, name='spectator-reader', daemon=True).start()
+
+    def _read(self):
+        for line in self._rfile:
+            self.messages.put(json.loads(line))
+        self.closed = True
+
+    def pending(self):
+        """Sve poruke pristigle od zadnjeg poziva"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        self.sock.close()
+
+
+def _render(screen, renderer, view):
+    screen.fill(COLOR_BG)
+    renderer.render_map()
+    renderer.render_entity(view.player, COLOR_PLAYER)
+    for enemy in view.enemies:
+        if enemy.hp > 0:
+            color = COLOR_ENEMY_RANGE if isinstance(enemy, RangeEnemy) else COLOR_ENEMY_MELEE
+            renderer.render_entity(enemy, color)
+    renderer.render_ui(view.player, view.enemies, view.turn_manager,
+                       False, view.game_over, view.winner)
+    pygame.display.flip()
+
+
+def watch(connection, match_id):
+    """Pygame petlja - crta partiju dok se prozor ne zatvori ili server ne ode"""
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Into The Breach - match {match_id}")
+    clock = pygame.time.Clock()
+
+    view = MatchView()
+    renderer = None
+    connection.send({'op': 'watch', 'match': match_id})
+    connection.start_reading()
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        changed = False
+        for message in connection.pending():
+            if message['type'] == 'error':
+                print(f"Server: {message['error']}")
+                running = False
+            else:
+                changed = view.apply(message) or changed
+        if changed:
+            if renderer is None:
+                renderer = Renderer(screen, view.game_map)
+            renderer.game_map = view.game_map
+            _render(screen, renderer, view)
+        if connection.closed and connection.messages.empty():
+            print("Server je zatvorio vezu")
+            running = False
+        clock.tick(FPS)
+
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gledatelj partija s match servera")
+    parser.add_argument('--socket', default=MATCH_SERVER_SOCKET, metavar='PATH')
+    parser.add_argument('--match', type=int, default=0, help="Partija koju gledati (default: 0)")
+    parser.add_argument('--list', action='store_true', help="Samo ispiši partije i izađi")
+    args = parser.parse_args(argv)
+
+    connection = ServerConnection(args.socket)
+    try:
+        if args.list:
+            for match in connection.request({'op': 'list'})['matches']:
+                print(f"  match {match['id']}: igra {match['game']}, turn {match['turn']}, "
+                      f"gledatelja {match['spectators']}, rezultati {match['results']}")
+            return
+        watch(connection, args.match)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
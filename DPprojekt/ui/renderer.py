@@ -14,8 +14,15 @@ class Renderer:
         self.font = pygame.font.Font(None, 24)
         self.font_large = pygame.font.Font(None, 48)
     
+    @property
+    def tile_size(self):
+        """TILE_SIZE, ili manje da cijela mapa (stres scenariji) stane u prozor"""
+        longest = max(self.game_map.width, self.game_map.height)
+        return max(1, min(TILE_SIZE, (SCREEN_HEIGHT - 2 * GRID_OFFSET_Y) // longest))
+    
     def render_map(self):
         """Renderuje grid i terrain"""
+        tile = self.tile_size
         for y in range(self.game_map.height):
             for x in range(self.game_map.width):
                 terrain = self.game_map.get_terrain(x, y)
@@ -30,32 +37,35 @@ class Renderer:
                 
                 # Renderuj tile
                 rect = pygame.Rect(
-                    GRID_OFFSET_X + x * TILE_SIZE,
-                    GRID_OFFSET_Y + y * TILE_SIZE,
-                    TILE_SIZE,
-                    TILE_SIZE
+                    GRID_OFFSET_X + x * tile,
+                    GRID_OFFSET_Y + y * tile,
+                    tile,
+                    tile
                 )
                 pygame.draw.rect(self.screen, color, rect)
-                pygame.draw.rect(self.screen, COLOR_GRID_LINE, rect, 1)
+                # Na sitnim tile-ovima linije bi prekrile teren
+                if tile >= 8:
+                    pygame.draw.rect(self.screen, COLOR_GRID_LINE, rect, 1)
     
     def render_entity(self, entity, color):
         """Renderuje entitet (player ili enemy)"""
-        center_x = GRID_OFFSET_X + entity.x * TILE_SIZE + TILE_SIZE // 2
-        center_y = GRID_OFFSET_Y + entity.y * TILE_SIZE + TILE_SIZE // 2
+        tile = self.tile_size
+        center_x = GRID_OFFSET_X + entity.x * tile + tile // 2
+        center_y = GRID_OFFSET_Y + entity.y * tile + tile // 2
         
         pygame.draw.circle(
             self.screen,
             color,
             (center_x, center_y),
-            TILE_SIZE // 3
+            max(1, tile // 3)
         )
         
-        # HP bar
-        self._render_hp_bar(entity, center_x, center_y - TILE_SIZE // 2)
+        # HP bar (samo kad ima mjesta iznad jedinice)
+        if tile >= 20:
+            self._render_hp_bar(entity, center_x, center_y - tile // 2, tile - 10)
     
-    def _render_hp_bar(self, entity, x, y):
+    def _render_hp_bar(self, entity, x, y, bar_width):
         """Renderuje HP bar iznad entiteta"""
-        bar_width = TILE_SIZE - 10
         bar_height = 5
         
         # Background
@@ -70,7 +80,7 @@ class Renderer:
     
     def render_ui(self, player, enemies, turn_manager, paused, game_over, winner):
         """Renderuje UI informacije"""
-        ui_x = GRID_OFFSET_X + GRID_SIZE * TILE_SIZE + 40
+        ui_x = GRID_OFFSET_X + self.game_map.width * self.tile_size + 40
         ui_y = 50
         
         # Turn info
@@ -91,10 +101,16 @@ class Renderer:
         self._render_text("=== ENEMIES ===", ui_x, ui_y + 220)
         y_offset = 250
         alive_enemies = [e for e in enemies if e.hp > 0]
-        for i, enemy in enumerate(alive_enemies):
+        # Lista stane do uputa na dnu - ostatak se samo prebroji
+        shown = max(0, (SCREEN_HEIGHT - 130 - ui_y - y_offset) // 30)
+        if len(alive_enemies) > shown:
+            shown -= 1
+        for i, enemy in enumerate(alive_enemies[:shown]):
             enemy_type = type(enemy).__name__
             text = f"{enemy_type}: HP {enemy.hp}"
             self._render_text(text, ui_x, ui_y + y_offset + i * 30)
+        if len(alive_enemies) > shown:
+            self._render_text(f"... +{len(alive_enemies) - shown}", ui_x, ui_y + y_offset + shown * 30)
         
         # Instructions
         self._render_text("SPACE - Pause", ui_x, SCREEN_HEIGHT - 100, size=20)